@@ -69,3 +69,29 @@ async def get_metrics_summary():
             "message": "Failed to retrieve metrics summary"
         }
 
+
+@router.get("/metrics/risk-gate")
+async def get_risk_gate_latency():
+    """
+    Get rolling pre-trade risk gate latency (p50/p95/p99 per check and phase)
+    alongside the configured latency budgets
+    """
+    try:
+        from app.config import settings
+        
+        return {
+            "budgets_ms": {
+                "default_check": settings.RISK_CHECK_BUDGET_MS,
+                "checks": settings.RISK_CHECK_BUDGETS_MS,
+                "gate_total": settings.RISK_GATE_BUDGET_MS,
+                "enforced": settings.RISK_CHECK_BUDGET_ENFORCE
+            },
+            "latency": metrics_service.get_risk_latency_breakdown()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get risk gate latency: {e}")
+        return {
+            "error": str(e),
+            "message": "Failed to retrieve risk gate latency"
+        }
@@ -5,7 +5,7 @@ Provides portfolio management and tracking functionality.
 """
 
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -14,6 +14,7 @@ import logging
 from app.database import get_db
 from app.config import Settings
 from app.services.exchanges.delta_exchange import DeltaExchangeConnector
+from app.services.equity_curve import get_equity_curve
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["portfolio"])
@@ -184,24 +185,29 @@ async def get_portfolio_history(
     days: int = Query(7, description="Number of days of history"),
     db: Session = Depends(get_db)
 ):
-    """Get portfolio performance history"""
+    """Get portfolio performance history (daily closes from the equity curve, newest first)"""
     try:
-        # Mock historical data
-        history = []
-        base_value = 30000
+        equity_curve = get_equity_curve(paper_trading=settings.PAPER_TRADING)
+        await equity_curve.ensure_loaded()
         
-        for i in range(days):
-            date = datetime.utcnow() - timedelta(days=i)
-            value_change = base_value * 0.02 * (0.5 - (i % 5) / 5)
-            
+        # One extra day so the oldest returned day has a previous close to compare with
+        since = datetime.now(timezone.utc).timestamp() - (days + 1) * 86400
+        points = equity_curve.history(since, bucket_seconds=86400)
+        
+        history = []
+        for previous, point in zip([None] + points[:-1], points):
+            previous_value = previous["equity"] if previous else None
+            pnl = point["equity"] - previous_value if previous_value else 0.0
             history.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "total_value": base_value + value_change,
-                "pnl": value_change,
-                "pnl_percent": (value_change / base_value) * 100
+                "date": point["timestamp"].strftime("%Y-%m-%d"),
+                "total_value": point["equity"],
+                "pnl": pnl,
+                "pnl_percent": (pnl / previous_value) * 100 if previous_value else 0.0,
+                "high_water_mark": point["high_water_mark"],
+                "drawdown_percent": point["drawdown"] * 100
             })
         
-        return {"history": history}
+        return {"history": list(reversed(history[-days:]))}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch portfolio history: {str(e)}")
 
@@ -6,7 +6,7 @@ including database, API keys, and service configurations.
 """
 
 import os
-from typing import List, Union, Optional
+from typing import Dict, List, Union, Optional
 from pydantic_settings import BaseSettings
 from pydantic import field_validator, Field
 
@@ -91,6 +91,66 @@ class Settings(BaseSettings):
     DELTA_LIVE_BASE_URL: str = "https://api.india.delta.exchange"
     DELTA_LIVE_WEBSOCKET_URL: str = "wss://socket.delta.exchange"
     
+    # Delta Exchange REST rate limit (token bucket: capacity units per window)
+    DELTA_RATE_LIMIT_CAPACITY: int = 10000
+    DELTA_RATE_LIMIT_WINDOW_SECONDS: int = 300
+    
+    # Micro-TTL cache for hot exchange reads (tickers, order books, products)
+    DELTA_READ_CACHE_ENABLED: bool = True
+    
+    # Delta Exchange HTTP transport (shared keep-alive pool per environment)
+    DELTA_HTTP_POOL_LIMIT: int = 100
+    DELTA_HTTP_POOL_LIMIT_PER_HOST: int = 32
+    DELTA_HTTP_KEEPALIVE_TIMEOUT: float = 60.0
+    DELTA_HTTP_DNS_CACHE_TTL: int = 300
+    DELTA_HTTP_WARMUP_CONNECTIONS: int = 4
+    
+    # Delta Exchange WebSocket auth (last successful variant is cached per environment)
+    DELTA_WS_AUTH_CACHE_PATH: str = ".delta_ws_auth_cache.json"
+    DELTA_WS_AUTH_PROBE_FALLBACK: bool = True
+    
+    # Decode hot order/position responses into slotted structs (no pydantic validation)
+    DELTA_FAST_DECODE: bool = True
+    
+    # Delta Exchange circuit breakers (per endpoint class) and retry policy
+    DELTA_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    DELTA_CIRCUIT_RECOVERY_SECONDS: float = 30.0
+    DELTA_CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+    DELTA_CIRCUIT_PROBE_TIMEOUT_SECONDS: float = 30.0  # Unanswered half-open trials count as failures after this
+    DELTA_RETRY_MAX_ATTEMPTS: int = 2
+    DELTA_RETRY_BASE_DELAY: float = 0.1
+    DELTA_RETRY_MAX_DELAY: float = 2.0
+    DELTA_RETRY_BUDGET_RATIO: float = 0.1
+    DELTA_RETRY_BUDGET_MIN_PER_SECOND: float = 1.0
+    
+    # Exchange clock-offset estimation for request signing
+    DELTA_CLOCK_SYNC_ENABLED: bool = True
+    DELTA_CLOCK_SYNC_INTERVAL: float = 60.0
+    DELTA_CLOCK_SYNC_WINDOW: int = 8
+    
+    # Delta Exchange private order/fill stream (REST reconciliation only while it is down)
+    DELTA_PRIVATE_STREAM_ENABLED: bool = True
+    DELTA_ORDER_RECONCILE_INTERVAL: float = 60.0
+    TRADE_LIFECYCLE_POLL_INTERVAL: float = 10.0  # Exit order reconciliation while the stream is down
+    
+    # Order/trade state: in memory, journaled locally, written behind to Postgres
+    ORDER_STATE_FLUSH_INTERVAL: float = 0.5
+    ORDER_STATE_FLUSH_BATCH: int = 200  # Flush early once this many rows are pending
+    ORDER_JOURNAL_PATH: str = ".order_journal.{environment}.jsonl"
+    ORDER_JOURNAL_FSYNC: bool = True  # One fsync per group of records, on the journal writer thread
+    
+    # Execution queue: priority classes served by a bounded worker pool, one request per symbol and lane at a time
+    EXECUTION_WORKERS: int = 6  # Entries may use all but the reserved workers
+    EXECUTION_RESERVED_WORKERS: Dict[str, int] = {  # Workers kept free for each class; less urgent classes cannot use them
+        "emergency_exit": 1,
+        "exit": 1
+    }
+    EXECUTION_QUEUE_MAX_DEPTH: int = 500  # Entries are refused beyond this; exits always queue
+    EXECUTION_DEADLINES: Dict[str, float] = {  # Seconds a request may wait before it is dropped (exits never expire)
+        "entry": 5.0,
+        "stop_adjust": 30.0
+    }
+    
     # Dynamic properties for current environment
     @property
     def current_delta_api_key(self) -> str:
@@ -154,6 +214,59 @@ class Settings(BaseSettings):
     MAX_DAILY_LOSS: float = 500.0  # USD
     RISK_PERCENTAGE: float = 0.02  # 2% risk per trade
     
+    # In-memory risk state for the pre-trade gate (seconds)
+    RISK_STATE_REFRESH_INTERVAL: float = 15.0  # Balance and mark refresh
+    RISK_STATE_RECONCILE_INTERVAL: float = 300.0  # Rebuild positions and daily P&L from the database
+    RISK_STATE_MAX_AGE: float = 60.0  # Balance older than this is refetched before gating
+    RISK_STATE_MARK_MAX_AGE: float = 5.0  # Cached ticker age accepted by the gate
+    RISK_CHECK_TIMEOUT: float = 0.5  # Per-check timeout when checks run concurrently
+    
+    # Risk gate latency budgets (over-budget checks are flagged; optionally they time out)
+    RISK_CHECK_BUDGET_MS: float = 5.0  # Default per-check budget
+    RISK_CHECK_BUDGETS_MS: Dict[str, float] = {  # Checks that may refresh market data
+        "market_conditions": 50.0,
+        "marginal_var": 50.0,
+        "correlation": 50.0,
+        "position_limits": 50.0
+    }
+    RISK_GATE_BUDGET_MS: float = 25.0  # Whole gate / signal validation
+    RISK_CHECK_BUDGET_ENFORCE: bool = False  # Time out checks at their budget (deny unless fail-open)
+    
+    # VaR/CVaR analytics (historical, parametric, EWMA) and the marginal-VaR gate limit
+    RISK_VAR_RESOLUTION: str = "5m"  # Candle resolution for the returns matrix
+    RISK_VAR_LOOKBACK_BARS: int = 1000
+    RISK_VAR_MIN_BARS: int = 50  # Symbols with less history are not modelled
+    RISK_VAR_CONFIDENCE_LEVELS: List[float] = [0.95, 0.99]
+    RISK_VAR_HORIZON_BARS: List[int] = [1, 12, 288]  # 5m, 1h, 1d at 5m bars
+    RISK_VAR_EWMA_DECAY: float = 0.94  # RiskMetrics lambda
+    RISK_VAR_GATE_CONFIDENCE: float = 0.99
+    RISK_VAR_GATE_HORIZON_BARS: int = 288
+    RISK_MAX_MARGINAL_VAR: float = 0.01  # Max VaR added by one order, fraction of portfolio value
+    RISK_CORRELATION_DEFAULT: float = 1.0  # Assumed for pairs without return history (conservative)
+    RISK_CORRELATED_POSITION_THRESHOLD: float = 0.9  # Same-direction positions above this count as duplicates
+    
+    # Equity curve: high-water mark and drawdown tracking with persisted samples
+    EQUITY_CURVE_SAMPLE_INTERVAL: float = 60.0  # seconds between stored samples
+    EQUITY_CURVE_CHECKPOINT_INTERVAL: float = 300.0  # seconds between database flushes
+    EQUITY_CURVE_RETENTION_DAYS: int = 90  # Samples kept in memory for history queries
+    
+    # Risk event audit writer (batched, off the order path)
+    RISK_AUDIT_QUEUE_SIZE: int = 10000  # Events beyond this are dropped and counted
+    RISK_AUDIT_BATCH_SIZE: int = 200
+    RISK_AUDIT_FLUSH_INTERVAL: float = 0.5  # seconds
+    
+    # Monte Carlo stress testing of open positions (process pool, steps at RISK_VAR_RESOLUTION)
+    STRESS_TEST_WORKERS: int = 0  # 0 = one worker per CPU
+    STRESS_TEST_DEFAULT_PATHS: int = 100000
+    STRESS_TEST_MAX_PATHS: int = 1000000
+    STRESS_TEST_MIN_CHUNK_PATHS: int = 10000  # Smaller runs stay in-process
+    STRESS_TEST_HORIZON_BARS: int = 288  # 1 day at 5m bars
+    STRESS_TEST_DEFAULT_VOLATILITY: float = 0.8  # Annualized, for symbols without return history
+    STRESS_TEST_JUMP_INTENSITY: float = 1.0  # Market-wide jumps per day
+    STRESS_TEST_JUMP_MEAN: float = -0.01  # Mean jump log return
+    STRESS_TEST_JUMP_STD: float = 0.03
+    STRESS_TEST_MAINTENANCE_MARGIN: float = 0.005  # Fraction of notional
+    
     # AI/ML Configuration
     MODEL_UPDATE_INTERVAL: int = 3600  # seconds
     FEATURE_WINDOW_SIZE: int = 100  # number of data points
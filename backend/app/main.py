@@ -31,6 +31,12 @@ from app.services.trade_execution_engine import TradeExecutionEngine
 from app.services.position_manager import PositionManager
 from app.services.risk_manager import RiskManager
 from app.services.data_feed_service import DataFeedService
+from app.services.exchanges.connector_pool import connector_registry
+from app.services.risk_audit import risk_audit_writer
+from app.services.stress_testing import StressScenario, stress_tester
+from app.services.equity_curve import get_equity_curve
+from app.services.risk_state import stop_risk_states
+from app.services.risk_analytics import stop_risk_analytics
 
 from app.utils.logging_config import setup_logging
 
@@ -81,6 +87,9 @@ async def lifespan(app: FastAPI):
         paper_trading = settings.PAPER_TRADING
         logger.info(f"Trading mode: {'PAPER TRADING' if paper_trading else 'LIVE TRADING'}")
         
+        # Warm up the shared exchange connection pool (non-blocking for API failures)
+        await connector_registry.warm_up(paper_trading=paper_trading)
+        
         # Initialize Risk Manager (non-blocking for API failures)
         try:
             risk_manager = RiskManager(paper_trading=paper_trading)
@@ -172,6 +181,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error shutting down autonomous services: {e}")
     
+    # Stop risk refresh loops; their exchange calls would reopen closed connectors
+    try:
+        await stop_risk_states()
+        await stop_risk_analytics()
+    except Exception as e:
+        logger.error(f"Failed to stop risk state refresh: {e}")
+    
+    # Flush queued risk audit events before the database goes away
+    await risk_audit_writer.stop()
+    
+    # Persist the latest equity samples (high-water mark checkpoint)
+    try:
+        await get_equity_curve(paper_trading=settings.PAPER_TRADING).stop()
+    except Exception as e:
+        logger.error(f"Failed to checkpoint equity curve: {e}")
+    
+    stress_tester.shutdown()
+    
+    # Close shared exchange connectors last, after every service has stopped using them
+    await connector_registry.close_all()
+    
     await health_service.cleanup()
     logger.info("Crypto-0DTE-System shutdown complete")
 
@@ -476,6 +506,24 @@ async def get_risk_summary():
         raise HTTPException(status_code=500, detail="Failed to get risk summary")
 
 
+@app.post("/api/v1/autonomous/risk/stress-test")
+async def run_risk_stress_test(scenario: StressScenario):
+    """Monte Carlo stress test of open positions (P&L distribution, liquidation and stop-hit risk)"""
+    try:
+        if risk_manager:
+            report = await risk_manager.run_stress_test(scenario)
+            return report
+        else:
+            raise HTTPException(status_code=503, detail="Risk manager not initialized")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to run stress test: {e}")
+        raise HTTPException(status_code=500, detail="Failed to run stress test")
+
+
 @app.get("/api/v1/autonomous/positions/analytics/{trade_id}")
 async def get_position_analytics(trade_id: str):
     """Get analytics for a specific position"""
@@ -35,6 +35,7 @@ from .order import (
 # Import risk and signal event models
 from .risk_event import RiskEvent, RiskEventType
 from .signal_event import SignalEvent, SignalEventType
+from .equity_curve import EquityCurvePoint
 
 __all__ = [
     "Base",
@@ -75,6 +76,7 @@ __all__ = [
     "RiskEvent",
     "RiskEventType",
     "SignalEvent",
-    "SignalEventType"
+    "SignalEventType",
+    "EquityCurvePoint"
 ]
 
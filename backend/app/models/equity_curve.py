@@ -0,0 +1,38 @@
+"""
+Equity Curve Model
+
+Sampled account equity with the running high-water mark and maximum
+drawdown at each sample, so drawdown state survives restarts.
+"""
+
+from sqlalchemy import Column, String, Float, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+import uuid
+
+class EquityCurvePoint(Base):
+    """One equity sample (the latest row per environment is the drawdown checkpoint)"""
+
+    __tablename__ = "equity_curve"
+
+    # Primary key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # Environment context
+    environment = Column(String(20), nullable=False)  # testnet/live
+
+    # Sample
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    equity = Column(Float, nullable=False)  # Wallet balance plus unrealized P&L (USD)
+
+    # Drawdown state as of this sample
+    high_water_mark = Column(Float, nullable=False)
+    max_drawdown = Column(Float, nullable=False)  # Fraction of the high-water mark
+
+    __table_args__ = (
+        # Latest checkpoint and time-range history per environment
+        Index('idx_equity_curve_environment_recorded_at', 'environment', 'recorded_at'),
+    )
+
+    def __repr__(self):
+        return f"<EquityCurvePoint(environment={self.environment}, recorded_at={self.recorded_at}, equity={self.equity})>"
@@ -9,7 +9,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, Text, Boolean, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, ENUM
 from sqlalchemy.orm import relationship
 import uuid
@@ -118,6 +118,11 @@ class Trade(Base):
     is_paper_trade = Column(Boolean, nullable=False, default=True)
     is_autonomous = Column(Boolean, nullable=False, default=True)
     
+    __table_args__ = (
+        # Daily realized P&L: SUM(realized_pnl) WHERE status = CLOSED AND closed_at >= midnight
+        Index('idx_autonomous_trades_status_closed_at', 'status', 'closed_at'),
+    )
+    
     def __repr__(self):
         return f"<Trade(id={self.trade_id}, symbol={self.symbol}, type={self.trade_type}, status={self.status})>"
     
@@ -18,7 +18,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 import json
 
-from app.services.exchanges.delta_exchange import DeltaExchangeConnector
+from app.services.exchanges.connector_pool import get_delta_connector
 from app.services.trade_execution_engine import TradeExecutionEngine
 from app.services.position_manager import PositionManager
 from app.services.risk_manager import RiskManager
@@ -53,7 +53,7 @@ class AutonomousTradingOrchestrator:
         self.paper_trading = paper_trading if paper_trading is not None else True  # Default to paper trading for safety
         
         # Core services with environment awareness
-        self.delta_connector = DeltaExchangeConnector(paper_trading=self.paper_trading)
+        self.delta_connector = get_delta_connector(paper_trading=self.paper_trading)
         self.trade_executor = TradeExecutionEngine(paper_trading=self.paper_trading)
         self.position_manager = PositionManager(paper_trading=self.paper_trading)
         self.risk_manager = RiskManager(paper_trading=self.paper_trading)
@@ -20,7 +20,7 @@ import aioredis
 from app.config import settings
 from app.database import get_db_session, influxdb_manager, redis_manager
 from app.models.market_data import CryptoPrice, OrderBook, MarketTrade, FundingRate, MarketSentiment, DeFiMetrics
-from app.services.exchanges.delta_exchange import DeltaExchangeConnector
+from app.services.exchanges.connector_pool import get_delta_connector
 # from app.services.external_data_service import ExternalDataService  # TODO: Create this service
 from app.utils.logging_config import setup_logging
 
@@ -34,7 +34,7 @@ class DataFeedService:
     def __init__(self):
         # Use paper trading mode from settings
         from app.config import settings
-        self.delta_connector = DeltaExchangeConnector(paper_trading=settings.PAPER_TRADING)
+        self.delta_connector = get_delta_connector(paper_trading=settings.PAPER_TRADING)
         # self.external_data = ExternalDataService()  # TODO: Create this service
         
         # Symbols to track
@@ -128,8 +128,9 @@ class DataFeedService:
         # Flush remaining data
         await self._flush_all_buffers()
         
-        # Disconnect from exchanges
-        await self.delta_connector.disconnect()
+        # Close our WebSocket feed; the shared HTTP session stays open for other services
+        await self.delta_connector.disconnect_websocket()
+        await self.delta_connector.cleanup()
         
         logger.info("Data Feed Service stopped")
     
@@ -0,0 +1,328 @@
+"""
+Equity Curve Tracker for Crypto-0DTE System
+
+Records account equity (wallet balance plus unrealized P&L) as it changes
+and maintains the running high-water mark, current drawdown and maximum
+drawdown incrementally, so drawdown queries are O(1).
+
+Samples are kept at a fixed interval in a fixed-size in-memory ring of
+NumPy arrays for history queries. New samples are flushed to the
+equity_curve table in batches; the latest row per environment is the
+checkpoint the high-water mark and maximum drawdown are restored from
+after a restart.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+
+from app.config import settings
+from app.database import get_db
+from app.models.equity_curve import EquityCurvePoint
+
+logger = logging.getLogger(__name__)
+
+
+# Backoff between attempts to restore the checkpoint after a failed load
+LOAD_RETRY_BASE_SECONDS = 1.0
+LOAD_RETRY_MAX_SECONDS = 60.0
+
+
+class EquityCurveTracker:
+    """High-water mark, drawdown and sampled equity for one trading environment"""
+
+    def __init__(self, paper_trading: bool):
+        self.paper_trading = paper_trading
+        self.environment = "testnet" if paper_trading else "live"
+
+        # Configuration
+        self.sample_interval = settings.EQUITY_CURVE_SAMPLE_INTERVAL
+        self.checkpoint_interval = settings.EQUITY_CURVE_CHECKPOINT_INTERVAL
+        self.retention_seconds = settings.EQUITY_CURVE_RETENTION_DAYS * 86400
+        self.capacity = max(1, int(self.retention_seconds // self.sample_interval))
+
+        # Ring buffer of samples: epoch seconds, equity, high-water mark
+        self._times = np.zeros(self.capacity)
+        self._equity = np.zeros(self.capacity)
+        self._hwm = np.zeros(self.capacity)
+        self._head = 0  # Next write position
+        self._count = 0
+
+        # Incrementally maintained drawdown state
+        self.equity = 0.0
+        self.high_water_mark = 0.0
+        self.high_water_mark_at: Optional[float] = None
+        self.max_drawdown = 0.0
+        self._last_sample_at = 0.0
+
+        # Samples not yet written: (epoch seconds, equity, high-water mark, max drawdown)
+        self._pending: List[Tuple[float, float, float, float]] = []
+
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._load_failures = 0
+        self._load_retry_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.samples_recorded = 0
+        self.samples_written = 0
+        self.samples_pruned = 0
+
+    # =============================================================================
+    # LIFECYCLE
+    # =============================================================================
+
+    def ensure_started(self):
+        """Start the background checkpoint loop (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._checkpoint_loop())
+
+    async def stop(self):
+        """Stop the checkpoint loop after writing pending samples"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.checkpoint()
+
+    async def ensure_loaded(self):
+        """Restore the checkpoint and in-memory history from the database on first use (retried with backoff)"""
+        if self._loaded or time.monotonic() < self._load_retry_at:
+            return
+        async with self._load_lock:
+            if self._loaded or time.monotonic() < self._load_retry_at:
+                return
+            try:
+                await self._load()
+            except Exception as e:
+                self._load_failures += 1
+                delay = min(LOAD_RETRY_MAX_SECONDS, LOAD_RETRY_BASE_SECONDS * 2 ** (self._load_failures - 1))
+                self._load_retry_at = time.monotonic() + delay
+                logger.warning(f"Equity curve load failed for {self.environment} (retry in {delay:.0f}s): {e}")
+                return
+            self._loaded = True
+            self._load_failures = 0
+
+    async def _load(self):
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)
+        async for db in get_db():
+            result = await db.execute(
+                select(EquityCurvePoint).filter(
+                    EquityCurvePoint.environment == self.environment
+                ).order_by(EquityCurvePoint.recorded_at.desc()).limit(1)
+            )
+            latest = result.scalars().first()
+
+            result = await db.execute(
+                select(
+                    EquityCurvePoint.recorded_at,
+                    EquityCurvePoint.equity,
+                    EquityCurvePoint.high_water_mark
+                ).filter(
+                    EquityCurvePoint.environment == self.environment,
+                    EquityCurvePoint.recorded_at >= since
+                ).order_by(EquityCurvePoint.recorded_at.desc()).limit(self.capacity)
+            )
+            rows = result.all()
+            break
+
+        if latest is None:
+            return
+
+        # Samples recorded since startup are newer than anything stored: keep them on top
+        live = self._ordered()
+        self._head = self._count = 0
+        for recorded_at, equity, hwm in reversed(rows):
+            self._append(recorded_at.timestamp(), equity, hwm)
+        for t, equity, hwm in zip(*live):
+            self._append(t, equity, hwm)
+
+        if latest.high_water_mark >= self.high_water_mark:
+            self.high_water_mark = latest.high_water_mark
+            self.high_water_mark_at = latest.recorded_at.timestamp()
+            if self.equity > 0:
+                self.max_drawdown = max(self.max_drawdown, self.drawdown)
+        self.max_drawdown = max(self.max_drawdown, latest.max_drawdown)
+        if not self.equity:
+            self.equity = latest.equity
+
+        logger.info(
+            f"Equity curve restored for {self.environment}: HWM ${self.high_water_mark:,.2f}, "
+            f"max drawdown {self.max_drawdown:.1%}, {len(rows)} samples"
+        )
+
+    # =============================================================================
+    # RECORDING
+    # =============================================================================
+
+    def record(self, equity: float, timestamp: Optional[float] = None):
+        """Apply an equity observation (O(1)); a sample is stored at most once per interval"""
+        if not equity or equity <= 0:
+            return
+        now = timestamp or time.time()
+
+        self.equity = equity
+        if equity > self.high_water_mark:
+            self.high_water_mark = equity
+            self.high_water_mark_at = now
+        else:
+            self.max_drawdown = max(self.max_drawdown, 1.0 - equity / self.high_water_mark)
+
+        if now - self._last_sample_at >= self.sample_interval:
+            self._last_sample_at = now
+            self._append(now, equity, self.high_water_mark)
+            self._pending.append((now, equity, self.high_water_mark, self.max_drawdown))
+            self.samples_recorded += 1
+
+    def _append(self, t: float, equity: float, hwm: float):
+        self._times[self._head] = t
+        self._equity[self._head] = equity
+        self._hwm[self._head] = hwm
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    @property
+    def drawdown(self) -> float:
+        """Current drawdown from the high-water mark (fraction)"""
+        if self.high_water_mark <= 0 or self.equity <= 0:
+            return 0.0
+        return max(0.0, 1.0 - self.equity / self.high_water_mark)
+
+    # =============================================================================
+    # PERSISTENCE
+    # =============================================================================
+
+    async def _checkpoint_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.checkpoint_interval)
+                await self.ensure_loaded()
+                await self.checkpoint()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Equity curve checkpoint failed: {e}")
+
+    async def checkpoint(self):
+        """
+        Write pending samples in one statement (kept for the next attempt on failure)
+        and prune rows older than the retention window in the same transaction.
+
+        The batch just written is newer than the cutoff, so the latest row (the
+        high-water mark checkpoint) always survives the prune.
+        """
+        if not self._pending or not self._loaded:
+            # Until the stored checkpoint is restored, newer rows would shadow its high-water mark
+            return
+        batch, self._pending = self._pending, []
+        try:
+            async for db in get_db():
+                await db.execute(insert(EquityCurvePoint), [
+                    {
+                        "environment": self.environment,
+                        "recorded_at": datetime.fromtimestamp(t, timezone.utc),
+                        "equity": equity,
+                        "high_water_mark": hwm,
+                        "max_drawdown": max_drawdown
+                    }
+                    for t, equity, hwm, max_drawdown in batch
+                ])
+                cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)
+                result = await db.execute(
+                    delete(EquityCurvePoint).where(
+                        EquityCurvePoint.environment == self.environment,
+                        EquityCurvePoint.recorded_at < cutoff
+                    )
+                )
+                await db.commit()
+                break
+            self.samples_written += len(batch)
+            self.samples_pruned += result.rowcount or 0
+        except Exception:
+            # Re-queue ahead of newer samples, bounded by the in-memory retention
+            self._pending = (batch + self._pending)[-self.capacity:]
+            raise
+
+    # =============================================================================
+    # QUERIES
+    # =============================================================================
+
+    def _ordered(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Samples oldest first"""
+        start = (self._head - self._count) % self.capacity
+        index = (start + np.arange(self._count)) % self.capacity
+        return self._times[index], self._equity[index], self._hwm[index]
+
+    def history(self, since: float, bucket_seconds: float) -> List[Dict[str, Any]]:
+        """
+        Equity samples since an epoch time, downsampled to the last sample per bucket.
+
+        Returns:
+            Points oldest first with equity, high-water mark and drawdown
+        """
+        times, equity, hwm = self._ordered()
+        mask = times >= since
+        times, equity, hwm = times[mask], equity[mask], hwm[mask]
+        if not times.size:
+            return []
+
+        buckets = np.floor(times / bucket_seconds)
+        last = np.flatnonzero(np.append(buckets[1:] != buckets[:-1], True))
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(times[i], timezone.utc),
+                "equity": float(equity[i]),
+                "high_water_mark": float(hwm[i]),
+                "drawdown": float(1.0 - equity[i] / hwm[i]) if hwm[i] > 0 else 0.0
+            }
+            for i in last
+        ]
+
+    def get_state(self) -> Dict[str, Any]:
+        """Current drawdown state"""
+        return {
+            "environment": self.environment,
+            "equity": self.equity,
+            "high_water_mark": self.high_water_mark,
+            "high_water_mark_at": (
+                datetime.fromtimestamp(self.high_water_mark_at, timezone.utc) if self.high_water_mark_at else None
+            ),
+            "drawdown": self.drawdown,
+            "max_drawdown": self.max_drawdown
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get equity curve tracker statistics"""
+        return {
+            **self.get_state(),
+            "samples_in_memory": self._count,
+            "samples_recorded": self.samples_recorded,
+            "samples_written": self.samples_written,
+            "samples_pruned": self.samples_pruned,
+            "samples_pending": len(self._pending),
+            "loaded": self._loaded,
+            "load_failures": self._load_failures
+        }
+
+
+# Shared tracker per environment
+_trackers: Dict[str, EquityCurveTracker] = {}
+
+
+def get_equity_curve(paper_trading: bool) -> EquityCurveTracker:
+    """Get the shared equity curve tracker for an environment"""
+    key = "testnet" if paper_trading else "live"
+    tracker = _trackers.get(key)
+    if tracker is None:
+        tracker = EquityCurveTracker(paper_trading=paper_trading)
+        _trackers[key] = tracker
+    return tracker
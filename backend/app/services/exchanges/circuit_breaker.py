@@ -0,0 +1,242 @@
+"""
+Delta Exchange Circuit Breaker
+
+Per-endpoint-class circuit breakers, a process-wide retry budget and
+full-jitter backoff for the Delta Exchange REST client. A degraded exchange
+trips the breaker for the affected endpoint class so callers fail fast
+instead of queueing behind timeouts, and retries are capped to a fraction
+of normal traffic so they cannot multiply load during an incident.
+"""
+
+import logging
+import random
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"        # Requests flow normally
+    OPEN = "open"            # Requests fail fast
+    HALF_OPEN = "half_open"  # Limited trial requests probe recovery
+
+
+# Gauge values exported for each state
+CIRCUIT_STATE_VALUES = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2,
+}
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` consecutive transient failures, fails
+    fast for ``recovery_timeout`` seconds, then lets up to
+    ``half_open_max_calls`` trial requests through. A successful trial
+    closes the circuit; a failed one, or one still unanswered after
+    ``probe_timeout`` seconds, re-opens it. A trial abandoned by its caller
+    (cancelled) frees its slot without counting either way.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        probe_timeout: float = 30.0,
+        exchange: str = "delta_exchange",
+        environment: str = "testnet"
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.probe_timeout = probe_timeout
+        self.exchange = exchange
+        self.environment = environment
+
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes: Deque[float] = deque()  # Start times of in-flight half-open trials
+
+        # Statistics
+        self.total_failures = 0
+        self.total_rejections = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving OPEN to HALF_OPEN once the recovery timeout elapses and back on an overrun trial"""
+        now = time.monotonic()
+        if self._state == CircuitState.OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._transition(CircuitState.HALF_OPEN)
+        elif self._state == CircuitState.HALF_OPEN and self._probes and now - self._probes[0] >= self.probe_timeout:
+            logger.warning(f"⚡ Circuit [{self.environment}/{self.name}] trial request overran {self.probe_timeout:.0f}s")
+            self.total_failures += 1
+            self._transition(CircuitState.OPEN)
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit admits a trial request"""
+        if self._state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent (reserves a half-open trial slot)"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and len(self._probes) < self.half_open_max_calls:
+            self._probes.append(time.monotonic())
+            return True
+
+        self.total_rejections += 1
+        self._record_rejection()
+        return False
+
+    def record_success(self):
+        """Record a request that reached a healthy exchange"""
+        self._consecutive_failures = 0
+        if self._state == CircuitState.HALF_OPEN:
+            self._release_probe()
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self):
+        """Record a transient failure (timeout, connection error, 5xx)"""
+        self.total_failures += 1
+        self._consecutive_failures += 1
+
+        if self._state == CircuitState.HALF_OPEN:
+            self._release_probe()
+            self._transition(CircuitState.OPEN)
+        elif self._state == CircuitState.CLOSED and self._consecutive_failures >= self.failure_threshold:
+            self._transition(CircuitState.OPEN)
+
+    def record_abandoned(self):
+        """Record a request that ended without an outcome (cancelled); frees its trial slot"""
+        if self._state == CircuitState.HALF_OPEN:
+            self._release_probe()
+
+    def _release_probe(self):
+        if self._probes:
+            self._probes.popleft()
+
+    def _transition(self, new_state: CircuitState):
+        """Change state, logging and exporting the transition"""
+        if new_state == self._state:
+            return
+
+        old_state = self._state
+        self._state = new_state
+        if new_state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+        if new_state != CircuitState.HALF_OPEN:
+            self._probes.clear()
+        if new_state == CircuitState.CLOSED:
+            self._consecutive_failures = 0
+
+        log = logger.warning if new_state == CircuitState.OPEN else logger.info
+        log(f"⚡ Circuit [{self.environment}/{self.name}] {old_state.value} -> {new_state.value}")
+        self._record_state()
+
+    def _record_state(self):
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.set_circuit_breaker_state(
+                exchange=self.exchange,
+                environment=self.environment,
+                endpoint_class=self.name,
+                state_value=CIRCUIT_STATE_VALUES[self._state]
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record circuit breaker state metric: {e}")
+
+    def _record_rejection(self):
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.record_circuit_breaker_rejection(
+                exchange=self.exchange,
+                endpoint_class=self.name
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record circuit breaker rejection metric: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get circuit breaker statistics"""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._consecutive_failures,
+            "retry_after_seconds": round(self.retry_after, 3),
+            "total_failures": self.total_failures,
+            "total_rejections": self.total_rejections,
+            "times_opened": self.times_opened
+        }
+
+
+class RetryBudget:
+    """
+    Process-wide retry budget.
+
+    Every first attempt deposits ``ratio`` tokens and every retry withdraws
+    one, so retries stay below roughly ``ratio`` of request volume. A floor
+    of ``min_per_second`` retries keeps low-traffic periods retryable.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 1.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+
+        self._tokens = max_tokens * ratio
+        self._last_refill = time.monotonic()
+
+        # Statistics
+        self.retries_allowed = 0
+        self.retries_denied = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._last_refill) * self.min_per_second)
+        self._last_refill = now
+
+    def record_request(self):
+        """Deposit for a first attempt"""
+        self._refill()
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire_retry(self) -> bool:
+        """Withdraw one retry; False when the budget is exhausted"""
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.retries_allowed += 1
+            return True
+        self.retries_denied += 1
+        return False
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get retry budget statistics"""
+        self._refill()
+        return {
+            "tokens_available": round(self._tokens, 2),
+            "ratio": self.ratio,
+            "retries_allowed": self.retries_allowed,
+            "retries_denied": self.retries_denied
+        }
+
+
+def full_jitter_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(max_delay, base_delay * 2^attempt))"""
+    return random.uniform(0.0, min(max_delay, base_delay * (2 ** attempt)))
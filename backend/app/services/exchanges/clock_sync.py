@@ -0,0 +1,169 @@
+"""
+Exchange Clock Synchronization
+
+Estimates the offset between the local clock and the exchange clock so that
+request signatures and WebSocket auth timestamps are stamped in exchange
+time. Uses an NTP-style filter: each sample brackets the server timestamp
+between send and receive times, and the offset is taken from the sample
+with the lowest round-trip time in a sliding window (the least
+queueing-delay-contaminated measurement).
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ClockOffsetEstimator:
+    """Minimum-RTT clock filter over a sliding window of samples"""
+
+    def __init__(self, window: int = 8, max_rtt: float = 2.0):
+        self.max_rtt = max_rtt
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=max(1, window))  # (rtt, offset)
+        self._offset = 0.0
+        self._rtt: Optional[float] = None
+        self.samples_discarded = 0
+
+    @property
+    def offset(self) -> float:
+        """Seconds to add to the local clock to get exchange time"""
+        return self._offset
+
+    @property
+    def rtt(self) -> Optional[float]:
+        """Round-trip time of the sample the offset was taken from"""
+        return self._rtt
+
+    @property
+    def synchronized(self) -> bool:
+        return bool(self._samples)
+
+    def add_sample(self, sent_at: float, server_time: float, received_at: float) -> bool:
+        """
+        Add a measurement.
+
+        Args:
+            sent_at: Local wall-clock time the request was sent
+            server_time: Exchange timestamp from the response
+            received_at: Local wall-clock time the response arrived
+
+        Returns:
+            False if the sample was discarded (negative or excessive RTT)
+        """
+        rtt = received_at - sent_at
+        if rtt < 0 or rtt > self.max_rtt:
+            self.samples_discarded += 1
+            return False
+
+        # Assume symmetric paths: the server stamped the midpoint of the round trip
+        self._samples.append((rtt, server_time - (sent_at + received_at) / 2.0))
+        self._rtt, self._offset = min(self._samples)
+        return True
+
+    def now(self) -> float:
+        """Current exchange time estimate (seconds since the epoch)"""
+        return time.time() + self._offset
+
+
+class ClockSync:
+    """Background sampler feeding a ClockOffsetEstimator"""
+
+    def __init__(
+        self,
+        fetch_server_time: Callable[[], Awaitable[float]],
+        interval: float = 60.0,
+        window: int = 8,
+        burst: int = 4,
+        exchange: str = "delta_exchange",
+        environment: str = "testnet"
+    ):
+        self.fetch_server_time = fetch_server_time
+        self.interval = interval
+        self.burst = max(1, burst)
+        self.exchange = exchange
+        self.environment = environment
+        self.estimator = ClockOffsetEstimator(window=window)
+
+        self._task: Optional[asyncio.Task] = None
+        self._resync = asyncio.Event()
+
+    def now(self) -> float:
+        """Current exchange time estimate"""
+        return self.estimator.now()
+
+    def start(self):
+        """Start background sampling (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop background sampling"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def request_resync(self):
+        """Take a fresh burst of samples now (e.g. after a rejected signature)"""
+        self._resync.set()
+
+    async def sample(self) -> bool:
+        """Take one measurement"""
+        sent_at = time.time()
+        server_time = await self.fetch_server_time()
+        received_at = time.time()
+        accepted = self.estimator.add_sample(sent_at, server_time, received_at)
+        self._record_metrics()
+        return accepted
+
+    async def _run(self):
+        while True:
+            for _ in range(self.burst):
+                try:
+                    await self.sample()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.debug(f"Clock sync sample failed: {e}")
+
+            if self.estimator.synchronized:
+                logger.debug(
+                    f"🕐 Exchange clock [{self.environment}] offset {self.estimator.offset * 1000:+.1f}ms "
+                    f"(rtt {self.estimator.rtt * 1000:.1f}ms)"
+                )
+
+            self._resync.clear()
+            try:
+                await asyncio.wait_for(self._resync.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _record_metrics(self):
+        if not self.estimator.synchronized:
+            return
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.set_exchange_clock_offset(
+                exchange=self.exchange,
+                environment=self.environment,
+                offset_seconds=self.estimator.offset,
+                rtt_seconds=self.estimator.rtt
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record clock offset metric: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get clock sync statistics"""
+        return {
+            "synchronized": self.estimator.synchronized,
+            "offset_ms": round(self.estimator.offset * 1000, 3),
+            "rtt_ms": round(self.estimator.rtt * 1000, 3) if self.estimator.rtt is not None else None,
+            "samples_discarded": self.estimator.samples_discarded
+        }
@@ -0,0 +1,111 @@
+"""
+Delta Exchange Connector Registry
+
+Process-wide registry that hands out one shared DeltaExchangeConnector per
+environment (testnet/live). Sharing the connector shares its HTTP
+keep-alive pool, rate-limit budget and read coalescing across the risk
+manager, position manager, execution engine, orchestrator and data feed.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Any
+
+from app.config import settings
+from app.services.exchanges.delta_exchange import DeltaExchangeConnector
+
+logger = logging.getLogger(__name__)
+
+
+class DeltaConnectorRegistry:
+    """Registry of shared Delta Exchange connectors keyed by environment"""
+
+    _instance = None
+
+    def __new__(cls):
+        """Singleton pattern to ensure a single registry per process"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        """Initialize registry (singleton)"""
+        if self._initialized:
+            return
+
+        self._connectors: Dict[str, DeltaExchangeConnector] = {}
+        self._initialized = True
+
+    @staticmethod
+    def _environment_key(paper_trading: bool) -> str:
+        """Get the registry key for a trading mode"""
+        return "testnet" if paper_trading else "live"
+
+    def get_connector(self, paper_trading: Optional[bool] = None) -> DeltaExchangeConnector:
+        """
+        Get the shared connector for an environment, creating it on first use.
+
+        Args:
+            paper_trading: True for testnet, False for live (defaults to settings)
+
+        Returns:
+            Shared DeltaExchangeConnector
+        """
+        if paper_trading is None:
+            paper_trading = settings.PAPER_TRADING
+
+        key = self._environment_key(paper_trading)
+        connector = self._connectors.get(key)
+        if connector is None:
+            connector = DeltaExchangeConnector(paper_trading=paper_trading)
+            connector.shared = True
+            self._connectors[key] = connector
+            logger.info(f"Created shared Delta Exchange connector for {key}")
+
+        return connector
+
+    async def warm_up(self, paper_trading: Optional[bool] = None):
+        """Open pooled connections for an environment ahead of trading calls"""
+        connector = self.get_connector(paper_trading)
+        try:
+            await connector.warm_up(settings.DELTA_HTTP_WARMUP_CONNECTIONS)
+        except Exception as e:
+            # Warm-up is an optimisation only; never block startup on it
+            logger.warning(f"Delta Exchange connection warm-up failed: {e}")
+
+    async def close_all(self):
+        """Close every shared connector (application shutdown)"""
+        connectors = list(self._connectors.items())
+        self._connectors.clear()
+
+        results = await asyncio.gather(
+            *(connector.disconnect() for _, connector in connectors),
+            return_exceptions=True
+        )
+        for (key, _), result in zip(connectors, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error closing shared {key} connector: {result}")
+
+        logger.info(f"Closed {len(connectors)} shared Delta Exchange connector(s)")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get per-environment connector statistics"""
+        return {
+            key: {
+                "base_url": connector.base_url,
+                "session_open": connector.session is not None and not connector.session.closed,
+                "rate_limiter": connector.rate_limiter.get_statistics(),
+                **connector.get_resilience_statistics()
+            }
+            for key, connector in self._connectors.items()
+        }
+
+
+# Global singleton instance
+connector_registry = DeltaConnectorRegistry()
+
+
+def get_delta_connector(paper_trading: Optional[bool] = None) -> DeltaExchangeConnector:
+    """Get the shared Delta Exchange connector for an environment"""
+    return connector_registry.get_connector(paper_trading)
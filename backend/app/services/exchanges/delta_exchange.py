@@ -11,11 +11,11 @@ import hmac
 import json
 import logging
 import time
+from collections import OrderedDict
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, Iterable, List, Optional, Any, Union
 from urllib.parse import urlencode
-from functools import wraps
 import random
 
 import aiohttp
@@ -23,56 +23,75 @@ import websockets
 from pydantic import BaseModel
 
 from app.config import settings
+from app.services.exchanges.circuit_breaker import (
+    CircuitBreaker,
+    RetryBudget,
+    full_jitter_delay,
+)
+from app.services.exchanges.clock_sync import ClockSync
+from app.services.exchanges.fast_decode import (
+    OrderStruct,
+    PositionStruct,
+    json_loads,
+)
+from app.services.exchanges.rate_limiter import (
+    TokenBucketRateLimiter,
+    RequestPriority,
+    get_endpoint_weight,
+    get_request_priority,
+)
 
 logger = logging.getLogger(__name__)
 
+# Private WebSocket channels carrying this account's order, fill and position events
+PRIVATE_CHANNELS = ("orders", "user_trades", "positions")
+
+# Normalized order statuses after which an order can no longer change
+TERMINAL_ORDER_STATUSES = ("FILLED", "CANCELLED", "REJECTED")
+
+# Number of recent terminal order states kept for waiters that register late
+ORDER_STATE_HISTORY = 1000
+
 
 class DeltaExchangeError(Exception):
     """Delta Exchange API error"""
     pass
 
 
-def retry_with_backoff(max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0):
-    """
-    Decorator for exponential backoff retry logic
-    
-    Args:
-        max_retries: Maximum number of retry attempts
-        base_delay: Base delay in seconds
-        max_delay: Maximum delay in seconds
-    """
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            last_exception = None
-            
-            for attempt in range(max_retries + 1):
-                try:
-                    return await func(*args, **kwargs)
-                except (aiohttp.ClientError, asyncio.TimeoutError, DeltaExchangeError) as e:
-                    last_exception = e
-                    
-                    if attempt == max_retries:
-                        # Final attempt failed
-                        logger.error(f"Final retry attempt failed for {func.__name__}: {e}")
-                        raise e
-                    
-                    # Calculate delay with jitter
-                    delay = min(base_delay * (2 ** attempt), max_delay)
-                    jitter = random.uniform(0.1, 0.3) * delay
-                    total_delay = delay + jitter
-                    
-                    logger.warning(f"Retry {attempt + 1}/{max_retries} for {func.__name__} after {total_delay:.2f}s: {e}")
-                    await asyncio.sleep(total_delay)
-                except Exception as e:
-                    # Non-retryable exception
-                    logger.error(f"Non-retryable error in {func.__name__}: {e}")
-                    raise e
-            
-            # Should never reach here
-            raise last_exception
-        return wrapper
-    return decorator
+class DeltaExchangeTransientError(DeltaExchangeError):
+    """Transient failure (timeout, connection error, 5xx, 429) that may be retried"""
+    pass
+
+
+class DeltaExchangeRateLimitError(DeltaExchangeTransientError):
+    """HTTP 429 from the exchange (handled by the rate limiter, not the breaker)"""
+    pass
+
+
+class CircuitOpenError(DeltaExchangeError):
+    """Request rejected without being sent because the endpoint circuit is open"""
+    pass
+
+
+# Process-wide retry budget shared by every connector
+_retry_budget = RetryBudget(
+    ratio=settings.DELTA_RETRY_BUDGET_RATIO,
+    min_per_second=settings.DELTA_RETRY_BUDGET_MIN_PER_SECOND
+)
+
+
+# Last successful WebSocket auth variant per environment (process-wide,
+# backed by DELTA_WS_AUTH_CACHE_PATH across restarts)
+_websocket_auth_variants: Dict[str, tuple] = {}
+
+
+# Micro-TTL cache for hot read endpoints (seconds), matched by path prefix.
+# Endpoints not listed are still coalesced while in flight but never cached.
+READ_CACHE_TTLS: Dict[str, float] = {
+    "/v2/products": 300.0,
+    "/v2/tickers": 0.5,
+    "/v2/l2orderbook/": 0.25,
+}
 
 
 class OrderResponse(BaseModel):
@@ -98,6 +117,25 @@ class PositionResponse(BaseModel):
     margin: Decimal
 
 
+# Hot-path decoders return slotted structs when DELTA_FAST_DECODE is enabled
+OrderResult = Union[OrderResponse, OrderStruct]
+PositionResult = Union[PositionResponse, PositionStruct]
+
+
+def decode_order(data: Dict[str, Any]) -> OrderResult:
+    """Decode an order payload (trusted fast path or validated model)"""
+    if settings.DELTA_FAST_DECODE:
+        return OrderStruct.from_exchange(data)
+    return OrderResponse(**data)
+
+
+def decode_position(data: Dict[str, Any]) -> PositionResult:
+    """Decode a position payload (trusted fast path or validated model)"""
+    if settings.DELTA_FAST_DECODE:
+        return PositionStruct.from_exchange(data)
+    return PositionResponse(**data)
+
+
 class DeltaExchangeConnector:
     """Delta Exchange API connector with testnet/live environment switching"""
     
@@ -128,11 +166,49 @@ class DeltaExchangeConnector:
         self.is_development = False
         
         self.session: Optional[aiohttp.ClientSession] = None
+        self.shared = False  # Set by the connector registry; shared sessions outlive their users
         self.websocket: Optional[websockets.WebSocketServerProtocol] = None
+        self._ws_connect_started: Optional[float] = None
+        self._ws_first_message_pending = False
+        
+        # Rate limiting (token bucket with endpoint weights and priority classes)
+        self.rate_limiter = TokenBucketRateLimiter(
+            capacity=settings.DELTA_RATE_LIMIT_CAPACITY,
+            refill_rate=settings.DELTA_RATE_LIMIT_CAPACITY / settings.DELTA_RATE_LIMIT_WINDOW_SECONDS,
+            environment=self.environment.lower()
+        )
+        
+        # Circuit breaker per endpoint class (order/account/market_data)
+        self.circuit_breakers: Dict[RequestPriority, CircuitBreaker] = {
+            endpoint_class: CircuitBreaker(
+                name=endpoint_class.name.lower(),
+                failure_threshold=settings.DELTA_CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=settings.DELTA_CIRCUIT_RECOVERY_SECONDS,
+                half_open_max_calls=settings.DELTA_CIRCUIT_HALF_OPEN_MAX_CALLS,
+                probe_timeout=settings.DELTA_CIRCUIT_PROBE_TIMEOUT_SECONDS,
+                environment=self.environment.lower()
+            )
+            for endpoint_class in RequestPriority
+        }
+        
+        # Exchange clock offset applied to request signatures and WebSocket auth
+        self.clock_sync = ClockSync(
+            self._fetch_server_time,
+            interval=settings.DELTA_CLOCK_SYNC_INTERVAL,
+            window=settings.DELTA_CLOCK_SYNC_WINDOW,
+            environment=self.environment.lower()
+        )
         
-        # Rate limiting
-        self.rate_limit_calls = 0
-        self.rate_limit_window = 60  # 1 minute
+        # Single-flight request coalescing and micro-TTL cache for reads
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._read_cache: Dict[str, tuple] = {}
+        
+        # Private order/fill/position stream on its own authenticated WebSocket
+        self.private_websocket = None
+        self._private_stream_task: Optional[asyncio.Task] = None
+        self._order_waiters: Dict[str, List[asyncio.Future]] = {}
+        self._order_states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._private_event_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
         
         # Log environment configuration
         logger.info(f"Delta Exchange Connector initialized:")
@@ -141,7 +217,6 @@ class DeltaExchangeConnector:
         logger.info(f"  Paper Trading: {self.paper_trading}")
         logger.info(f"  API Key: {self.api_key[:8]}..." if self.api_key else "  API Key: Not configured")
         logger.info(f"  Passphrase: {'Configured' if self.passphrase else 'Not required (Delta Exchange)'}")
-        self.max_calls_per_window = 1000
     
     def __del__(self):
         """Destructor to ensure cleanup"""
@@ -164,6 +239,11 @@ class DeltaExchangeConnector:
             self.websocket_url = settings.DELTA_LIVE_WEBSOCKET_URL
             self.environment = "LIVE"
         
+        self.rate_limiter.environment = self.environment.lower()
+        for breaker in self.circuit_breakers.values():
+            breaker.environment = self.environment.lower()
+        self.clock_sync.environment = self.environment.lower()
+        self.clock_sync.request_resync()
         logger.info(f"Switched to {self.environment} environment")
         
         # Clear cache when switching environments
@@ -206,14 +286,51 @@ class DeltaExchangeConnector:
             logger.warning(f"Failed to load products cache: {e}")
     
     async def connect(self):
-        """Initialize HTTP session"""
+        """Initialize HTTP session with a tuned keep-alive connection pool"""
         if not self.session:
             timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            tcp_connector = aiohttp.TCPConnector(
+                limit=settings.DELTA_HTTP_POOL_LIMIT,
+                limit_per_host=settings.DELTA_HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=settings.DELTA_HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=settings.DELTA_HTTP_DNS_CACHE_TTL,
+                use_dns_cache=True,
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(timeout=timeout, connector=tcp_connector)
             logger.info("Delta Exchange HTTP session initialized")
+        
+        if settings.DELTA_CLOCK_SYNC_ENABLED:
+            self.clock_sync.start()
+    
+    async def warm_up(self, connections: int = 2):
+        """
+        Pre-open pooled TCP/TLS connections so trading calls skip the handshake.
+        
+        Args:
+            connections: Number of concurrent connections to establish
+        """
+        await self.connect()
+        
+        async def _open_connection():
+            async with self.session.head(self.base_url, allow_redirects=False) as response:
+                await response.release()
+        
+        start_time = time.time()
+        results = await asyncio.gather(
+            *(_open_connection() for _ in range(max(1, connections))),
+            return_exceptions=True
+        )
+        opened = sum(1 for result in results if not isinstance(result, Exception))
+        logger.info(
+            f"Delta Exchange {self.environment} warm-up: {opened}/{len(results)} connections "
+            f"in {time.time() - start_time:.3f}s"
+        )
     
     async def disconnect(self):
         """Close HTTP session and WebSocket"""
+        await self.clock_sync.stop()
+        
         # Close HTTP session
         if self.session:
             try:
@@ -224,7 +341,12 @@ class DeltaExchangeConnector:
             finally:
                 self.session = None
         
-        # Close WebSocket
+        # Close WebSockets
+        await self.disconnect_websocket()
+        await self.stop_private_stream()
+    
+    async def disconnect_websocket(self):
+        """Close the WebSocket connection only"""
         if self.websocket:
             try:
                 await self.websocket.close()
@@ -236,12 +358,16 @@ class DeltaExchangeConnector:
     
     async def cleanup(self):
         """Cleanup resources - alias for disconnect for compatibility"""
+        if self.shared:
+            # Shared connectors are closed by the registry at application shutdown
+            logger.debug("Skipping cleanup of shared Delta Exchange connector")
+            return
         await self.disconnect()
         logger.info("Delta Exchange connector cleanup completed")
     
     def _generate_signature(self, method: str, path: str, body: str = "") -> Dict[str, str]:
         """Generate authentication signature"""
-        timestamp = str(int(time.time()))
+        timestamp = str(int(self.clock_sync.now()))
         message = timestamp + method + path + body
         
         signature = hmac.new(
@@ -262,7 +388,6 @@ class DeltaExchangeConnector:
             
         return headers
     
-    @retry_with_backoff(max_retries=3, base_delay=1.0, max_delay=30.0)
     async def _make_request(
         self,
         method: str,
@@ -270,17 +395,117 @@ class DeltaExchangeConnector:
         params: Optional[Dict] = None,
         data: Optional[Dict] = None,
         timeout: float = 30.0,
-        idempotency_key: Optional[str] = None
+        idempotency_key: Optional[str] = None,
+        priority: Optional[RequestPriority] = None
+    ) -> Dict[str, Any]:
+        """
+        Make an API request through the endpoint circuit breaker with budgeted retries.
+        
+        Only transient failures are retried, with full-jitter backoff and only
+        while the process-wide retry budget allows. Order placement is retried
+        only when it carries an idempotency key. Requests to an open circuit
+        fail immediately with CircuitOpenError.
+        """
+        endpoint_class = get_request_priority(method, endpoint)
+        if priority is None:
+            priority = endpoint_class
+        breaker = self.circuit_breakers[endpoint_class]
+        
+        retryable = not (method.upper() == "POST" and endpoint_class == RequestPriority.ORDER and not idempotency_key)
+        max_retries = settings.DELTA_RETRY_MAX_ATTEMPTS if retryable else 0
+        _retry_budget.record_request()
+        
+        attempt = 0
+        while True:
+            if not breaker.allow_request():
+                raise CircuitOpenError(
+                    f"Circuit open for {breaker.name} endpoints; retry in {breaker.retry_after:.1f}s"
+                )
+            
+            try:
+                result = await self._send_request(
+                    method, endpoint, params, data, timeout, idempotency_key, priority
+                )
+                breaker.record_success()
+                return result
+            except DeltaExchangeTransientError as e:
+                if isinstance(e, DeltaExchangeRateLimitError):
+                    # The rate limiter owns 429 handling; the exchange itself is healthy
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                
+                if attempt >= max_retries:
+                    raise
+                if not _retry_budget.try_acquire_retry():
+                    self._record_retry(endpoint_class, "budget_exhausted")
+                    logger.warning(f"Retry budget exhausted; not retrying {method} {endpoint}: {e}")
+                    raise
+                
+                delay = full_jitter_delay(attempt, settings.DELTA_RETRY_BASE_DELAY, settings.DELTA_RETRY_MAX_DELAY)
+                attempt += 1
+                self._record_retry(endpoint_class, "retried")
+                logger.warning(f"Retry {attempt}/{max_retries} for {method} {endpoint} after {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+            except DeltaExchangeError:
+                # API-level rejection: the exchange answered, so the circuit stays healthy
+                breaker.record_success()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled mid-request: no verdict on the exchange, but free a half-open trial slot
+                breaker.record_abandoned()
+                raise
+    
+    def _check_signature_expiry(self, error_text: str):
+        """Resync the exchange clock and make the request retryable on a stale-timestamp rejection"""
+        if "expired_signature" in error_text or "Signature expired" in error_text:
+            logger.warning("Request signature rejected as expired; resyncing exchange clock")
+            self.clock_sync.request_resync()
+            raise DeltaExchangeTransientError(f"Signature expired: {error_text}")
+    
+    def _record_retry(self, endpoint_class: RequestPriority, outcome: str):
+        """Record a retry decision"""
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.record_exchange_retry(
+                exchange="delta_exchange",
+                endpoint_class=endpoint_class.name.lower(),
+                outcome=outcome
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record retry metric: {e}")
+    
+    def get_resilience_statistics(self) -> Dict[str, Any]:
+        """Get circuit breaker and retry budget statistics"""
+        return {
+            "clock_sync": self.clock_sync.get_statistics(),
+            "circuit_breakers": {
+                breaker.name: breaker.get_statistics() for breaker in self.circuit_breakers.values()
+            },
+            "retry_budget": _retry_budget.get_statistics()
+        }
+    
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        timeout: float = 30.0,
+        idempotency_key: Optional[str] = None,
+        priority: Optional[RequestPriority] = None
     ) -> Dict[str, Any]:
-        """Make authenticated API request with timeout, retries, and idempotency"""
+        """Send one authenticated API request with timeout and idempotency"""
         if not self.session:
             await self.connect()
         
-        # Rate limiting check
-        if self.rate_limit_calls >= self.max_calls_per_window:
-            logger.warning("Rate limit reached, waiting...")
-            await asyncio.sleep(60)
-            self.rate_limit_calls = 0
+        # Rate limiting: wait for endpoint-weighted tokens, orders ahead of market data
+        if priority is None:
+            priority = get_request_priority(method, endpoint)
+        await self.rate_limiter.acquire(get_endpoint_weight(method, endpoint), priority)
         
         url = f"{self.base_url}{endpoint}"
         
@@ -312,8 +537,8 @@ class DeltaExchangeConnector:
             async with self.session.request(
                 method, url, headers=headers, data=body, timeout=timeout_obj
             ) as response:
-                self.rate_limit_calls += 1
                 response_time = time.time() - start_time
+                self.rate_limiter.update_from_headers(response.headers, response.status)
                 
                 # Record exchange request metrics
                 from app.services.metrics_service import metrics_service
@@ -325,29 +550,105 @@ class DeltaExchangeConnector:
                 
                 # Handle response
                 if response.status == 200:
-                    result = await response.json()
+                    result = json_loads(await response.read())
                     if result.get("success"):
                         logger.debug(f"Delta Exchange API success: {method} {endpoint} ({response_time:.3f}s)")
                         return result.get("result", {})
                     else:
                         error_msg = result.get('error', 'Unknown error')
                         logger.error(f"Delta Exchange API error: {error_msg}")
+                        self._check_signature_expiry(str(error_msg))
                         raise DeltaExchangeError(f"API error: {error_msg}")
                 elif response.status == 429:
                     # Rate limited
                     logger.warning(f"Rate limited by Delta Exchange: {endpoint}")
-                    raise DeltaExchangeError(f"Rate limited: {response.status}")
+                    raise DeltaExchangeRateLimitError(f"Rate limited: {response.status}")
+                elif response.status >= 500:
+                    error_text = await response.text()
+                    logger.error(f"Delta Exchange HTTP error: {response.status} - {error_text}")
+                    raise DeltaExchangeTransientError(f"HTTP {response.status}: {error_text}")
                 else:
                     error_text = await response.text()
                     logger.error(f"Delta Exchange HTTP error: {response.status} - {error_text}")
+                    self._check_signature_expiry(error_text)
                     raise DeltaExchangeError(f"HTTP {response.status}: {error_text}")
                     
         except asyncio.TimeoutError:
             logger.error(f"Timeout after {timeout}s for {method} {endpoint}")
-            raise DeltaExchangeError(f"Request timeout after {timeout}s")
+            raise DeltaExchangeTransientError(f"Request timeout after {timeout}s")
         except aiohttp.ClientError as e:
             logger.error(f"Connection error for {method} {endpoint}: {e}")
-            raise DeltaExchangeError(f"Connection error: {e}")
+            raise DeltaExchangeTransientError(f"Connection error: {e}")
+    
+    async def _coalesced_get(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        cache_ttl: Optional[float] = None
+    ) -> Any:
+        """
+        GET with single-flight coalescing and an optional micro-TTL cache.
+        
+        Concurrent identical GETs share one in-flight HTTP request, and
+        results for endpoints in READ_CACHE_TTLS are reused for a short
+        TTL. Returned objects are shared between callers and must be
+        treated as read-only.
+        """
+        key = endpoint + ("?" + urlencode(sorted(params.items())) if params else "")
+        
+        if cache_ttl is None:
+            cache_ttl = self._get_read_cache_ttl(endpoint)
+        
+        if cache_ttl > 0:
+            cached = self._read_cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                self._record_coalescing("cache_hit")
+                return cached[1]
+        
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._record_coalescing("coalesced")
+            return await asyncio.shield(in_flight)
+        
+        self._record_coalescing("miss")
+        task = asyncio.ensure_future(self._make_request("GET", endpoint, params=params))
+        self._in_flight[key] = task
+        
+        def _on_done(done: asyncio.Future):
+            if self._in_flight.get(key) is done:
+                del self._in_flight[key]
+            if cache_ttl > 0 and not done.cancelled() and done.exception() is None:
+                self._read_cache[key] = (time.monotonic() + cache_ttl, done.result())
+        
+        task.add_done_callback(_on_done)
+        
+        # Shield so one cancelled caller does not cancel the request for the others
+        return await asyncio.shield(task)
+    
+    def _get_read_cache_ttl(self, endpoint: str) -> float:
+        """Get the micro-TTL for a read endpoint (0 disables caching)"""
+        if not settings.DELTA_READ_CACHE_ENABLED:
+            return 0.0
+        for prefix, ttl in READ_CACHE_TTLS.items():
+            if endpoint.startswith(prefix):
+                return ttl
+        return 0.0
+    
+    def invalidate_read_cache(self, prefix: str = ""):
+        """Drop cached read responses whose key starts with prefix"""
+        for key in [k for k in self._read_cache if k.startswith(prefix)]:
+            del self._read_cache[key]
+    
+    def _record_coalescing(self, result: str):
+        """Record single-flight/cache outcome for a read"""
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.record_exchange_read_coalescing(
+                exchange="delta_exchange",
+                result=result
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record coalescing metric: {e}")
     
     # =============================================================================
     # MARKET DATA METHODS
@@ -375,12 +676,23 @@ class DeltaExchangeConnector:
     
     async def get_ticker(self, symbol: str) -> Dict[str, Any]:
         """Get ticker data for symbol"""
-        return await self._make_request("GET", f"/v2/tickers/{symbol}")
+        return await self._coalesced_get(f"/v2/tickers/{symbol}")
+    
+    async def get_tickers(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Get tickers for all products in one request, keyed by symbol (optionally filtered)"""
+        response = await self._coalesced_get("/v2/tickers")
+        tickers = response.get('result', []) if isinstance(response, dict) else response
+        wanted = set(symbols) if symbols is not None else None
+        return {
+            ticker["symbol"]: ticker
+            for ticker in tickers or []
+            if ticker.get("symbol") and (wanted is None or ticker["symbol"] in wanted)
+        }
     
     async def get_orderbook(self, symbol: str, depth: int = 20) -> Dict[str, Any]:
         """Get order book for symbol"""
         params = {"depth": depth}
-        return await self._make_request("GET", f"/v2/l2orderbook/{symbol}", params=params)
+        return await self._coalesced_get(f"/v2/l2orderbook/{symbol}", params=params)
     
     async def get_trades(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent trades for symbol"""
@@ -398,7 +710,7 @@ class DeltaExchangeConnector:
         # Delta Exchange uses v2 API and requires product_id
         # First get the product_id for the symbol
         try:
-            products_response = await self._make_request("GET", "/v2/products")
+            products_response = await self._coalesced_get("/v2/products")
             product_id = None
             
             # Handle the response format: {"result": [...], "success": true}
@@ -535,9 +847,10 @@ class DeltaExchangeConnector:
     async def get_account_balance(self) -> Dict[str, Any]:
         """Get account balance information"""
         try:
-            response = await self._make_request("GET", "/v2/wallet/balances")
-            if isinstance(response, dict) and 'result' in response:
-                balances = response.get('result', [])
+            response = await self._coalesced_get("/v2/wallet/balances")
+            # _make_request unwraps "result"; accept the raw envelope as well
+            balances = response.get('result', []) if isinstance(response, dict) else response
+            if isinstance(balances, list):
                 # Find USDT balance for main account balance
                 for balance in balances:
                     if balance.get('asset_symbol') == 'USDT':
@@ -555,7 +868,7 @@ class DeltaExchangeConnector:
     async def get_positions(self) -> List[Dict[str, Any]]:
         """Get open positions"""
         try:
-            response = await self._make_request("GET", "/v2/positions")
+            response = await self._coalesced_get("/v2/positions")
             if isinstance(response, dict) and 'result' in response:
                 return response.get('result', [])
             elif isinstance(response, list):
@@ -565,12 +878,12 @@ class DeltaExchangeConnector:
             logger.error(f"Failed to get positions: {e}")
             return []
     
-    async def get_position(self, symbol: str) -> Optional[PositionResponse]:
+    async def get_position(self, symbol: str) -> Optional[PositionResult]:
         """Get specific position"""
         positions = await self.get_positions()
-        for position in positions:
-            if position.symbol == symbol:
-                return position
+        for position_data in positions:
+            if symbol in (position_data.get("product_symbol"), position_data.get("symbol")):
+                return decode_position(position_data)
         return None
     
     # =============================================================================
@@ -586,10 +899,31 @@ class DeltaExchangeConnector:
         price: Optional[Union[Decimal, float, str]] = None,
         time_in_force: str = "gtc",
         reduce_only: bool = False,
-        post_only: bool = False
-    ) -> OrderResponse:
-        """Place a new order"""
+        post_only: bool = False,
+        stop_price: Optional[Union[Decimal, float, str]] = None
+    ) -> OrderResult:
+        """Place a new order (stop_market / stop_limit orders trigger at stop_price)"""
         
+        order_data = self._build_order_data(
+            symbol, side, size, order_type, price, time_in_force, reduce_only, post_only, stop_price
+        )
+        
+        response = await self._make_request("POST", "/orders", data=order_data)
+        return decode_order(response)
+    
+    def _build_order_data(
+        self,
+        symbol: str,
+        side: str,
+        size: Union[Decimal, float, str],
+        order_type: str = "market",
+        price: Optional[Union[Decimal, float, str]] = None,
+        time_in_force: str = "gtc",
+        reduce_only: bool = False,
+        post_only: bool = False,
+        stop_price: Optional[Union[Decimal, float, str]] = None
+    ) -> Dict[str, Any]:
+        """Build the exchange order payload"""
         order_data = {
             "product_id": symbol,
             "side": side.lower(),
@@ -603,8 +937,157 @@ class DeltaExchangeConnector:
         if price and order_type.lower() in ["limit", "stop_limit"]:
             order_data["limit_price"] = str(price)
         
-        response = await self._make_request("POST", "/orders", data=order_data)
-        return OrderResponse(**response)
+        if stop_price and order_type.lower() in ["stop_market", "stop_limit"]:
+            order_data["stop_price"] = str(stop_price)
+        
+        return order_data
+    
+    async def place_batch_orders(
+        self,
+        orders: List[Dict[str, Any]],
+        unwind_on_failure: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Place several orders as one unit (multi-leg entry).
+        
+        Orders for a single product go through the exchange batch endpoint
+        in one round trip; legs on different products are submitted
+        concurrently. If any leg fails, the legs that were accepted are
+        cancelled (resting) or flattened with reduce-only market orders
+        (filled).
+        
+        Args:
+            orders: Order specs with place_order keyword arguments
+                (symbol, side, size, order_type, price, ...)
+            unwind_on_failure: Cancel/unwind accepted legs when any leg fails
+        
+        Returns:
+            Dict with overall success, per-leg results and unwind results
+        """
+        if not orders:
+            return {"success": True, "legs": [], "unwound": []}
+        
+        start_time = time.time()
+        symbols = {order["symbol"] for order in orders}
+        
+        if len(symbols) == 1 and len(orders) > 1:
+            legs = await self._submit_batch_endpoint(orders)
+        else:
+            legs = await self._submit_legs_concurrently(orders)
+        
+        success = all(leg["success"] for leg in legs)
+        unwound = []
+        if not success and unwind_on_failure:
+            unwound = await self._unwind_legs([leg for leg in legs if leg["success"]])
+        
+        logger.info(
+            f"Batch order {'placed' if success else 'failed'}: "
+            f"{sum(1 for leg in legs if leg['success'])}/{len(legs)} legs in {time.time() - start_time:.3f}s"
+        )
+        
+        return {"success": success, "legs": legs, "unwound": unwound}
+    
+    async def _submit_batch_endpoint(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Submit same-product legs through the exchange batch endpoint"""
+        batch_data = {
+            "product_id": orders[0]["symbol"],
+            "orders": [
+                {key: value for key, value in self._build_order_data(**order).items() if key != "product_id"}
+                for order in orders
+            ]
+        }
+        
+        try:
+            response = await self._make_request("POST", "/v2/orders/batch", data=batch_data)
+            results = response if isinstance(response, list) else response.get("orders", [])
+        except Exception as e:
+            logger.error(f"Batch order endpoint failed: {e}")
+            return [
+                {"index": i, "symbol": order["symbol"], "success": False, "order": None, "error": str(e)}
+                for i, order in enumerate(orders)
+            ]
+        
+        if len(results) != len(orders):
+            logger.error(f"Batch order endpoint returned {len(results)} results for {len(orders)} legs")
+        return [
+            self._batch_leg(i, order, results[i] if i < len(results) else None)
+            for i, order in enumerate(orders)
+        ]
+    
+    def _batch_leg(self, index: int, order: Dict[str, Any], result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Per-leg result of a batch submission; missing, errored or rejected legs are failures"""
+        leg = {"index": index, "symbol": order["symbol"], "success": False, "order": None, "error": None}
+        if not isinstance(result, dict):
+            leg["error"] = "No result returned for leg"
+        elif result.get("success") is False or result.get("error"):
+            leg["error"] = str(result.get("error") or "Leg rejected")
+        elif (failure := self._leg_failure(result)) is not None:
+            leg["error"] = failure
+        else:
+            leg.update(success=True, order=decode_order(result))
+        
+        if not leg["success"]:
+            logger.error(f"Batch leg {index} ({order['symbol']}) failed: {leg['error']}")
+        return leg
+    
+    def _leg_failure(self, order_data: Dict[str, Any]) -> Optional[str]:
+        """Why an accepted leg holds no order (rejected, or cancelled with nothing filled); None if it does"""
+        status = self._normalize_order_state(order_data)
+        if status["status"] == "REJECTED" or (status["status"] == "CANCELLED" and not status["fill_size"]):
+            return f"Leg {status['status'].lower()} by exchange"
+        return None
+    
+    async def _submit_legs_concurrently(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Submit legs on different products concurrently"""
+        results = await asyncio.gather(
+            *(self.place_order(**order) for order in orders),
+            return_exceptions=True
+        )
+        
+        legs = []
+        for i, (order, result) in enumerate(zip(orders, results)):
+            if isinstance(result, BaseException):
+                error = str(result)
+            else:
+                # Without an unfilled size (validated model), assume nothing filled
+                error = self._leg_failure({
+                    "state": result.status,
+                    "size": result.size,
+                    "unfilled_size": getattr(result, "unfilled_size", result.size)
+                })
+            
+            if error is None:
+                legs.append({"index": i, "symbol": order["symbol"], "success": True, "order": result, "error": None})
+            else:
+                logger.error(f"Leg {i} ({order['symbol']}) failed: {error}")
+                legs.append({"index": i, "symbol": order["symbol"], "success": False, "order": None, "error": error})
+        return legs
+    
+    async def _unwind_legs(self, legs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Cancel resting legs and flatten filled legs after a partial multi-leg failure"""
+        
+        async def _unwind(leg: Dict[str, Any]) -> Dict[str, Any]:
+            order: OrderResult = leg["order"]
+            try:
+                if order.status.lower() in ("open", "pending"):
+                    await self.cancel_order(order.id)
+                    action = "cancelled"
+                else:
+                    await self.place_order(
+                        symbol=order.symbol,
+                        side="sell" if order.side.lower() == "buy" else "buy",
+                        size=order.size,
+                        order_type="market",
+                        reduce_only=True
+                    )
+                    action = "flattened"
+                logger.warning(f"Unwound leg {leg['index']} ({order.symbol}): {action}")
+                return {"index": leg["index"], "order_id": order.id, "action": action, "success": True}
+            except Exception as e:
+                logger.critical(f"🚨 Failed to unwind leg {leg['index']} ({order.symbol}, order {order.id}): {e}")
+                return {"index": leg["index"], "order_id": order.id, "action": "failed", "success": False, "error": str(e)}
+        
+        return list(await asyncio.gather(*(_unwind(leg) for leg in legs)))
     
     async def cancel_order(self, order_id: str) -> Dict[str, Any]:
         """Cancel an order"""
@@ -623,7 +1106,7 @@ class DeltaExchangeConnector:
         symbol: Optional[str] = None,
         status: Optional[str] = None,
         limit: int = 100
-    ) -> List[OrderResponse]:
+    ) -> List[OrderResult]:
         """Get orders"""
         params = {"limit": limit}
         if symbol:
@@ -632,12 +1115,27 @@ class DeltaExchangeConnector:
             params["state"] = status
         
         orders_data = await self._make_request("GET", "/orders", params=params)
-        return [OrderResponse(**order) for order in orders_data]
+        return [decode_order(order) for order in orders_data]
     
-    async def get_order(self, order_id: str) -> OrderResponse:
+    async def get_order(self, order_id: str) -> OrderResult:
         """Get specific order"""
-        order_data = await self._make_request("GET", f"/orders/{order_id}")
-        return OrderResponse(**order_data)
+        order_data = await self._coalesced_get(f"/orders/{order_id}")
+        return decode_order(order_data)
+    
+    async def get_order_status(self, order_id: str) -> Dict[str, Any]:
+        """
+        Get normalized order status, preferring the private stream's latest state.
+        
+        Returns:
+            Dict with status (OPEN/PARTIALLY_FILLED/FILLED/CANCELLED/REJECTED),
+            fill_price and fill_size
+        """
+        state = self._order_states.get(str(order_id))
+        if state and state["status"] in TERMINAL_ORDER_STATUSES:
+            return state
+        
+        order_data = await self._coalesced_get(f"/orders/{order_id}")
+        return self._update_order_state(order_data)
     
     # =============================================================================
     # OPTIONS TRADING METHODS
@@ -653,19 +1151,45 @@ class DeltaExchangeConnector:
         size: Union[Decimal, float, str],
         order_type: str = "market",
         price: Optional[Union[Decimal, float, str]] = None
-    ) -> OrderResponse:
+    ) -> OrderResult:
         """Place options order"""
         
+        return await self.place_order(
+            **self._options_order_spec(symbol, option_type, strike, expiry, side, size, order_type, price)
+        )
+    
+    def _options_order_spec(
+        self,
+        symbol: str,
+        option_type: str,
+        strike: Union[Decimal, float, str],
+        expiry: str,
+        side: str,
+        size: Union[Decimal, float, str],
+        order_type: str = "market",
+        price: Optional[Union[Decimal, float, str]] = None
+    ) -> Dict[str, Any]:
+        """Build place_order arguments for an options leg"""
         # Construct options symbol
         options_symbol = f"{symbol}_{strike}_{option_type.upper()}_{expiry}"
         
-        return await self.place_order(
-            symbol=options_symbol,
-            side=side,
-            size=size,
-            order_type=order_type,
-            price=price
-        )
+        return {
+            "symbol": options_symbol,
+            "side": side,
+            "size": size,
+            "order_type": order_type,
+            "price": price
+        }
+    
+    async def _place_multi_leg(self, legs: List[Dict[str, Any]], strategy: str) -> List[OrderResult]:
+        """Place option legs as one batch and raise if the position could not be fully opened"""
+        result = await self.place_batch_orders(legs)
+        
+        if not result["success"]:
+            errors = "; ".join(leg["error"] for leg in result["legs"] if leg["error"])
+            raise DeltaExchangeError(f"{strategy} failed and was unwound: {errors}")
+        
+        return [leg["order"] for leg in result["legs"]]
     
     async def place_straddle(
         self,
@@ -674,30 +1198,15 @@ class DeltaExchangeConnector:
         expiry: str,
         size: Union[Decimal, float, str],
         order_type: str = "market"
-    ) -> List[OrderResponse]:
+    ) -> List[OrderResult]:
         """Place straddle (buy call and put at same strike)"""
         
-        call_order = await self.place_options_order(
-            symbol=symbol,
-            option_type="CALL",
-            strike=strike,
-            expiry=expiry,
-            side="buy",
-            size=size,
-            order_type=order_type
-        )
-        
-        put_order = await self.place_options_order(
-            symbol=symbol,
-            option_type="PUT",
-            strike=strike,
-            expiry=expiry,
-            side="buy",
-            size=size,
-            order_type=order_type
-        )
+        legs = [
+            self._options_order_spec(symbol, "CALL", strike, expiry, "buy", size, order_type),
+            self._options_order_spec(symbol, "PUT", strike, expiry, "buy", size, order_type),
+        ]
         
-        return [call_order, put_order]
+        return await self._place_multi_leg(legs, "Straddle")
     
     async def place_iron_condor(
         self,
@@ -707,32 +1216,19 @@ class DeltaExchangeConnector:
         call_strikes: tuple,  # (short_strike, long_strike)
         put_strikes: tuple,   # (short_strike, long_strike)
         order_type: str = "market"
-    ) -> List[OrderResponse]:
+    ) -> List[OrderResult]:
         """Place iron condor strategy"""
         
-        orders = []
-        
-        # Sell call spread
-        orders.append(await self.place_options_order(
-            symbol=symbol, option_type="CALL", strike=call_strikes[0],
-            expiry=expiry, side="sell", size=size, order_type=order_type
-        ))
-        orders.append(await self.place_options_order(
-            symbol=symbol, option_type="CALL", strike=call_strikes[1],
-            expiry=expiry, side="buy", size=size, order_type=order_type
-        ))
-        
-        # Sell put spread
-        orders.append(await self.place_options_order(
-            symbol=symbol, option_type="PUT", strike=put_strikes[0],
-            expiry=expiry, side="sell", size=size, order_type=order_type
-        ))
-        orders.append(await self.place_options_order(
-            symbol=symbol, option_type="PUT", strike=put_strikes[1],
-            expiry=expiry, side="buy", size=size, order_type=order_type
-        ))
-        
-        return orders
+        legs = [
+            # Sell call spread
+            self._options_order_spec(symbol, "CALL", call_strikes[0], expiry, "sell", size, order_type),
+            self._options_order_spec(symbol, "CALL", call_strikes[1], expiry, "buy", size, order_type),
+            # Sell put spread
+            self._options_order_spec(symbol, "PUT", put_strikes[0], expiry, "sell", size, order_type),
+            self._options_order_spec(symbol, "PUT", put_strikes[1], expiry, "buy", size, order_type),
+        ]
+        
+        return await self._place_multi_leg(legs, "Iron condor")
     
     # =============================================================================
     # WEBSOCKET METHODS
@@ -740,102 +1236,184 @@ class DeltaExchangeConnector:
     
     async def connect_websocket(self):
         """Connect to Delta Exchange WebSocket"""
+        connect_started = time.monotonic()
+        self.websocket = await self._open_authenticated_websocket()
+        self._ws_connect_started = connect_started
+        self._ws_first_message_pending = True
+    
+    async def _open_authenticated_websocket(self):
+        """Open a WebSocket connection and authenticate it"""
         try:
-            self.websocket = await websockets.connect(self.websocket_url)
+            connect_started = time.monotonic()
+            websocket = await websockets.connect(self.websocket_url)
             logger.info("Connected to Delta Exchange WebSocket")
             
-            # Try different authentication formats and API key field names
+            # Try the auth variant that last succeeded for this environment first
+            auth_variant = self._load_websocket_auth_variant()
             auth_success = False
-            signature_formats = ["http_api", "timestamp_only", "timestamp_key"]
-            api_key_fields = ["api-key", "apiKey", "api_key", "key", "ApiKey", "API_KEY", "access_key", "accessKey"]
-            auth_message_types = ["auth", "authenticate", "login"]
             
-            for auth_type in auth_message_types:
-                for api_key_field in api_key_fields:
-                    for format_type in signature_formats:
-                        try:
-                            # Generate timestamp once for both signature and auth payload
-                            timestamp = str(int(time.time()))
-                            
-                            # Authenticate WebSocket with different field names and message types
-                            auth_payload = {
-                                api_key_field: self.api_key,
-                                "signature": self._generate_websocket_signature(timestamp, format_type),
-                                "timestamp": timestamp
-                            }
-                            
-                            # Only add passphrase if it's provided (Delta Exchange doesn't require it)
-                            if self.passphrase:
-                                auth_payload["passphrase"] = self.passphrase
-                            
-                            auth_message = {
-                                "type": auth_type,
-                                "payload": auth_payload
-                            }
-                            
-                            logger.info(f"Trying WebSocket auth: type='{auth_type}', field='{api_key_field}', format='{format_type}'")
-                            await self.websocket.send(json.dumps(auth_message))
-                            
-                            # Wait for response with timeout
-                            try:
-                                response = await asyncio.wait_for(self.websocket.recv(), timeout=5.0)
-                                auth_response = json.loads(response)
-                                
-                                # Check for various success indicators
-                                if (auth_response.get("type") == auth_type and auth_response.get("success")) or \
-                                   auth_response.get("status") == "success" or \
-                                   auth_response.get("authenticated") == True or \
-                                   "success" in str(auth_response).lower():
-                                    logger.info(f"WebSocket authentication successful: type='{auth_type}', field='{api_key_field}', format='{format_type}'")
-                                    auth_success = True
-                                    break
-                                else:
-                                    logger.debug(f"WebSocket auth failed: type='{auth_type}', field='{api_key_field}', format='{format_type}' -> {auth_response}")
-                                    
-                            except asyncio.TimeoutError:
-                                logger.debug(f"WebSocket auth timeout: type='{auth_type}', field='{api_key_field}', format='{format_type}'")
-                                continue
-                                
-                        except Exception as format_error:
-                            logger.debug(f"WebSocket auth error: type='{auth_type}', field='{api_key_field}', format='{format_type}' -> {format_error}")
-                            continue
-                    
-                    if auth_success:
-                        break
-                
-                if auth_success:
-                    break
+            if auth_variant:
+                auth_success = await self._try_websocket_auth(websocket, *auth_variant)
+                if not auth_success:
+                    logger.warning(f"Cached WebSocket auth variant {auth_variant} failed, probing")
             
-            if not auth_success:
-                # Try one more approach - direct payload without wrapper
-                try:
-                    logger.info("Trying direct authentication payload (no wrapper)")
-                    timestamp = str(int(time.time()))
-                    direct_auth = {
-                        "apiKey": self.api_key,
-                        "signature": self._generate_websocket_signature(timestamp, "http_api"),
-                        "timestamp": timestamp
-                    }
-                    
-                    await self.websocket.send(json.dumps(direct_auth))
-                    response = await asyncio.wait_for(self.websocket.recv(), timeout=5.0)
-                    auth_response = json.loads(response)
-                    
-                    if "success" in str(auth_response).lower() or not auth_response.get("error"):
-                        logger.info("WebSocket authentication successful with direct payload")
-                        auth_success = True
-                    else:
-                        logger.debug(f"Direct auth failed: {auth_response}")
-                        
-                except Exception as e:
-                    logger.debug(f"Direct auth error: {e}")
+            # Exhaustive probe is a diagnostic fallback only
+            if not auth_success and settings.DELTA_WS_AUTH_PROBE_FALLBACK:
+                auth_variant = await self._probe_websocket_auth(websocket)
+                if auth_variant:
+                    auth_success = True
+                    self._save_websocket_auth_variant(auth_variant)
             
             if not auth_success:
+                await websocket.close()
                 raise DeltaExchangeError("WebSocket authentication failed with all methods")
+            
+            self._record_websocket_auth_time(time.monotonic() - connect_started)
+            return websocket
                 
         except Exception as e:
             logger.error(f"WebSocket connection failed: {e}")
             raise DeltaExchangeError(f"WebSocket connection failed: {e}")
+    
+    async def _try_websocket_auth(
+        self,
+        websocket,
+        auth_type: str,
+        api_key_field: str,
+        format_type: str,
+        timeout: float = 5.0
+    ) -> bool:
+        """Send one WebSocket auth variant and wait for the reply"""
+        try:
+            # Generate timestamp once for both signature and auth payload
+            timestamp = str(int(self.clock_sync.now()))
+            
+            if auth_type == "direct":
+                # Direct payload without wrapper
+                auth_message = {
+                    api_key_field: self.api_key,
+                    "signature": self._generate_websocket_signature(timestamp, format_type),
+                    "timestamp": timestamp
+                }
+            else:
+                auth_payload = {
+                    api_key_field: self.api_key,
+                    "signature": self._generate_websocket_signature(timestamp, format_type),
+                    "timestamp": timestamp
+                }
+                
+                # Only add passphrase if it's provided (Delta Exchange doesn't require it)
+                if self.passphrase:
+                    auth_payload["passphrase"] = self.passphrase
+                
+                auth_message = {
+                    "type": auth_type,
+                    "payload": auth_payload
+                }
+            
+            logger.debug(f"Trying WebSocket auth: type='{auth_type}', field='{api_key_field}', format='{format_type}'")
+            await websocket.send(json.dumps(auth_message))
+            
+            response = await asyncio.wait_for(websocket.recv(), timeout=timeout)
+            auth_response = json.loads(response)
+            
+            if auth_type == "direct":
+                success = "success" in str(auth_response).lower() or not auth_response.get("error")
+            else:
+                # Check for various success indicators
+                success = (auth_response.get("type") == auth_type and auth_response.get("success")) or \
+                    auth_response.get("status") == "success" or \
+                    auth_response.get("authenticated") == True or \
+                    "success" in str(auth_response).lower()
+            
+            if success:
+                logger.info(f"WebSocket authentication successful: type='{auth_type}', field='{api_key_field}', format='{format_type}'")
+            else:
+                logger.debug(f"WebSocket auth failed: type='{auth_type}', field='{api_key_field}', format='{format_type}' -> {auth_response}")
+            return success
+            
+        except asyncio.TimeoutError:
+            logger.debug(f"WebSocket auth timeout: type='{auth_type}', field='{api_key_field}', format='{format_type}'")
+            return False
+        except Exception as e:
+            logger.debug(f"WebSocket auth error: type='{auth_type}', field='{api_key_field}', format='{format_type}' -> {e}")
+            return False
+    
+    async def _probe_websocket_auth(self, websocket) -> Optional[tuple]:
+        """Try every known auth message/field/signature variant (diagnostic fallback)"""
+        signature_formats = ["http_api", "timestamp_only", "timestamp_key"]
+        api_key_fields = ["api-key", "apiKey", "api_key", "key", "ApiKey", "API_KEY", "access_key", "accessKey"]
+        auth_message_types = ["auth", "authenticate", "login"]
+        
+        logger.info("Probing WebSocket authentication variants")
+        for auth_type in auth_message_types:
+            for api_key_field in api_key_fields:
+                for format_type in signature_formats:
+                    if await self._try_websocket_auth(websocket, auth_type, api_key_field, format_type):
+                        return (auth_type, api_key_field, format_type)
+        
+        # Try one more approach - direct payload without wrapper
+        logger.info("Trying direct authentication payload (no wrapper)")
+        if await self._try_websocket_auth(websocket, "direct", "apiKey", "http_api"):
+            return ("direct", "apiKey", "http_api")
+        
+        return None
+    
+    def _websocket_auth_cache_key(self) -> str:
+        """Cache key for the auth variant (environment plus API key prefix)"""
+        return f"{self.environment}:{(self.api_key or '')[:8]}"
+    
+    def _load_websocket_auth_variant(self) -> Optional[tuple]:
+        """Load the last successful WebSocket auth variant for this environment"""
+        key = self._websocket_auth_cache_key()
+        variant = _websocket_auth_variants.get(key)
+        if variant:
+            return variant
+        
+        try:
+            with open(settings.DELTA_WS_AUTH_CACHE_PATH, "r") as f:
+                cached = json.load(f).get(key)
+            if cached and len(cached) == 3:
+                variant = tuple(cached)
+                _websocket_auth_variants[key] = variant
+                return variant
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"Could not read WebSocket auth cache: {e}")
+        return None
+    
+    def _save_websocket_auth_variant(self, variant: tuple):
+        """Persist the successful WebSocket auth variant for this environment"""
+        key = self._websocket_auth_cache_key()
+        _websocket_auth_variants[key] = variant
+        
+        try:
+            try:
+                with open(settings.DELTA_WS_AUTH_CACHE_PATH, "r") as f:
+                    cache = json.load(f)
+            except (FileNotFoundError, ValueError):
+                cache = {}
+            cache[key] = list(variant)
+            with open(settings.DELTA_WS_AUTH_CACHE_PATH, "w") as f:
+                json.dump(cache, f)
+            logger.info(f"Saved WebSocket auth variant for {self.environment}: {variant}")
+        except Exception as e:
+            logger.warning(f"Could not persist WebSocket auth variant: {e}")
+    
+    def _record_websocket_auth_time(self, duration_seconds: float):
+        """Record WebSocket connect-to-authenticated time"""
+        logger.info(f"WebSocket authenticated in {duration_seconds:.3f}s")
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.record_websocket_timing(
+                exchange="delta_exchange",
+                environment=self.environment.lower(),
+                stage="authenticated",
+                duration_seconds=duration_seconds
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record WebSocket auth metric: {e}")
 
     def _generate_websocket_signature(self, timestamp: str, format_type: str = "http_api") -> str:
         """Generate WebSocket authentication signature"""
@@ -920,6 +1498,8 @@ class DeltaExchangeConnector:
         
         try:
             async for message in self.websocket:
+                if self._ws_first_message_pending:
+                    self._record_first_websocket_message()
                 data = json.loads(message)
                 await callback(data)
                 
@@ -930,6 +1510,209 @@ class DeltaExchangeConnector:
             logger.error(f"WebSocket error: {e}")
             raise DeltaExchangeError(f"WebSocket error: {e}")
     
+    def _record_first_websocket_message(self):
+        """Record (re)connect-to-first-message latency for the feed"""
+        self._ws_first_message_pending = False
+        if self._ws_connect_started is None:
+            return
+        
+        duration = time.monotonic() - self._ws_connect_started
+        logger.info(f"WebSocket first message {duration:.3f}s after connect")
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.record_websocket_timing(
+                exchange="delta_exchange",
+                environment=self.environment.lower(),
+                stage="first_message",
+                duration_seconds=duration
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record WebSocket first message metric: {e}")
+    
+    # =============================================================================
+    # PRIVATE ORDER STREAM
+    # =============================================================================
+    
+    @property
+    def private_stream_connected(self) -> bool:
+        """Whether the private order/fill stream is currently connected"""
+        return self.private_websocket is not None
+    
+    def start_private_stream(self):
+        """Start the private order/fill/position stream (idempotent)"""
+        if not settings.DELTA_PRIVATE_STREAM_ENABLED:
+            return
+        if self._private_stream_task is None or self._private_stream_task.done():
+            self._private_stream_task = asyncio.create_task(self._private_stream_loop())
+            logger.info(f"Starting Delta Exchange {self.environment} private order stream")
+    
+    async def stop_private_stream(self):
+        """Stop the private stream and close its WebSocket"""
+        if self._private_stream_task and not self._private_stream_task.done():
+            self._private_stream_task.cancel()
+            try:
+                await self._private_stream_task
+            except asyncio.CancelledError:
+                pass
+        self._private_stream_task = None
+        
+        if self.private_websocket:
+            try:
+                await self.private_websocket.close()
+            except Exception as e:
+                logger.warning(f"Error closing private WebSocket: {e}")
+            finally:
+                self.private_websocket = None
+    
+    async def _private_stream_loop(self):
+        """Keep the private stream connected, reconnecting with backoff"""
+        delay = 1.0
+        while True:
+            try:
+                websocket = await self._open_authenticated_websocket()
+                await websocket.send(json.dumps({
+                    "type": "subscribe",
+                    "payload": {
+                        "channels": [{"name": name, "symbols": ["all"]} for name in PRIVATE_CHANNELS]
+                    }
+                }))
+                self.private_websocket = websocket
+                delay = 1.0
+                logger.info(f"📡 Subscribed to private channels: {', '.join(PRIVATE_CHANNELS)}")
+                
+                async for message in websocket:
+                    self._dispatch_private_event(json.loads(message))
+                
+                logger.warning("Private order stream closed by exchange")
+                
+            except asyncio.CancelledError:
+                raise
+            except websockets.exceptions.ConnectionClosed:
+                logger.warning("Private order stream connection closed")
+            except Exception as e:
+                logger.error(f"Private order stream error: {e}")
+            finally:
+                self.private_websocket = None
+            
+            # Waiters fall back to REST while the stream is down
+            await asyncio.sleep(delay + random.uniform(0, delay))
+            delay = min(delay * 2, 30.0)
+    
+    def add_private_event_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """
+        Register a callback for private stream events.
+        
+        Args:
+            callback: Called as callback(channel, event) from the stream task;
+                must not block
+        """
+        if callback not in self._private_event_listeners:
+            self._private_event_listeners.append(callback)
+    
+    def remove_private_event_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """Unregister a private stream callback"""
+        if callback in self._private_event_listeners:
+            self._private_event_listeners.remove(callback)
+    
+    def _dispatch_private_event(self, data: Dict[str, Any]):
+        """Route a private channel message to order waiters and listeners"""
+        channel = data.get("type")
+        if channel not in PRIVATE_CHANNELS:
+            return
+        
+        event = data
+        if channel == "orders":
+            event = self._update_order_state(data)
+        
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.record_private_stream_event(exchange="delta_exchange", channel=channel)
+        except Exception as e:
+            logger.debug(f"Failed to record private stream event metric: {e}")
+        
+        for callback in list(self._private_event_listeners):
+            try:
+                callback(channel, event)
+            except Exception as e:
+                logger.error(f"Private event listener error: {e}")
+    
+    @staticmethod
+    def _normalize_order_state(order_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize an exchange order payload (REST or stream) to a status dict"""
+        state = str(order_data.get("state") or order_data.get("status") or "").lower()
+        size = float(order_data.get("size") or 0)
+        unfilled = float(order_data.get("unfilled_size") or 0)
+        filled = max(0.0, size - unfilled)
+        
+        if state == "closed":
+            status = "FILLED" if unfilled == 0 else "CANCELLED"
+        elif state == "cancelled":
+            status = "CANCELLED"
+        elif state == "rejected":
+            status = "REJECTED"
+        elif filled > 0:
+            status = "PARTIALLY_FILLED"
+        else:
+            status = "OPEN"
+        
+        fill_price = order_data.get("average_fill_price")
+        return {
+            "order_id": str(order_data.get("id", "")),
+            "symbol": order_data.get("product_symbol") or order_data.get("symbol"),
+            "status": status,
+            "fill_price": float(fill_price) if fill_price else None,
+            "fill_size": filled,
+            "unfilled_size": unfilled,
+            "updated_at": time.time()
+        }
+    
+    def _update_order_state(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Record the latest state of an order and wake its waiters when terminal"""
+        state = self._normalize_order_state(order_data)
+        order_id = state["order_id"]
+        if not order_id:
+            return state
+        
+        self._order_states[order_id] = state
+        self._order_states.move_to_end(order_id)
+        while len(self._order_states) > ORDER_STATE_HISTORY:
+            self._order_states.popitem(last=False)
+        
+        if state["status"] in TERMINAL_ORDER_STATUSES:
+            for future in self._order_waiters.pop(order_id, []):
+                if not future.done():
+                    future.set_result(state)
+        return state
+    
+    async def wait_for_order_update(self, order_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait until an order reaches a terminal state (filled, cancelled or rejected).
+        
+        Resolves from the private stream; returns immediately if the terminal
+        state has already been seen.
+        
+        Raises:
+            asyncio.TimeoutError: If no terminal state arrives within timeout
+        """
+        order_id = str(order_id)
+        state = self._order_states.get(order_id)
+        if state and state["status"] in TERMINAL_ORDER_STATUSES:
+            return state
+        
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._order_waiters.setdefault(order_id, [])
+        waiters.append(future)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        finally:
+            if not future.done():
+                future.cancel()
+            remaining = [waiter for waiter in self._order_waiters.get(order_id, []) if waiter is not future]
+            if remaining:
+                self._order_waiters[order_id] = remaining
+            else:
+                self._order_waiters.pop(order_id, None)
+    
     # =============================================================================
     # UTILITY METHODS
     # =============================================================================
@@ -939,6 +1722,15 @@ class DeltaExchangeConnector:
         response = await self._make_request("GET", "/time")
         return response["timestamp"]
     
+    async def _fetch_server_time(self) -> float:
+        """Get server time in seconds at the best available resolution (clock sync)"""
+        response = await self._make_request("GET", "/time", priority=RequestPriority.ACCOUNT)
+        if response.get("server_time"):
+            # Microseconds since the epoch
+            return float(response["server_time"]) / 1_000_000
+        # Whole seconds truncate the true time; centre the estimate within the second
+        return float(response["timestamp"]) + 0.5
+    
     async def health_check(self) -> bool:
         """Check if API is healthy"""
         try:
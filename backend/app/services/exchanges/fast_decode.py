@@ -0,0 +1,150 @@
+"""
+Fast Response Decoding
+
+Low-overhead decoding for hot Delta Exchange responses (orders and
+positions). Bodies are parsed from bytes with orjson when available and
+mapped into slotted dataclasses without pydantic validation; the exchange
+schema is trusted on these paths. Numeric fields are floats and timestamps
+are left as the exchange sent them.
+
+Run ``python -m app.services.exchanges.fast_decode`` for a microbenchmark
+against ``json`` + pydantic.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+# Optional fast JSON backend - fall back to the standard library
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document with the fastest available backend"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """Convert an exchange numeric (usually a string) to float, keeping None"""
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+@dataclass(slots=True)
+class OrderStruct:
+    """Order decoded without validation (attribute-compatible with OrderResponse)"""
+    id: str
+    symbol: str
+    side: str
+    size: float
+    price: Optional[float]
+    status: str
+    order_type: str
+    created_at: Optional[str]
+    unfilled_size: float
+    average_fill_price: Optional[float]
+
+    @classmethod
+    def from_exchange(cls, data: Dict[str, Any]) -> "OrderStruct":
+        size = float(data.get("size") or 0)
+        unfilled = data.get("unfilled_size")
+        return cls(
+            str(data.get("id", "")),
+            data.get("product_symbol") or data.get("symbol") or "",
+            data.get("side", ""),
+            size,
+            _to_float(data.get("limit_price", data.get("price"))),
+            data.get("state") or data.get("status") or "",
+            data.get("order_type", ""),
+            data.get("created_at"),
+            size if unfilled is None else float(unfilled),
+            _to_float(data.get("average_fill_price"))
+        )
+
+
+@dataclass(slots=True)
+class PositionStruct:
+    """Position decoded without validation (attribute-compatible with PositionResponse)"""
+    symbol: str
+    size: float
+    entry_price: float
+    mark_price: float
+    unrealized_pnl: float
+    realized_pnl: float
+    margin: float
+
+    @classmethod
+    def from_exchange(cls, data: Dict[str, Any]) -> "PositionStruct":
+        return cls(
+            data.get("product_symbol") or data.get("symbol") or "",
+            float(data.get("size") or 0),
+            float(data.get("entry_price") or 0),
+            float(data.get("mark_price") or 0),
+            float(data.get("unrealized_pnl") or 0),
+            float(data.get("realized_pnl") or 0),
+            float(data.get("margin") or 0)
+        )
+
+
+# =============================================================================
+# MICROBENCHMARK
+# =============================================================================
+
+_SAMPLE_ORDER = {
+    "success": True,
+    "result": {
+        "id": 123456789, "product_id": 27, "product_symbol": "BTCUSDT", "side": "buy",
+        "size": 10, "unfilled_size": 0, "order_type": "limit_order", "limit_price": "65000.5",
+        "state": "closed", "average_fill_price": "64999.0", "reduce_only": False,
+        "created_at": "2024-01-01T00:00:00.000000Z", "client_order_id": None,
+        "time_in_force": "gtc", "stop_price": None, "paid_commission": "0.325"
+    }
+}
+
+
+def benchmark_decoding(iterations: int = 100000) -> Dict[str, float]:
+    """
+    Compare per-call decode cost for an order response.
+
+    Returns:
+        Microseconds per call for the standard (json + pydantic) and fast paths
+    """
+    from app.services.exchanges.delta_exchange import OrderResponse
+
+    body = json.dumps(_SAMPLE_ORDER).encode()
+
+    def _standard():
+        result = json.loads(body)["result"]
+        return OrderResponse(
+            id=str(result["id"]), symbol=result["product_symbol"], side=result["side"],
+            size=result["size"], price=result["limit_price"], status=result["state"],
+            order_type=result["order_type"], created_at=result["created_at"]
+        )
+
+    def _fast():
+        return OrderStruct.from_exchange(json_loads(body)["result"])
+
+    timings = {}
+    for name, decode in (("standard", _standard), ("fast", _fast)):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            decode()
+        timings[f"{name}_us_per_call"] = (time.perf_counter() - start) / iterations * 1e6
+
+    timings["speedup"] = timings["standard_us_per_call"] / timings["fast_us_per_call"]
+    return timings
+
+
+if __name__ == "__main__":
+    print(f"orjson available: {HAS_ORJSON}")
+    for key, value in benchmark_decoding().items():
+        print(f"{key}: {value:.3f}")
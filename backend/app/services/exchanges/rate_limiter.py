@@ -0,0 +1,308 @@
+"""
+Delta Exchange Rate Limiter
+
+Async token-bucket rate limiter for the Delta Exchange REST API.
+Requests are charged per-endpoint weights and queued by priority class so
+that order placement and cancellation are served ahead of market data.
+The bucket is fed back from 429 responses and rate-limit headers.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple, Any, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Priority classes for exchange requests (lower value is served first)"""
+    ORDER = 0          # Order placement, amendment and cancellation
+    ACCOUNT = 1        # Positions, balances, order status
+    MARKET_DATA = 2    # Tickers, order books, candles, products
+
+
+# Endpoint weights as documented by Delta Exchange (units per request).
+# Matched by path prefix after the API version is stripped; first match wins.
+ENDPOINT_WEIGHTS: List[Tuple[str, str, int]] = [
+    ("POST", "/orders/batch", 25),
+    ("PUT", "/orders/batch", 25),
+    ("DELETE", "/orders/batch", 25),
+    ("DELETE", "/orders/all", 25),
+    ("POST", "/orders", 5),
+    ("PUT", "/orders", 5),
+    ("DELETE", "/orders", 5),
+    ("GET", "/orders/history", 25),
+    ("GET", "/fills", 25),
+    ("GET", "/orders", 3),
+    ("GET", "/positions", 3),
+    ("GET", "/wallet", 3),
+    ("GET", "/account", 3),
+]
+
+DEFAULT_ENDPOINT_WEIGHT = 1
+
+
+def _normalize_path(endpoint: str) -> str:
+    """Strip query string and API version prefix from an endpoint path"""
+    path = endpoint.split("?", 1)[0]
+    if path.startswith("/v2/"):
+        path = path[3:]
+    return path
+
+
+def get_endpoint_weight(method: str, endpoint: str) -> int:
+    """Get the rate-limit weight charged for a request"""
+    method = method.upper()
+    path = _normalize_path(endpoint)
+    for weight_method, prefix, weight in ENDPOINT_WEIGHTS:
+        if method == weight_method and path.startswith(prefix):
+            return weight
+    return DEFAULT_ENDPOINT_WEIGHT
+
+
+def get_request_priority(method: str, endpoint: str) -> RequestPriority:
+    """Classify a request into a priority class"""
+    method = method.upper()
+    path = _normalize_path(endpoint)
+
+    if path.startswith("/orders") and method in ("POST", "PUT", "DELETE"):
+        return RequestPriority.ORDER
+    if path.startswith(("/orders", "/positions", "/wallet", "/account", "/fills")):
+        return RequestPriority.ACCOUNT
+    return RequestPriority.MARKET_DATA
+
+
+class TokenBucketRateLimiter:
+    """
+    Async token bucket with a priority wait queue.
+
+    Tokens refill continuously at ``refill_rate`` per second up to
+    ``capacity``. A request that cannot be served immediately waits in a
+    heap ordered by (priority, arrival), so a queued stop-loss is granted
+    before any queued market-data request regardless of arrival order.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_rate: float,
+        name: str = "delta_exchange",
+        environment: str = "testnet"
+    ):
+        if capacity <= 0 or refill_rate <= 0:
+            raise ValueError("capacity and refill_rate must be positive")
+
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.name = name
+        self.environment = environment
+
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+        # Heap of (priority, sequence, weight, future)
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.total_acquired = 0
+        self.total_waited = 0
+        self.throttle_events = 0
+
+    @property
+    def tokens(self) -> float:
+        """Currently available tokens"""
+        self._refill()
+        return self._tokens
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for tokens"""
+        return sum(1 for _, _, _, future in self._waiters if not future.done())
+
+    def _refill(self):
+        """Add tokens accrued since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._last_refill = now
+
+    async def acquire(
+        self,
+        weight: float = DEFAULT_ENDPOINT_WEIGHT,
+        priority: RequestPriority = RequestPriority.MARKET_DATA
+    ) -> float:
+        """
+        Wait until ``weight`` tokens are available and consume them.
+
+        Args:
+            weight: Number of tokens charged for the request
+            priority: Priority class of the request
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        weight = min(float(weight), self.capacity)
+        start = time.monotonic()
+
+        self._refill()
+        if not self._waiters and start >= self._paused_until and self._tokens >= weight:
+            self._tokens -= weight
+            self.total_acquired += 1
+            self._record_metrics(priority, 0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), weight, future))
+        self._ensure_dispatcher()
+
+        # Cancellation of the caller cancels the future; the dispatcher skips it
+        await future
+
+        waited = time.monotonic() - start
+        self.total_acquired += 1
+        self.total_waited += 1
+        self._record_metrics(priority, waited)
+
+        if waited > 1.0:
+            logger.debug(
+                f"Rate limiter [{self.environment}] granted {RequestPriority(priority).name} "
+                f"request after {waited:.2f}s"
+            )
+        return waited
+
+    def _ensure_dispatcher(self):
+        """Start the dispatcher task if it is not running"""
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def _dispatch(self):
+        """Grant queued requests in priority order as tokens refill"""
+        try:
+            while self._waiters:
+                priority, _, weight, future = self._waiters[0]
+                if future.done():
+                    heapq.heappop(self._waiters)
+                    continue
+
+                self._refill()
+                now = time.monotonic()
+
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                if self._tokens >= weight:
+                    heapq.heappop(self._waiters)
+                    self._tokens -= weight
+                    future.set_result(None)
+                    continue
+
+                await asyncio.sleep((weight - self._tokens) / self.refill_rate)
+        except Exception as e:
+            logger.error(f"Rate limiter dispatcher error: {e}")
+            # Release everyone rather than leaving requests stuck forever
+            while self._waiters:
+                _, _, _, future = heapq.heappop(self._waiters)
+                if not future.done():
+                    future.set_exception(e)
+
+    def penalize(self, retry_after: float):
+        """
+        Drain the bucket and pause all requests after a 429 response.
+
+        Args:
+            retry_after: Seconds until the exchange accepts requests again
+        """
+        retry_after = max(0.0, float(retry_after))
+        self._refill()
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self.throttle_events += 1
+
+        logger.warning(f"Rate limiter [{self.environment}] paused for {retry_after:.2f}s after 429")
+        self._record_token_metrics()
+
+    def update_from_headers(self, headers: Mapping[str, str], status_code: int = 200):
+        """
+        Synchronize the bucket with rate-limit headers returned by the exchange.
+
+        Delta Exchange returns ``X-RATE-LIMIT-RESET`` (milliseconds until the
+        quota resets) on throttled responses; ``X-RATE-LIMIT-REMAINING`` and
+        ``Retry-After`` are honoured when present.
+        """
+        try:
+            remaining = _get_header(headers, "X-RATE-LIMIT-REMAINING")
+            if remaining is not None:
+                self._refill()
+                self._tokens = min(self._tokens, max(0.0, float(remaining)))
+
+            if status_code == 429:
+                reset_ms = _get_header(headers, "X-RATE-LIMIT-RESET")
+                retry_after = _get_header(headers, "Retry-After")
+                if reset_ms is not None:
+                    self.penalize(float(reset_ms) / 1000.0)
+                elif retry_after is not None:
+                    self.penalize(float(retry_after))
+                else:
+                    # No hint from the exchange: wait long enough to refill one order's worth
+                    self.penalize(get_endpoint_weight("POST", "/orders") / self.refill_rate)
+            else:
+                self._record_token_metrics()
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Ignoring malformed rate-limit headers: {e}")
+
+    def _record_metrics(self, priority: RequestPriority, waited: float):
+        """Export queue wait and token metrics"""
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.record_rate_limit_wait(
+                exchange=self.name,
+                priority=RequestPriority(priority).name.lower(),
+                wait_seconds=waited
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record rate limit wait metric: {e}")
+        self._record_token_metrics()
+
+    def _record_token_metrics(self):
+        """Export available tokens and queue depth"""
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.set_rate_limit_state(
+                exchange=self.name,
+                environment=self.environment,
+                tokens_available=self._tokens,
+                queue_depth=self.queue_depth
+            )
+        except Exception as e:
+            logger.debug(f"Failed to record rate limit state metric: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get rate limiter statistics"""
+        return {
+            "environment": self.environment,
+            "capacity": self.capacity,
+            "refill_rate": self.refill_rate,
+            "tokens_available": round(self.tokens, 2),
+            "queue_depth": self.queue_depth,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "total_acquired": self.total_acquired,
+            "total_waited": self.total_waited,
+            "throttle_events": self.throttle_events
+        }
+
+
+def _get_header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    """Case-insensitive header lookup for plain dicts and multidicts"""
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return value
@@ -0,0 +1,846 @@
+"""
+Delta Exchange Simulator
+
+Self-contained local stand-in for the Delta Exchange REST and WebSocket APIs,
+used for offline load and latency testing of the execution and data paths.
+
+Speaks the endpoints DeltaExchangeConnector uses (products, tickers, L2
+order book, chart history, orders, batch orders, positions, wallet balances,
+server time) and the WebSocket channels ticker, l2_orderbook, recent_trades
+plus the private orders, user_trades and positions channels. Prices follow a
+seeded geometric Brownian motion; latency, 429s, 5xx errors and order
+rejections can be injected.
+
+Usage:
+    python -m app.services.exchanges.simulator --port 8765 --latency-ms 20 --seed 42
+
+Point the connector at it with:
+    DELTA_TESTNET_BASE_URL=http://127.0.0.1:8765
+    DELTA_TESTNET_WEBSOCKET_URL=ws://127.0.0.1:8765/ws
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Set
+
+from aiohttp import web, WSMsgType
+
+logger = logging.getLogger(__name__)
+
+
+PUBLIC_CHANNELS = ("ticker", "l2_orderbook", "recent_trades")
+PRIVATE_CHANNELS = ("orders", "user_trades", "positions")
+
+RESOLUTION_SECONDS = {
+    "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "6h": 21600, "1d": 86400, "1w": 604800
+}
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class SimulatorOrderError(Exception):
+    """Order rejected by the simulated matching engine"""
+
+    def __init__(self, code: str, status: int = 400):
+        super().__init__(code)
+        self.code = code
+        self.status = status
+
+
+@dataclass
+class SimulatorConfig:
+    """Simulator configuration"""
+    host: str = "127.0.0.1"
+    port: int = 8765
+    symbols: Dict[str, float] = field(default_factory=lambda: {"BTCUSDT": 65000.0, "ETHUSDT": 3200.0})
+    latency_ms: float = 0.0          # Mean added latency per REST request
+    latency_jitter_ms: float = 0.0   # Uniform jitter added on top of latency_ms
+    error_rate: float = 0.0          # Probability of an HTTP 500 per REST request
+    rate_limit_rate: float = 0.0     # Probability of an HTTP 429 per REST request
+    reject_rate: float = 0.0         # Probability an order is rejected
+    tick_interval: float = 0.1       # Seconds between price ticks and WebSocket pushes
+    volatility: float = 0.8          # Annualized volatility of the price process
+    drift: float = 0.0               # Annualized drift of the price process
+    spread_bps: float = 2.0          # Bid/ask spread in basis points
+    book_depth: int = 20
+    leverage: float = 10.0
+    initial_balance: float = 100000.0
+    clock_skew_seconds: float = 0.0  # Server clock minus local clock reported by /time
+    seed: Optional[int] = None
+
+
+class SyntheticPriceProcess:
+    """Geometric Brownian motion price path for one symbol"""
+
+    def __init__(self, initial_price: float, volatility: float, drift: float, rng: random.Random):
+        self.price = float(initial_price)
+        self.volatility = volatility
+        self.drift = drift
+        self.rng = rng
+
+        self.open_24h = self.price
+        self.high_24h = self.price
+        self.low_24h = self.price
+        self.volume_24h = 0.0
+
+    def step(self, dt: float) -> float:
+        """Advance the process by dt seconds and return the new price"""
+        dt_years = dt / SECONDS_PER_YEAR
+        shock = self.rng.gauss(0.0, 1.0)
+        self.price *= math.exp(
+            (self.drift - 0.5 * self.volatility ** 2) * dt_years
+            + self.volatility * math.sqrt(dt_years) * shock
+        )
+        self.high_24h = max(self.high_24h, self.price)
+        self.low_24h = min(self.low_24h, self.price)
+        return self.price
+
+    def history(self, symbol: str, start: int, end: int, resolution: int) -> Dict[str, List[float]]:
+        """
+        Generate OHLCV bars ending at the current price.
+
+        Bars are deterministic for a given (symbol, start, end, resolution)
+        so repeated benchmark runs see the same history.
+        """
+        bars = max(1, min(5000, (end - start) // resolution))
+        rng = random.Random(f"{symbol}:{start}:{end}:{resolution}")
+        sigma = self.volatility * math.sqrt(resolution / SECONDS_PER_YEAR)
+
+        # Random walk in log space, shifted so the last close is the current price
+        log_prices = [0.0]
+        for _ in range(bars):
+            log_prices.append(log_prices[-1] + rng.gauss(0.0, sigma))
+        offset = math.log(self.price) - log_prices[-1]
+        closes = [math.exp(p + offset) for p in log_prices]
+
+        candles = {"t": [], "o": [], "h": [], "l": [], "c": [], "v": []}
+        first_bar = end - bars * resolution
+        for i in range(bars):
+            open_price, close_price = closes[i], closes[i + 1]
+            wick = abs(rng.gauss(0.0, sigma)) * 0.5
+            candles["t"].append(first_bar + i * resolution)
+            candles["o"].append(round(open_price, 2))
+            candles["h"].append(round(max(open_price, close_price) * (1 + wick), 2))
+            candles["l"].append(round(min(open_price, close_price) * (1 - wick), 2))
+            candles["c"].append(round(close_price, 2))
+            candles["v"].append(round(rng.uniform(10, 1000), 3))
+        return candles
+
+
+class _WebSocketClient:
+    """Connected WebSocket client and its subscriptions"""
+
+    def __init__(self, ws: web.WebSocketResponse):
+        self.ws = ws
+        self.authenticated = False
+        self.channels: Dict[str, Set[str]] = {}
+
+    def subscribed(self, channel: str, symbol: Optional[str] = None) -> bool:
+        symbols = self.channels.get(channel)
+        if symbols is None:
+            return False
+        return symbol is None or "all" in symbols or symbol in symbols
+
+
+class DeltaExchangeSimulator:
+    """Local Delta Exchange REST/WebSocket simulator"""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.config = config or SimulatorConfig()
+        self.rng = random.Random(self.config.seed)
+
+        self.products: List[Dict[str, Any]] = []
+        self.prices: Dict[str, SyntheticPriceProcess] = {}
+        for product_id, (symbol, price) in enumerate(self.config.symbols.items(), start=1):
+            self.products.append(self._make_product(product_id, symbol))
+            self.prices[symbol] = SyntheticPriceProcess(
+                price, self.config.volatility, self.config.drift, random.Random(self.rng.random())
+            )
+
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.positions: Dict[str, Dict[str, float]] = {}
+        self.balance = self.config.initial_balance
+        self._order_ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+
+        self.clients: Set[_WebSocketClient] = set()
+        self.app = self._create_app()
+        self._runner: Optional[web.AppRunner] = None
+        self._tick_task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.stats = {
+            "requests": 0, "injected_errors": 0, "injected_rate_limits": 0,
+            "orders": 0, "rejections": 0, "fills": 0, "ws_messages": 0
+        }
+
+    # =============================================================================
+    # LIFECYCLE
+    # =============================================================================
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.config.host}:{self.config.port}"
+
+    @property
+    def websocket_url(self) -> str:
+        return f"ws://{self.config.host}:{self.config.port}/ws"
+
+    async def start(self):
+        """Start the HTTP/WebSocket server and the price process"""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.config.host, self.config.port)
+        await site.start()
+
+        self._tick_task = asyncio.create_task(self._tick_loop())
+        logger.info(f"🧪 Delta Exchange simulator listening on {self.base_url} (WebSocket {self.websocket_url})")
+
+    async def stop(self):
+        """Stop the server and close WebSocket clients"""
+        if self._tick_task:
+            self._tick_task.cancel()
+            try:
+                await self._tick_task
+            except asyncio.CancelledError:
+                pass
+            self._tick_task = None
+
+        for client in list(self.clients):
+            await client.ws.close()
+        self.clients.clear()
+
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        logger.info("Delta Exchange simulator stopped")
+
+    def _create_app(self) -> web.Application:
+        """Build the aiohttp application with REST and WebSocket routes"""
+        app = web.Application(middlewares=[self._fault_middleware])
+
+        routes = [
+            ("GET", "/time", self._handle_time),
+            ("GET", "/products", self._handle_products),
+            ("GET", "/tickers", self._handle_tickers),
+            ("GET", "/tickers/{symbol}", self._handle_ticker),
+            ("GET", "/l2orderbook/{symbol}", self._handle_orderbook),
+            ("GET", "/trades/{symbol}", self._handle_trades),
+            ("GET", "/chart/history", self._handle_chart_history),
+            ("GET", "/orders", self._handle_get_orders),
+            ("POST", "/orders", self._handle_place_order),
+            ("DELETE", "/orders", self._handle_cancel_order),
+            ("POST", "/orders/batch", self._handle_place_batch),
+            ("DELETE", "/orders/all", self._handle_cancel_all),
+            ("GET", "/orders/{order_id}", self._handle_get_order),
+            ("DELETE", "/orders/{order_id}", self._handle_cancel_order),
+            ("GET", "/positions", self._handle_positions),
+            ("GET", "/positions/margined", self._handle_positions),
+            ("GET", "/wallet/balances", self._handle_balances),
+        ]
+        # The connector calls both versioned and unversioned paths
+        for method, path, handler in routes:
+            app.router.add_route(method, f"/v2{path}", handler)
+            app.router.add_route(method, path, handler)
+
+        app.router.add_get("/ws", self._handle_websocket)
+        app.router.add_get("/", self._handle_root)
+        return app
+
+    # =============================================================================
+    # FAULT INJECTION
+    # =============================================================================
+
+    @web.middleware
+    async def _fault_middleware(self, request: web.Request, handler):
+        """Inject latency, 429s and 5xx errors into REST requests"""
+        if request.path in ("/", "/ws"):
+            return await handler(request)
+
+        self.stats["requests"] += 1
+        delay_ms = self.config.latency_ms + self.rng.uniform(0, self.config.latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+        if self.rng.random() < self.config.rate_limit_rate:
+            self.stats["injected_rate_limits"] += 1
+            return web.json_response(
+                {"success": False, "error": {"code": "ratelimited"}},
+                status=429,
+                headers={"X-RATE-LIMIT-RESET": "1000"}
+            )
+        if self.rng.random() < self.config.error_rate:
+            self.stats["injected_errors"] += 1
+            return web.json_response({"success": False, "error": {"code": "internal_server_error"}}, status=500)
+
+        return await handler(request)
+
+    # =============================================================================
+    # MARKET DATA
+    # =============================================================================
+
+    def _make_product(self, product_id: int, symbol: str) -> Dict[str, Any]:
+        """Build a perpetual futures product description"""
+        underlying = symbol[:-4] if symbol.endswith("USDT") else symbol
+        return {
+            "id": product_id,
+            "symbol": symbol,
+            "description": f"{underlying} Perpetual",
+            "contract_type": "perpetual_futures",
+            "state": "live",
+            "tick_size": "0.5",
+            "contract_value": "0.001",
+            "underlying_asset": {"symbol": underlying},
+            "quoting_asset": {"symbol": "USDT"},
+            "settling_asset": {"symbol": "USDT"}
+        }
+
+    def _get_product(self, key: Any) -> Optional[Dict[str, Any]]:
+        """Resolve a product by id or symbol"""
+        for product in self.products:
+            if str(product["id"]) == str(key) or product["symbol"] == key:
+                return product
+        return None
+
+    def _quotes(self, symbol: str) -> tuple:
+        """Current best bid and ask"""
+        price = self.prices[symbol].price
+        half_spread = price * self.config.spread_bps / 20000.0
+        return price - half_spread, price + half_spread
+
+    def _ticker(self, symbol: str) -> Dict[str, Any]:
+        process = self.prices[symbol]
+        bid, ask = self._quotes(symbol)
+        product = self._get_product(symbol)
+        return {
+            "symbol": symbol,
+            "product_id": product["id"],
+            "close": round(process.price, 2),
+            "mark_price": str(round(process.price, 2)),
+            "open": round(process.open_24h, 2),
+            "high": round(process.high_24h, 2),
+            "low": round(process.low_24h, 2),
+            "volume": round(process.volume_24h, 3),
+            "change_24h": round((process.price / process.open_24h - 1) * 100, 4),
+            "quotes": {"best_bid": str(round(bid, 2)), "best_ask": str(round(ask, 2))},
+            "timestamp": int(time.time() * 1_000_000)
+        }
+
+    def _orderbook(self, symbol: str, depth: int) -> Dict[str, Any]:
+        bid, ask = self._quotes(symbol)
+        step = self.prices[symbol].price * 0.0001
+        depth = max(1, min(depth, self.config.book_depth))
+        return {
+            "symbol": symbol,
+            "buy": [{"price": str(round(bid - i * step, 2)), "size": self.rng.randint(1, 500)} for i in range(depth)],
+            "sell": [{"price": str(round(ask + i * step, 2)), "size": self.rng.randint(1, 500)} for i in range(depth)],
+            "last_updated_at": int(time.time() * 1_000_000)
+        }
+
+    async def _handle_root(self, request: web.Request) -> web.Response:
+        return web.json_response({"success": True, "result": {"simulator": True}})
+
+    async def _handle_time(self, request: web.Request) -> web.Response:
+        now = time.time() + self.config.clock_skew_seconds
+        return _ok({"timestamp": int(now), "server_time": int(now * 1_000_000)})
+
+    async def _handle_products(self, request: web.Request) -> web.Response:
+        return _ok(self.products)
+
+    async def _handle_tickers(self, request: web.Request) -> web.Response:
+        return _ok([self._ticker(symbol) for symbol in self.prices])
+
+    async def _handle_ticker(self, request: web.Request) -> web.Response:
+        symbol = request.match_info["symbol"]
+        if symbol not in self.prices:
+            return _error("invalid_contract", 404)
+        return _ok(self._ticker(symbol))
+
+    async def _handle_orderbook(self, request: web.Request) -> web.Response:
+        symbol = request.match_info["symbol"]
+        if symbol not in self.prices:
+            return _error("invalid_contract", 404)
+        return _ok(self._orderbook(symbol, int(request.query.get("depth", self.config.book_depth))))
+
+    async def _handle_trades(self, request: web.Request) -> web.Response:
+        symbol = request.match_info["symbol"]
+        if symbol not in self.prices:
+            return _error("invalid_contract", 404)
+        limit = int(request.query.get("limit", 100))
+        return _ok([self._synthetic_trade(symbol) for _ in range(min(limit, 100))])
+
+    async def _handle_chart_history(self, request: web.Request) -> web.Response:
+        symbol = request.query.get("symbol", "")
+        product = self._get_product(symbol) or self._get_product(request.query.get("product_id"))
+        if not product:
+            return _error("invalid_contract", 404)
+
+        resolution = RESOLUTION_SECONDS.get(request.query.get("resolution", "1m"), 60)
+        end = int(request.query.get("to", time.time()))
+        start = int(request.query.get("from", end - 86400))
+        candles = self.prices[product["symbol"]].history(product["symbol"], start, end, resolution)
+        return _ok({"s": "ok", **candles})
+
+    def _synthetic_trade(self, symbol: str) -> Dict[str, Any]:
+        price = self.prices[symbol].price * (1 + self.rng.gauss(0.0, 0.0001))
+        return {
+            "id": next(self._trade_ids),
+            "symbol": symbol,
+            "price": str(round(price, 2)),
+            "size": self.rng.randint(1, 50),
+            "side": self.rng.choice(["buy", "sell"]),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+
+    # =============================================================================
+    # ORDERS AND POSITIONS
+    # =============================================================================
+
+    async def _handle_place_order(self, request: web.Request) -> web.Response:
+        payload = await _read_json(request)
+        try:
+            return _ok(self._submit_order(payload))
+        except SimulatorOrderError as e:
+            return _error(e.code, e.status)
+
+    async def _handle_place_batch(self, request: web.Request) -> web.Response:
+        payload = await _read_json(request)
+        product_id = payload.get("product_id")
+        results = []
+        for order_payload in payload.get("orders", []):
+            try:
+                results.append(self._submit_order({"product_id": product_id, **order_payload}))
+            except SimulatorOrderError as e:
+                # Real batch semantics: one invalid leg fails the request
+                return _error(e.code, e.status)
+        return _ok(results)
+
+    async def _handle_get_orders(self, request: web.Request) -> web.Response:
+        state = request.query.get("state")
+        product = self._get_product(request.query.get("product_id")) if request.query.get("product_id") else None
+        orders = [
+            order for order in self.orders.values()
+            if (not state or order["state"] == state)
+            and (not product or order["product_id"] == product["id"])
+        ]
+        limit = int(request.query.get("limit", 100))
+        return _ok(orders[-limit:])
+
+    async def _handle_get_order(self, request: web.Request) -> web.Response:
+        order = self.orders.get(request.match_info["order_id"])
+        if not order:
+            return _error("order_not_found", 404)
+        return _ok(order)
+
+    async def _handle_cancel_order(self, request: web.Request) -> web.Response:
+        order_id = request.match_info.get("order_id")
+        if order_id is None:
+            order_id = str((await _read_json(request)).get("id", ""))
+        order = self.orders.get(order_id)
+        if not order:
+            return _error("order_not_found", 404)
+        if order["state"] not in ("open", "pending"):
+            return _error("order_already_closed", 400)
+        self._cancel(order)
+        return _ok(order)
+
+    async def _handle_cancel_all(self, request: web.Request) -> web.Response:
+        payload = await _read_json(request)
+        product = self._get_product(payload.get("product_id")) if payload.get("product_id") else None
+        for order in list(self.orders.values()):
+            if order["state"] in ("open", "pending") and (not product or order["product_id"] == product["id"]):
+                self._cancel(order)
+        return _ok({})
+
+    async def _handle_positions(self, request: web.Request) -> web.Response:
+        return _ok([self._position_payload(symbol) for symbol, position in self.positions.items() if position["size"]])
+
+    async def _handle_balances(self, request: web.Request) -> web.Response:
+        unrealized = sum(self._unrealized_pnl(symbol) for symbol in self.positions)
+        margin = sum(
+            abs(position["size"]) * self.prices[symbol].price / self.config.leverage
+            for symbol, position in self.positions.items()
+        )
+        equity = self.balance + unrealized
+        return _ok([{
+            "asset_symbol": "USDT",
+            "balance": str(round(self.balance, 4)),
+            "available_balance": str(round(max(0.0, equity - margin), 4)),
+            "position_margin": str(round(margin, 4)),
+            "unrealized_pnl": str(round(unrealized, 4))
+        }])
+
+    def _submit_order(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate, accept and (if marketable) fill an order"""
+        product = self._get_product(payload.get("product_id") or payload.get("product_symbol"))
+        if not product:
+            raise SimulatorOrderError("invalid_contract")
+
+        symbol = product["symbol"]
+        side = str(payload.get("side", "")).lower()
+        order_type = str(payload.get("order_type", "market")).lower().replace("_order", "")
+        try:
+            size = float(payload.get("size", 0))
+        except (TypeError, ValueError):
+            raise SimulatorOrderError("invalid_size")
+        limit_price = payload.get("limit_price")
+        stop_price = payload.get("stop_price")
+        reduce_only = str(payload.get("reduce_only", False)).lower() == "true"
+
+        if side not in ("buy", "sell") or size <= 0:
+            raise SimulatorOrderError("invalid_order")
+        if order_type in ("limit", "stop_limit") and limit_price is None:
+            raise SimulatorOrderError("limit_price_required")
+
+        self.stats["orders"] += 1
+        if self.rng.random() < self.config.reject_rate:
+            self.stats["rejections"] += 1
+            raise SimulatorOrderError("insufficient_margin")
+
+        if reduce_only:
+            position_size = self.positions.get(symbol, {}).get("size", 0.0)
+            closing = -position_size if side == "buy" else position_size
+            if closing <= 0:
+                raise SimulatorOrderError("no_position_for_reduce_only")
+            size = min(size, closing)
+
+        now = datetime.now(timezone.utc).isoformat()
+        order_id = str(next(self._order_ids))
+        order = {
+            "id": order_id,
+            "product_id": product["id"],
+            "product_symbol": symbol,
+            "symbol": symbol,
+            "side": side,
+            "size": size,
+            "unfilled_size": size,
+            "order_type": f"{order_type}_order",
+            "limit_price": str(limit_price) if limit_price is not None else None,
+            "price": str(limit_price) if limit_price is not None else None,
+            "stop_price": str(stop_price) if stop_price is not None else None,
+            "reduce_only": reduce_only,
+            "client_order_id": payload.get("client_order_id"),
+            "state": "pending" if stop_price is not None else "open",
+            "status": "pending" if stop_price is not None else "open",
+            "average_fill_price": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        self.orders[order_id] = order
+        self._publish_order(order, "create")
+
+        if stop_price is None:
+            self._try_fill(order)
+        return order
+
+    def _try_fill(self, order: Dict[str, Any]):
+        """Fill an order if it is marketable at the current quotes"""
+        bid, ask = self._quotes(order["symbol"])
+        price = self.prices[order["symbol"]].price
+
+        if order["state"] == "pending":
+            stop = float(order["stop_price"])
+            triggered = price >= stop if order["side"] == "buy" else price <= stop
+            if not triggered:
+                return
+            order["state"] = order["status"] = "open"
+
+        if order["order_type"] in ("market_order", "stop_market_order"):
+            self._fill(order, ask if order["side"] == "buy" else bid)
+            return
+
+        limit = float(order["limit_price"])
+        if order["side"] == "buy" and ask <= limit:
+            self._fill(order, ask)
+        elif order["side"] == "sell" and bid >= limit:
+            self._fill(order, bid)
+
+    def _fill(self, order: Dict[str, Any], price: float):
+        """Fill an order completely and update position and balance"""
+        symbol = order["symbol"]
+        size = order["unfilled_size"]
+        if order["reduce_only"]:
+            position_size = self.positions.get(symbol, {}).get("size", 0.0)
+            closing = -position_size if order["side"] == "buy" else position_size
+            if closing <= 0:
+                self._cancel(order)
+                return
+            size = min(size, closing)
+
+        self._apply_fill(symbol, size if order["side"] == "buy" else -size, price)
+        self.prices[symbol].volume_24h += size
+        self.stats["fills"] += 1
+
+        order["unfilled_size"] = 0.0
+        order["size"] = size if order["reduce_only"] else order["size"]
+        order["average_fill_price"] = str(round(price, 2))
+        order["state"] = order["status"] = "closed"
+        order["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+        self._publish_order(order, "update", reason="fill")
+        self._publish_private("user_trades", {
+            "type": "user_trades",
+            "symbol": symbol,
+            "product_id": order["product_id"],
+            "order_id": order["id"],
+            "side": order["side"],
+            "size": size,
+            "price": str(round(price, 2)),
+            "timestamp": int(time.time() * 1_000_000)
+        })
+        self._publish_private("positions", {"type": "positions", "action": "update", **self._position_payload(symbol)})
+
+    def _cancel(self, order: Dict[str, Any]):
+        order["state"] = order["status"] = "cancelled"
+        order["updated_at"] = datetime.now(timezone.utc).isoformat()
+        self._publish_order(order, "delete", reason="cancel")
+
+    def _apply_fill(self, symbol: str, signed_size: float, price: float):
+        """Apply a signed fill to the position, realizing PnL on reductions"""
+        position = self.positions.setdefault(symbol, {"size": 0.0, "entry_price": 0.0, "realized_pnl": 0.0})
+        current = position["size"]
+
+        if current == 0 or (current > 0) == (signed_size > 0):
+            new_size = current + signed_size
+            position["entry_price"] = (
+                (abs(current) * position["entry_price"] + abs(signed_size) * price) / abs(new_size)
+            )
+            position["size"] = new_size
+            return
+
+        closed = min(abs(current), abs(signed_size))
+        pnl = closed * (price - position["entry_price"]) * (1 if current > 0 else -1)
+        position["realized_pnl"] += pnl
+        self.balance += pnl
+
+        remaining = current + signed_size
+        if remaining == 0:
+            position["size"] = 0.0
+            position["entry_price"] = 0.0
+        elif (remaining > 0) != (current > 0):
+            # Position flipped through zero
+            position["size"] = remaining
+            position["entry_price"] = price
+        else:
+            position["size"] = remaining
+
+    def _unrealized_pnl(self, symbol: str) -> float:
+        position = self.positions[symbol]
+        return position["size"] * (self.prices[symbol].price - position["entry_price"])
+
+    def _position_payload(self, symbol: str) -> Dict[str, Any]:
+        position = self.positions.get(symbol, {"size": 0.0, "entry_price": 0.0, "realized_pnl": 0.0})
+        mark = self.prices[symbol].price
+        return {
+            "product_id": self._get_product(symbol)["id"],
+            "product_symbol": symbol,
+            "symbol": symbol,
+            "size": position["size"],
+            "entry_price": str(round(position["entry_price"], 2)),
+            "mark_price": str(round(mark, 2)),
+            "unrealized_pnl": str(round(position["size"] * (mark - position["entry_price"]), 4)),
+            "realized_pnl": str(round(position["realized_pnl"], 4)),
+            "margin": str(round(abs(position["size"]) * mark / self.config.leverage, 4))
+        }
+
+    # =============================================================================
+    # WEBSOCKET
+    # =============================================================================
+
+    async def _handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30.0)
+        await ws.prepare(request)
+        client = _WebSocketClient(ws)
+        self.clients.add(client)
+
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    data = json.loads(message.data)
+                except json.JSONDecodeError:
+                    await ws.send_json({"type": "error", "message": "invalid json"})
+                    continue
+                await self._handle_websocket_message(client, data)
+        finally:
+            self.clients.discard(client)
+        return ws
+
+    async def _handle_websocket_message(self, client: _WebSocketClient, data: Dict[str, Any]):
+        message_type = data.get("type")
+
+        if message_type == "subscribe":
+            subscribed = []
+            for channel in data.get("payload", {}).get("channels", []):
+                name = channel.get("name")
+                if name in PRIVATE_CHANNELS and not client.authenticated:
+                    await client.ws.send_json({"type": "error", "channel": name, "message": "unauthenticated"})
+                    continue
+                if name in PUBLIC_CHANNELS or name in PRIVATE_CHANNELS:
+                    client.channels.setdefault(name, set()).update(channel.get("symbols") or ["all"])
+                    subscribed.append(name)
+            await client.ws.send_json({"type": "subscriptions", "channels": subscribed})
+        elif message_type == "unsubscribe":
+            for channel in data.get("payload", {}).get("channels", []):
+                client.channels.pop(channel.get("name"), None)
+        elif message_type in ("ping", "heartbeat"):
+            await client.ws.send_json({"type": "pong"})
+        elif message_type or "signature" in data:
+            # Any auth variant the connector tries is accepted; keys are not checked locally
+            client.authenticated = True
+            await client.ws.send_json({
+                "type": message_type or "auth",
+                "success": True,
+                "status": "success",
+                "message": "Authenticated"
+            })
+
+    def _publish_order(self, order: Dict[str, Any], action: str, reason: Optional[str] = None):
+        self._publish_private("orders", {"type": "orders", "action": action, "reason": reason, **order})
+
+    def _publish_private(self, channel: str, message: Dict[str, Any]):
+        for client in list(self.clients):
+            if client.authenticated and client.subscribed(channel):
+                self._send(client, message)
+
+    def _publish_public(self, channel: str, symbol: str, data: Dict[str, Any]):
+        message = None
+        for client in list(self.clients):
+            if client.subscribed(channel, symbol):
+                if message is None:
+                    message = {"type": channel, "symbol": symbol, "data": data}
+                self._send(client, message)
+
+    def _send(self, client: _WebSocketClient, message: Dict[str, Any]):
+        if client.ws.closed:
+            self.clients.discard(client)
+            return
+        self.stats["ws_messages"] += 1
+        asyncio.create_task(client.ws.send_str(json.dumps(message)))
+
+    # =============================================================================
+    # PRICE PROCESS
+    # =============================================================================
+
+    async def _tick_loop(self):
+        """Advance prices, match resting orders and push market data"""
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(self.config.tick_interval)
+            now = time.monotonic()
+            dt, last = now - last, now
+
+            for symbol, process in self.prices.items():
+                process.step(dt)
+                self._publish_public("ticker", symbol, self._ticker(symbol))
+                self._publish_public("l2_orderbook", symbol, self._orderbook(symbol, self.config.book_depth))
+                if self.rng.random() < 0.5:
+                    self._publish_public("recent_trades", symbol, {
+                        "symbol": symbol,
+                        "trades": [self._synthetic_trade(symbol)]
+                    })
+
+            for order in list(self.orders.values()):
+                if order["state"] in ("open", "pending"):
+                    self._try_fill(order)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get simulator statistics"""
+        return {
+            **self.stats,
+            "open_orders": sum(1 for order in self.orders.values() if order["state"] in ("open", "pending")),
+            "positions": {symbol: position["size"] for symbol, position in self.positions.items() if position["size"]},
+            "balance": round(self.balance, 4),
+            "prices": {symbol: round(process.price, 2) for symbol, process in self.prices.items()},
+            "websocket_clients": len(self.clients)
+        }
+
+
+def _ok(result: Any) -> web.Response:
+    return web.json_response({"success": True, "result": result})
+
+
+def _error(code: str, status: int = 400) -> web.Response:
+    return web.json_response({"success": False, "error": {"code": code}}, status=status)
+
+
+async def _read_json(request: web.Request) -> Dict[str, Any]:
+    if not request.can_read_body:
+        return {}
+    try:
+        return await request.json()
+    except json.JSONDecodeError:
+        return {}
+
+
+# =============================================================================
+# MAIN ENTRY POINT
+# =============================================================================
+
+def _parse_args() -> SimulatorConfig:
+    parser = argparse.ArgumentParser(description="Local Delta Exchange simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--symbol", action="append", metavar="SYMBOL=PRICE",
+                        help="Simulated perpetual and its initial price (repeatable)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--reject-rate", type=float, default=0.0)
+    parser.add_argument("--tick-interval", type=float, default=0.1)
+    parser.add_argument("--volatility", type=float, default=0.8)
+    parser.add_argument("--clock-skew", type=float, default=0.0,
+                        help="Seconds the simulated server clock runs ahead of the local clock")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        reject_rate=args.reject_rate,
+        tick_interval=args.tick_interval,
+        volatility=args.volatility,
+        clock_skew_seconds=args.clock_skew,
+        seed=args.seed
+    )
+    if args.symbol:
+        config.symbols = {
+            symbol: float(price)
+            for symbol, price in (entry.split("=", 1) for entry in args.symbol)
+        }
+    return config
+
+
+async def main():
+    """Run the simulator until interrupted"""
+    simulator = DeltaExchangeSimulator(_parse_args())
+    await simulator.start()
+    try:
+        while True:
+            await asyncio.sleep(60)
+            logger.info(f"Simulator statistics: {simulator.get_statistics()}")
+    finally:
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,378 @@
+"""
+Execution Queue for Crypto-0DTE System
+
+Prioritized queue and bounded worker pool for trade execution requests.
+Requests are served by priority class (emergency exit > stop adjust >
+exit > entry), then arrival, so exits never wait behind a burst of
+entries:
+
+- At most one request per symbol runs at a time within a lane (entries,
+  exits and stop adjustments, emergency exits); a request whose symbol is
+  busy in its lane is parked and re-queued with its original place when
+  the symbol is released. Lanes never wait on each other, so an exit is
+  not held up by an entry waiting for its fill, and an emergency exit can
+  cancel a resting close on the same symbol
+- Workers are reserved for the urgent classes: a request only starts while
+  enough workers stay free for every more urgent class, so slow entries
+  can never occupy the whole pool
+- Entries and stop adjustments carry a deadline and are dropped if no
+  worker picked them up in time (a stale signal is not worth executing);
+  exits never expire
+- Entries are refused once the queue is full; exits are always accepted
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionPriority(IntEnum):
+    """Priority classes for execution requests (lower value is served first)"""
+    EMERGENCY_EXIT = 0  # Emergency position closure
+    STOP_ADJUST = 1     # Stop loss updates
+    EXIT = 2            # Position closure and size reduction
+    ENTRY = 3           # New trades
+
+
+# Per-symbol serialization lanes: requests only wait on a busy symbol in their own lane
+LANES = {
+    ExecutionPriority.EMERGENCY_EXIT: "emergency",
+    ExecutionPriority.STOP_ADJUST: "exit",
+    ExecutionPriority.EXIT: "exit",
+    ExecutionPriority.ENTRY: "entry"
+}
+
+
+class ExecutionRejected(Exception):
+    """Raised when a request is refused (queue full, stopped) or dropped at its deadline"""
+    pass
+
+
+@dataclass(slots=True)
+class ExecutionRequest:
+    """Queued execution request"""
+    sequence: int
+    priority: ExecutionPriority
+    symbol: str
+    description: str
+    operation: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float
+    deadline: Optional[float] = None
+    started_at: Optional[float] = None
+    state: str = "queued"  # queued / running / done
+    expiry: Optional[asyncio.TimerHandle] = field(default=None, repr=False)
+
+    @property
+    def sort_key(self) -> Tuple[int, int]:
+        return (int(self.priority), self.sequence)
+
+    @property
+    def slot(self) -> Tuple[str, str]:
+        """(lane, symbol) this request serializes on"""
+        return (LANES[self.priority], self.symbol)
+
+
+class ExecutionQueue:
+    """Priority execution queue with per-symbol lanes and a bounded, reserved worker pool"""
+
+    def __init__(self, environment: str = "testnet"):
+        self.environment = environment
+
+        # Configuration
+        self.worker_count = settings.EXECUTION_WORKERS
+        self.max_depth = settings.EXECUTION_QUEUE_MAX_DEPTH
+        self.deadlines = {
+            priority: settings.EXECUTION_DEADLINES[priority.name.lower()]
+            for priority in ExecutionPriority if priority.name.lower() in settings.EXECUTION_DEADLINES
+        }
+        reserved = settings.EXECUTION_RESERVED_WORKERS
+        # Workers that must stay free for more urgent classes before a request of each class may start
+        # (capped so every class can still use at least one worker)
+        self.held_back = {
+            priority: min(
+                sum(reserved.get(urgent.name.lower(), 0) for urgent in ExecutionPriority if urgent < priority),
+                self.worker_count - 1
+            )
+            for priority in ExecutionPriority
+        }
+
+        # Heap of (priority, sequence, request); requests parked per busy (lane, symbol)
+        self._heap: List[Tuple[int, int, ExecutionRequest]] = []
+        self._parked: Dict[Tuple[str, str], List[ExecutionRequest]] = {}
+        self._running: Dict[Tuple[str, str], ExecutionRequest] = {}
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._stopping = False
+
+        # Statistics per priority class
+        self._queued = {priority: 0 for priority in ExecutionPriority}
+        self._waits: Dict[ExecutionPriority, Deque[float]] = {
+            priority: deque(maxlen=1000) for priority in ExecutionPriority
+        }
+        self._counts: Dict[ExecutionPriority, Dict[str, int]] = {
+            priority: {"submitted": 0, "completed": 0, "failed": 0, "dropped": 0, "rejected": 0}
+            for priority in ExecutionPriority
+        }
+
+    # =============================================================================
+    # LIFECYCLE
+    # =============================================================================
+
+    def ensure_started(self):
+        """Start the worker pool (idempotent)"""
+        self._stopping = False
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.worker_count:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        """Refuse queued requests and wait for running ones to finish"""
+        self._stopping = True
+        for request in self._pending():
+            self._fail(request, ExecutionRejected("Execution queue stopped"), "rejected")
+        self._heap.clear()
+        self._parked.clear()
+        self._wakeup.set()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # =============================================================================
+    # SUBMISSION
+    # =============================================================================
+
+    async def submit(
+        self,
+        priority: ExecutionPriority,
+        symbol: str,
+        operation: Callable[[], Awaitable[Any]],
+        description: str = ""
+    ) -> Any:
+        """
+        Queue an operation and wait for its result.
+
+        Args:
+            priority: Priority class of the request
+            symbol: Symbol the operation trades (serialized per symbol within the class's lane)
+            operation: Zero-argument callable returning the coroutine to run
+            description: Short label for logs and the queue listing
+
+        Returns:
+            The operation's result
+
+        Raises:
+            ExecutionRejected: Queue full (entries only), stopped, or deadline passed
+        """
+        counts = self._counts[priority]
+        if self._stopping:
+            counts["rejected"] += 1
+            raise ExecutionRejected("Execution queue stopped")
+        if priority == ExecutionPriority.ENTRY and self.depth >= self.max_depth:
+            counts["rejected"] += 1
+            raise ExecutionRejected(f"Execution queue full ({self.max_depth} requests waiting)")
+
+        self.ensure_started()
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        request = ExecutionRequest(
+            sequence=next(self._sequence),
+            priority=priority,
+            symbol=symbol,
+            description=description,
+            operation=operation,
+            future=loop.create_future(),
+            enqueued_at=now
+        )
+        if priority in self.deadlines:
+            request.deadline = now + self.deadlines[priority]
+            request.expiry = loop.call_later(self.deadlines[priority], self._expire, request)
+
+        counts["submitted"] += 1
+        self._queued[priority] += 1
+        heapq.heappush(self._heap, (*request.sort_key, request))
+        self._wakeup.set()
+        self._record_depth(priority)
+
+        try:
+            return await request.future
+        except asyncio.CancelledError:
+            # Caller gave up before a worker took the request; it is skipped when popped
+            self._leave_queue(request)
+            raise
+
+    def _expire(self, request: ExecutionRequest):
+        """Deadline timer: drop the request if no worker has started it"""
+        if request.state == "queued" and not request.future.done():
+            waited = time.monotonic() - request.enqueued_at
+            logger.warning(
+                f"⏳ Dropped stale {request.priority.name.lower()} request after {waited * 1000:.0f}ms: "
+                f"{request.description}"
+            )
+            self._fail(
+                request,
+                ExecutionRejected(f"Execution deadline exceeded after {waited:.2f}s in queue"),
+                "dropped"
+            )
+
+    def _fail(self, request: ExecutionRequest, error: Exception, outcome: str):
+        if request.state != "queued":
+            return
+        self._leave_queue(request)
+        self._counts[request.priority][outcome] += 1
+        metrics_service.record_execution_queue_wait(
+            request.priority.name.lower(), outcome, time.monotonic() - request.enqueued_at
+        )
+        if not request.future.done():
+            request.future.set_exception(error)
+
+    def _leave_queue(self, request: ExecutionRequest):
+        if request.state == "queued":
+            request.state = "done"
+            if request.expiry:
+                request.expiry.cancel()
+            self._queued[request.priority] -= 1
+            self._record_depth(request.priority)
+
+    # =============================================================================
+    # WORKERS
+    # =============================================================================
+
+    async def _next_request(self) -> Optional[ExecutionRequest]:
+        """Highest-priority request whose symbol is free in its lane and whose class may take a worker (None once stopping)"""
+        while not self._stopping:
+            while self._heap:
+                _, _, request = heapq.heappop(self._heap)
+                if request.state != "queued":
+                    continue  # Dropped or abandoned by its caller
+                if request.slot in self._running:
+                    self._parked.setdefault(request.slot, []).append(request)
+                    continue
+                if self.worker_count - len(self._running) - 1 < self.held_back[request.priority]:
+                    # Remaining workers are reserved for more urgent classes; everything
+                    # behind this request in the heap is less urgent, so wait for a release
+                    heapq.heappush(self._heap, (*request.sort_key, request))
+                    break
+                self._running[request.slot] = request
+                return request
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return None
+
+    async def _worker(self):
+        while (request := await self._next_request()) is not None:
+            self._leave_queue(request)
+            request.state = "running"
+            request.started_at = time.monotonic()
+            waited = request.started_at - request.enqueued_at
+            self._waits[request.priority].append(waited)
+            metrics_service.record_execution_queue_wait(request.priority.name.lower(), "started", waited)
+
+            try:
+                result = await request.operation()
+                self._counts[request.priority]["completed"] += 1
+                if not request.future.done():
+                    request.future.set_result(result)
+            except Exception as e:
+                self._counts[request.priority]["failed"] += 1
+                logger.error(f"Execution request failed ({request.description}): {e}")
+                if not request.future.done():
+                    request.future.set_exception(e)
+            finally:
+                request.state = "done"
+                self._release(request.slot)
+
+    def _release(self, slot: Tuple[str, str]):
+        """Free a (lane, symbol) slot and its worker, and re-queue the requests parked behind it"""
+        del self._running[slot]
+        for request in self._parked.pop(slot, ()):
+            if request.state == "queued":
+                heapq.heappush(self._heap, (*request.sort_key, request))
+        self._wakeup.set()
+
+    # =============================================================================
+    # STATUS
+    # =============================================================================
+
+    def _pending(self) -> List[ExecutionRequest]:
+        parked = [request for requests in self._parked.values() for request in requests]
+        return sorted(
+            (request for request in [entry[2] for entry in self._heap] + parked if request.state == "queued"),
+            key=lambda request: request.sort_key
+        )
+
+    @property
+    def depth(self) -> int:
+        """Requests waiting for a worker"""
+        return sum(self._queued.values())
+
+    def _record_depth(self, priority: ExecutionPriority):
+        metrics_service.set_execution_queue_depth(self.environment, priority.name.lower(), self._queued[priority])
+
+    def get_queue(self) -> Dict[str, Any]:
+        """Queued and running requests in service order"""
+        now = time.monotonic()
+        return {
+            "pending": [
+                {
+                    "priority": request.priority.name.lower(),
+                    "symbol": request.symbol,
+                    "description": request.description,
+                    "waiting_ms": round((now - request.enqueued_at) * 1000, 1),
+                    "expires_in_ms": round((request.deadline - now) * 1000, 1) if request.deadline else None,
+                    "blocked_by_symbol": request.slot in self._running
+                }
+                for request in self._pending()
+            ],
+            "running": [
+                {
+                    "priority": request.priority.name.lower(),
+                    "lane": lane,
+                    "symbol": symbol,
+                    "description": request.description,
+                    "queued_ms": round((request.started_at - request.enqueued_at) * 1000, 1),
+                    "running_ms": round((now - request.started_at) * 1000, 1)
+                }
+                for (lane, symbol), request in self._running.items()
+            ]
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get execution queue statistics (wait times over the last 1000 starts per class)"""
+        priorities = {}
+        for priority in ExecutionPriority:
+            waits = np.array(self._waits[priority]) * 1000
+            p50, p95 = np.percentile(waits, (50, 95)) if waits.size else (0.0, 0.0)
+            priorities[priority.name.lower()] = {
+                "depth": self._queued[priority],
+                **self._counts[priority],
+                "wait_p50_ms": round(float(p50), 3),
+                "wait_p95_ms": round(float(p95), 3),
+                "wait_max_ms": round(float(waits.max()), 3) if waits.size else 0.0,
+                "deadline_seconds": self.deadlines.get(priority),
+                "workers_held_back": self.held_back[priority]
+            }
+        return {
+            "environment": self.environment,
+            "workers": len([worker for worker in self._workers if not worker.done()]),
+            "max_workers": self.worker_count,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "running": len(self._running),
+            "busy_symbols": sorted(f"{lane}:{symbol}" for lane, symbol in self._running),
+            "priorities": priorities
+        }
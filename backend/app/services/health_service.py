@@ -154,11 +154,11 @@ class HealthService:
         """Check exchange API connectivity with real implementation"""
         start_time = time.time()
         try:
-            from app.services.exchanges.delta_exchange import DeltaExchangeConnector
+            from app.services.exchanges.connector_pool import get_delta_connector
             from app.config import settings
             
-            # Create Delta Exchange connector
-            connector = DeltaExchangeConnector(paper_trading=True)  # Use testnet for health checks
+            # Shared Delta Exchange connector (reuses warm pooled connections)
+            connector = get_delta_connector(paper_trading=True)  # Use testnet for health checks
             
             try:
                 # Test unauthenticated endpoint first (instruments/heartbeat)
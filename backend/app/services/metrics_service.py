@@ -5,12 +5,17 @@ Provides Prometheus metrics collection and export functionality.
 """
 
 import time
-from typing import Dict, Any
+from collections import defaultdict, deque
+from typing import Deque, Dict, Any, Tuple
+import numpy as np
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Recent observations kept per risk check/phase for the JSON latency breakdown
+RISK_LATENCY_WINDOW = 2048
+
 class MetricsService:
     """Service for collecting and exporting Prometheus metrics"""
     
@@ -53,6 +58,26 @@ class MetricsService:
             ['symbol', 'side']
         )
         
+        self.time_to_protected = Histogram(
+            'crypto_time_to_protected_seconds',
+            'Time from entry fill until the stop loss / take profit orders are acknowledged',
+            ['symbol', 'outcome'],
+            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+        )
+        
+        self.execution_queue_wait = Histogram(
+            'crypto_execution_queue_wait_seconds',
+            'Time execution requests spent queued before a worker started or dropped them',
+            ['priority', 'outcome'],
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+        )
+        
+        self.execution_queue_depth = Gauge(
+            'crypto_execution_queue_depth',
+            'Execution requests waiting for a worker',
+            ['environment', 'priority']
+        )
+        
         # Risk Metrics
         self.risk_gate_decisions = Counter(
             'crypto_risk_gate_decisions_total',
@@ -128,6 +153,112 @@ class MetricsService:
             ['exchange', 'environment']
         )
         
+        self.exchange_rate_limit_tokens = Gauge(
+            'crypto_exchange_rate_limit_tokens_available',
+            'Exchange rate limiter tokens available',
+            ['exchange', 'environment']
+        )
+        
+        self.exchange_rate_limit_queue_depth = Gauge(
+            'crypto_exchange_rate_limit_queue_depth',
+            'Requests waiting for exchange rate limiter tokens',
+            ['exchange', 'environment']
+        )
+        
+        self.exchange_rate_limit_wait = Histogram(
+            'crypto_exchange_rate_limit_wait_seconds',
+            'Time requests spent queued in the exchange rate limiter',
+            ['exchange', 'priority'],
+            buckets=(0.0, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+        )
+        
+        self.exchange_read_coalescing = Counter(
+            'crypto_exchange_read_coalescing_total',
+            'Exchange reads by single-flight outcome (miss/coalesced/cache_hit)',
+            ['exchange', 'result']
+        )
+        
+        self.exchange_websocket_timing = Histogram(
+            'crypto_exchange_websocket_connect_seconds',
+            'Time from WebSocket (re)connect to authenticated / first message',
+            ['exchange', 'environment', 'stage'],
+            buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+        )
+        
+        self.exchange_private_stream_events = Counter(
+            'crypto_exchange_private_stream_events_total',
+            'Private WebSocket events received (orders, fills, positions)',
+            ['exchange', 'channel']
+        )
+        
+        self.exchange_circuit_state = Gauge(
+            'crypto_exchange_circuit_state',
+            'Circuit breaker state per endpoint class (0=closed, 1=half_open, 2=open)',
+            ['exchange', 'environment', 'endpoint_class']
+        )
+        
+        self.exchange_circuit_rejections = Counter(
+            'crypto_exchange_circuit_rejections_total',
+            'Requests failed fast by an open circuit breaker',
+            ['exchange', 'endpoint_class']
+        )
+        
+        self.exchange_retries = Counter(
+            'crypto_exchange_retries_total',
+            'Exchange request retry decisions',
+            ['exchange', 'endpoint_class', 'outcome']
+        )
+        
+        self.exchange_clock_offset = Gauge(
+            'crypto_exchange_clock_offset_seconds',
+            'Estimated exchange clock minus local clock',
+            ['exchange', 'environment']
+        )
+        
+        self.exchange_clock_rtt = Gauge(
+            'crypto_exchange_clock_rtt_seconds',
+            'Round-trip time of the clock sample the offset was taken from',
+            ['exchange', 'environment']
+        )
+        
+        self.risk_check_duration = Histogram(
+            'crypto_risk_check_duration_seconds',
+            'Latency of individual risk checks',
+            ['path', 'check', 'outcome'],
+            buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+        )
+        
+        self.risk_gate_phase_duration = Histogram(
+            'crypto_risk_gate_phase_duration_seconds',
+            'Latency of risk gate / signal validation phases (state, price, checks, audit, total)',
+            ['path', 'phase'],
+            buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+        )
+        
+        self.risk_latency_budget_exceeded = Counter(
+            'crypto_risk_latency_budget_exceeded_total',
+            'Risk checks or phases over their latency budget (flagged/denied/failed_open)',
+            ['path', 'check', 'action']
+        )
+        
+        # Rolling windows for the JSON breakdown: (path, kind, name) -> recent seconds
+        self._risk_latency: Dict[Tuple[str, str, str], Deque[float]] = defaultdict(
+            lambda: deque(maxlen=RISK_LATENCY_WINDOW)
+        )
+        self._risk_latency_counts: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._risk_budget_exceeded: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        
+        self.risk_audit_events = Counter(
+            'crypto_risk_audit_events_total',
+            'Risk audit events by outcome (written/dropped/failed)',
+            ['outcome']
+        )
+        
+        self.risk_audit_queue_depth = Gauge(
+            'crypto_risk_audit_queue_depth',
+            'Risk audit events waiting to be written'
+        )
+        
         self._initialized = True
         logger.info("MetricsService initialized successfully")
     
@@ -155,6 +286,18 @@ class MetricsService:
         if slippage_bps is not None:
             self.slippage_histogram.labels(symbol=symbol, side=side).observe(slippage_bps)
     
+    def record_time_to_protected(self, symbol: str, outcome: str, duration_seconds: float):
+        """Record how long a filled entry waited for its bracket (outcome: protected/partial/unprotected)"""
+        self.time_to_protected.labels(symbol=symbol, outcome=outcome).observe(duration_seconds)
+    
+    def record_execution_queue_wait(self, priority: str, outcome: str, wait_seconds: float):
+        """Record an execution request's queue wait (outcome: started/dropped/rejected)"""
+        self.execution_queue_wait.labels(priority=priority, outcome=outcome).observe(wait_seconds)
+    
+    def set_execution_queue_depth(self, environment: str, priority: str, depth: int):
+        """Set the number of execution requests waiting in a priority class"""
+        self.execution_queue_depth.labels(environment=environment, priority=priority).set(depth)
+    
     def record_risk_gate_decision(self, decision: str, reason: str):
         """Record a risk gate decision"""
         self.risk_gate_decisions.labels(decision=decision, reason=reason).inc()
@@ -206,6 +349,102 @@ class MetricsService:
             environment=environment
         ).set(1 if connected else 0)
     
+    def set_rate_limit_state(self, exchange: str, environment: str, tokens_available: float, queue_depth: int):
+        """Set exchange rate limiter token and queue state"""
+        self.exchange_rate_limit_tokens.labels(
+            exchange=exchange,
+            environment=environment
+        ).set(tokens_available)
+        self.exchange_rate_limit_queue_depth.labels(
+            exchange=exchange,
+            environment=environment
+        ).set(queue_depth)
+    
+    def record_rate_limit_wait(self, exchange: str, priority: str, wait_seconds: float):
+        """Record time spent waiting for exchange rate limiter tokens"""
+        self.exchange_rate_limit_wait.labels(
+            exchange=exchange,
+            priority=priority
+        ).observe(wait_seconds)
+    
+    def record_exchange_read_coalescing(self, exchange: str, result: str):
+        """Record whether an exchange read hit the network, an in-flight request or the cache"""
+        self.exchange_read_coalescing.labels(exchange=exchange, result=result).inc()
+    
+    def record_websocket_timing(self, exchange: str, environment: str, stage: str, duration_seconds: float):
+        """Record WebSocket reconnect latency for a stage (authenticated/first_message)"""
+        self.exchange_websocket_timing.labels(
+            exchange=exchange,
+            environment=environment,
+            stage=stage
+        ).observe(duration_seconds)
+    
+    def record_private_stream_event(self, exchange: str, channel: str):
+        """Record a private order/fill/position stream event"""
+        self.exchange_private_stream_events.labels(exchange=exchange, channel=channel).inc()
+    
+    def set_circuit_breaker_state(self, exchange: str, environment: str, endpoint_class: str, state_value: int):
+        """Update circuit breaker state gauge"""
+        self.exchange_circuit_state.labels(
+            exchange=exchange,
+            environment=environment,
+            endpoint_class=endpoint_class
+        ).set(state_value)
+    
+    def record_circuit_breaker_rejection(self, exchange: str, endpoint_class: str):
+        """Record a request rejected by an open circuit"""
+        self.exchange_circuit_rejections.labels(exchange=exchange, endpoint_class=endpoint_class).inc()
+    
+    def record_exchange_retry(self, exchange: str, endpoint_class: str, outcome: str):
+        """Record a retry decision (retried/budget_exhausted)"""
+        self.exchange_retries.labels(exchange=exchange, endpoint_class=endpoint_class, outcome=outcome).inc()
+    
+    def set_exchange_clock_offset(self, exchange: str, environment: str, offset_seconds: float, rtt_seconds: float):
+        """Update exchange clock skew gauges"""
+        self.exchange_clock_offset.labels(exchange=exchange, environment=environment).set(offset_seconds)
+        self.exchange_clock_rtt.labels(exchange=exchange, environment=environment).set(rtt_seconds)
+    
+    def record_risk_check(self, path: str, check: str, outcome: str, duration_seconds: float):
+        """Record one risk check evaluation (allowed/denied/timeout) on a path (order_gate/signal)"""
+        self.risk_check_duration.labels(path=path, check=check, outcome=outcome).observe(duration_seconds)
+        self._risk_latency[(path, "checks", check)].append(duration_seconds)
+        self._risk_latency_counts[(path, "checks", check)] += 1
+    
+    def record_risk_gate_phase(self, path: str, phase: str, duration_seconds: float):
+        """Record one risk gate phase span"""
+        self.risk_gate_phase_duration.labels(path=path, phase=phase).observe(duration_seconds)
+        self._risk_latency[(path, "phases", phase)].append(duration_seconds)
+        self._risk_latency_counts[(path, "phases", phase)] += 1
+    
+    def record_risk_budget_exceeded(self, path: str, name: str, action: str, kind: str = "checks"):
+        """Record a check (kind="checks") or phase (kind="phases") over its latency budget"""
+        self.risk_latency_budget_exceeded.labels(path=path, check=name, action=action).inc()
+        self._risk_budget_exceeded[(path, kind, name)] += 1
+    
+    def get_risk_latency_breakdown(self) -> Dict[str, Any]:
+        """Per-path latency percentiles (ms) for each risk check and phase over the recent window"""
+        breakdown: Dict[str, Any] = {}
+        for (path, kind, name), window in list(self._risk_latency.items()):
+            samples = np.fromiter(window, dtype=float) * 1000.0
+            if not samples.size:
+                continue
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+            breakdown.setdefault(path, {"checks": {}, "phases": {}})[kind][name] = {
+                "count": self._risk_latency_counts[(path, kind, name)],
+                "window": int(samples.size),
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3),
+                "max_ms": round(float(samples.max()), 3),
+                "over_budget": self._risk_budget_exceeded.get((path, kind, name), 0)
+            }
+        return breakdown
+    
+    def record_risk_audit(self, outcome: str, count: int, queue_depth: int):
+        """Record risk audit writer progress"""
+        self.risk_audit_events.labels(outcome=outcome).inc(count)
+        self.risk_audit_queue_depth.set(queue_depth)
+    
     def export_metrics(self) -> str:
         """Export metrics in Prometheus format"""
         return generate_latest().decode('utf-8')
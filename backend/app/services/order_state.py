@@ -0,0 +1,718 @@
+"""
+Order State Store for Crypto-0DTE System
+
+Authoritative in-memory state of trades and their orders for one trading
+environment, with explicit status transitions:
+
+    Order: PENDING → SUBMITTED → PARTIALLY_FILLED → FILLED / CANCELLED
+           (REJECTED, EXPIRED and FAILED end an order early)
+    Trade: PENDING → SUBMITTED → (PARTIALLY_)FILLED → CLOSED
+           (FAILED, REJECTED and CANCELLED end a trade that never opened)
+
+Every change is queued to a local journal and changed rows are written
+behind to Postgres in batched upserts, so the order path never waits on
+a database round trip or a disk sync. A writer thread appends journal
+records and fsyncs once per group of records (group commit): a change is
+durable within one group commit of being applied, typically a few
+milliseconds, and a crash inside that window loses it. On startup the
+journal is replayed and its rows written again; after a successful flush
+it is compacted down to the changes still unwritten.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.database import get_db
+from app.models.order import Order, OrderSide, OrderStatus, OrderType
+from app.models.trade import ExitReason, Trade, TradeStatus, TradeType
+from app.models.trade import OrderType as TradeOrderType
+
+logger = logging.getLogger(__name__)
+
+
+# Allowed status transitions (only PARTIALLY_FILLED may be re-applied, with new fill details)
+ORDER_TRANSITIONS: Dict[OrderStatus, Set[OrderStatus]] = {
+    OrderStatus.PENDING: {
+        OrderStatus.SUBMITTED, OrderStatus.REJECTED, OrderStatus.FAILED, OrderStatus.CANCELLED
+    },
+    OrderStatus.SUBMITTED: {
+        OrderStatus.PARTIALLY_FILLED, OrderStatus.FILLED, OrderStatus.CANCELLED,
+        OrderStatus.REJECTED, OrderStatus.EXPIRED
+    },
+    OrderStatus.PARTIALLY_FILLED: {
+        OrderStatus.PARTIALLY_FILLED, OrderStatus.FILLED, OrderStatus.CANCELLED, OrderStatus.EXPIRED
+    },
+    OrderStatus.FILLED: set(),
+    OrderStatus.CANCELLED: set(),
+    OrderStatus.REJECTED: set(),
+    OrderStatus.EXPIRED: set(),
+    OrderStatus.FAILED: set(),
+}
+
+TRADE_TRANSITIONS: Dict[TradeStatus, Set[TradeStatus]] = {
+    TradeStatus.PENDING: {
+        TradeStatus.SUBMITTED, TradeStatus.PARTIALLY_FILLED, TradeStatus.FILLED,
+        TradeStatus.FAILED, TradeStatus.REJECTED, TradeStatus.CANCELLED
+    },
+    TradeStatus.SUBMITTED: {
+        TradeStatus.PARTIALLY_FILLED, TradeStatus.FILLED, TradeStatus.FAILED,
+        TradeStatus.REJECTED, TradeStatus.CANCELLED
+    },
+    TradeStatus.PARTIALLY_FILLED: {TradeStatus.PARTIALLY_FILLED, TradeStatus.FILLED, TradeStatus.CLOSED},
+    TradeStatus.FILLED: {TradeStatus.CLOSED},
+    TradeStatus.CLOSED: set(),
+    TradeStatus.FAILED: set(),
+    TradeStatus.REJECTED: set(),
+    TradeStatus.CANCELLED: set(),
+}
+
+# Engine exit types -> trade exit reasons
+EXIT_REASONS = {
+    "TAKE_PROFIT": ExitReason.PROFIT_TARGET,
+    "STOP_LOSS": ExitReason.STOP_LOSS,
+    "MANUAL": ExitReason.MANUAL,
+    "RISK_MANAGEMENT": ExitReason.RISK_MANAGEMENT,
+    "EMERGENCY": ExitReason.EMERGENCY,
+}
+
+
+class InvalidTransition(Exception):
+    """Raised when a trade or order status change is not allowed from its current status"""
+    pass
+
+
+@dataclass(slots=True)
+class TradeState:
+    """In-memory trade (fields named after autonomous_trades columns)"""
+    trade_id: str
+    symbol: str
+    trade_type: TradeType
+    quantity: float
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    status: TradeStatus = TradeStatus.PENDING
+    order_type: TradeOrderType = TradeOrderType.MARKET
+    entry_price: Optional[float] = None
+    target_price: Optional[float] = None
+    stop_loss_price: Optional[float] = None
+    signal_reasoning: Optional[str] = None
+    exchange_order_id: Optional[str] = None
+    filled_quantity: float = 0.0
+    average_fill_price: Optional[float] = None
+    exit_price: Optional[float] = None
+    exit_reason: Optional[ExitReason] = None
+    exit_order_id: Optional[str] = None
+    realized_pnl: Optional[float] = None
+    is_paper_trade: bool = True
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    submitted_at: Optional[datetime] = None
+    filled_at: Optional[datetime] = None
+    closed_at: Optional[datetime] = None
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    version: int = 0  # Bumped on every change; not persisted
+
+    @property
+    def is_terminal(self) -> bool:
+        return not TRADE_TRANSITIONS[self.status]
+
+
+@dataclass(slots=True)
+class OrderState:
+    """In-memory order (fields named after autonomous_orders columns)"""
+    order_id: str  # Client order ID; the exchange's ID arrives on submission
+    trade_id: uuid.UUID  # TradeState.id
+    symbol: str
+    side: OrderSide
+    order_type: OrderType
+    quantity: float
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    status: OrderStatus = OrderStatus.PENDING
+    price: Optional[float] = None
+    stop_price: Optional[float] = None
+    filled_quantity: float = 0.0
+    average_fill_price: Optional[float] = None
+    exchange_order_id: Optional[str] = None
+    exchange_status: Optional[str] = None
+    exchange_error_message: Optional[str] = None
+    reduce_only: bool = False
+    is_paper_trade: bool = True
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    submitted_at: Optional[datetime] = None
+    filled_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    version: int = 0
+
+    @property
+    def is_terminal(self) -> bool:
+        return not ORDER_TRANSITIONS[self.status]
+
+
+Entity = Union[TradeState, OrderState]
+
+# Field decoders for journal replay
+_DECODERS = {
+    "id": uuid.UUID,
+    "trade_type": TradeType,
+    "status": None,  # Per entity: TradeStatus / OrderStatus
+    "order_type": None,  # Per entity: TradeOrderType / OrderType
+    "exit_reason": ExitReason,
+    "side": OrderSide,
+}
+_DATETIME_FIELDS = {"created_at", "submitted_at", "filled_at", "closed_at", "cancelled_at", "updated_at"}
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):  # Enum
+        return value.value
+    return value
+
+
+def _entity_to_dict(entity: Entity) -> Dict[str, Any]:
+    return {f.name: _encode(getattr(entity, f.name)) for f in fields(entity) if f.name != "version"}
+
+
+def _entity_from_dict(kind: str, data: Dict[str, Any]) -> Entity:
+    cls = TradeState if kind == "trade" else OrderState
+    status_type, order_type = (TradeStatus, TradeOrderType) if kind == "trade" else (OrderStatus, OrderType)
+    values = {}
+    for name, value in data.items():
+        if value is None:
+            values[name] = None
+        elif name == "status":
+            values[name] = status_type(value)
+        elif name == "order_type":
+            values[name] = order_type(value)
+        elif name == "trade_id" and kind == "order":
+            values[name] = uuid.UUID(value)
+        elif name in _DATETIME_FIELDS:
+            values[name] = datetime.fromisoformat(value)
+        elif _DECODERS.get(name):
+            values[name] = _DECODERS[name](value)
+        else:
+            values[name] = value
+    return cls(**values)
+
+
+def _to_row(entity: Entity) -> Dict[str, Any]:
+    """Column values for an upsert (floats as Decimal for NUMERIC columns)"""
+    return {
+        f.name: Decimal(str(value)) if isinstance(value, float) else value
+        for f in fields(entity) if f.name != "version"
+        for value in (getattr(entity, f.name),)
+    }
+
+
+class OrderStateStore:
+    """In-memory trades and orders for one environment, journaled and written behind"""
+
+    def __init__(self, paper_trading: bool):
+        self.paper_trading = paper_trading
+        self.environment = "testnet" if paper_trading else "live"
+
+        # Configuration
+        self.flush_interval = settings.ORDER_STATE_FLUSH_INTERVAL
+        self.flush_batch = settings.ORDER_STATE_FLUSH_BATCH
+        self.journal_path = settings.ORDER_JOURNAL_PATH.format(environment=self.environment)
+        self.journal_fsync = settings.ORDER_JOURNAL_FSYNC
+
+        # State: trades by trade ID, orders by client order ID, exchange ID -> client order ID
+        self.trades: Dict[str, TradeState] = {}
+        self.orders: Dict[str, OrderState] = {}
+        self._by_exchange_id: Dict[str, str] = {}
+        self._trade_ids: Dict[uuid.UUID, str] = {}  # TradeState.id -> trade ID
+
+        # Write-behind: changed entities and the version last written
+        self._dirty: Dict[Tuple[str, str], int] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._recovered = False
+
+        # Journal writer thread: ("append", line) / ("compact", lines) / None to stop
+        self._journal_queue: queue.Queue = queue.Queue()
+        self._journal_thread: Optional[threading.Thread] = None
+
+        # Statistics
+        self.transitions = 0
+        self.journal_records = 0
+        self.journal_syncs = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.recovered_records = 0
+        self.last_flush_ms = 0.0
+
+    # =============================================================================
+    # LIFECYCLE
+    # =============================================================================
+
+    def ensure_started(self):
+        """Replay the journal on first use and start the write-behind loop (idempotent)"""
+        if not self._recovered:
+            self._recover()
+            self._recovered = True
+        if self._journal_thread is None or not self._journal_thread.is_alive():
+            self._journal_thread = threading.Thread(
+                target=self._journal_writer, name=f"order-journal-{self.environment}", daemon=True
+            )
+            self._journal_thread.start()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+            logger.info(f"Order state store started for {self.environment}")
+
+    async def stop(self):
+        """Stop the write-behind loop after a final flush (unwritten rows stay journaled)"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Final order state flush failed, {len(self._dirty)} rows kept in journal: {e}")
+        if self._journal_thread and self._journal_thread.is_alive():
+            self._journal_queue.put(None)
+            await asyncio.to_thread(self._journal_thread.join)
+        self._journal_thread = None
+
+    def _recover(self):
+        """Replay journaled changes not yet known to be written"""
+        try:
+            with open(self.journal_path, "r") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+                entity = _entity_from_dict(record["kind"], record["data"])
+            except Exception as e:
+                logger.warning(f"Skipping unreadable order journal record: {e}")  # Torn final write
+                continue
+            self._put(entity)
+            self._dirty[self._key(entity)] = entity.version
+            self.recovered_records += 1
+
+        if self.recovered_records:
+            logger.warning(
+                f"Recovered {self.recovered_records} order journal records for {self.environment}; "
+                f"{len(self._dirty)} rows pending write"
+            )
+
+    async def load_open(self) -> int:
+        """Load open trades and their active orders from the database (journaled state wins)"""
+        async for db in get_db():
+            result = await db.execute(
+                select(Trade).filter(
+                    Trade.is_paper_trade == self.paper_trading,
+                    Trade.status.in_([
+                        TradeStatus.PENDING, TradeStatus.SUBMITTED, TradeStatus.PARTIALLY_FILLED, TradeStatus.FILLED
+                    ])
+                )
+            )
+            trades = result.scalars().all()
+            result = await db.execute(
+                select(Order).filter(
+                    Order.is_paper_trade == self.paper_trading,
+                    Order.status.in_([OrderStatus.PENDING, OrderStatus.SUBMITTED, OrderStatus.PARTIALLY_FILLED])
+                )
+            )
+            orders = result.scalars().all()
+            break
+
+        loaded = 0
+        for row in trades:
+            if row.trade_id not in self.trades:
+                self._put(self._from_model(TradeState, row))
+                loaded += 1
+        for row in orders:
+            if row.order_id not in self.orders:
+                self._put(self._from_model(OrderState, row))
+                loaded += 1
+        return loaded
+
+    @staticmethod
+    def _from_model(cls, row) -> Entity:
+        values = {}
+        for f in fields(cls):
+            if f.name == "version":
+                continue
+            value = getattr(row, f.name)
+            values[f.name] = float(value) if isinstance(value, Decimal) else value
+        return cls(**values)
+
+    # =============================================================================
+    # TRADES
+    # =============================================================================
+
+    def create_trade(
+        self,
+        trade_id: str,
+        symbol: str,
+        side: str,
+        quantity: float,
+        entry_price: Optional[float] = None,
+        stop_loss_price: Optional[float] = None,
+        target_price: Optional[float] = None,
+        signal_reasoning: Optional[str] = None,
+        order_type: str = "MARKET"
+    ) -> TradeState:
+        """Create a PENDING trade (its ID doubles as the primary key)"""
+        trade = TradeState(
+            trade_id=trade_id,
+            id=uuid.UUID(trade_id),
+            symbol=symbol,
+            trade_type=TradeType.BUY if side.upper() == "BUY" else TradeType.SELL,
+            quantity=float(quantity),
+            order_type=TradeOrderType(order_type.upper()),
+            entry_price=entry_price,
+            stop_loss_price=stop_loss_price,
+            target_price=target_price,
+            signal_reasoning=signal_reasoning,
+            is_paper_trade=self.paper_trading
+        )
+        self._commit(trade)
+        return trade
+
+    def get_trade(self, trade_id: str) -> Optional[TradeState]:
+        """Trade held in memory (open, or closed and not yet written)"""
+        return self.trades.get(trade_id)
+
+    async def fetch_trade(self, trade_id: str) -> Optional[TradeState]:
+        """Trade from memory, else loaded from the database"""
+        trade = self.trades.get(trade_id)
+        if trade is not None:
+            return trade
+        async for db in get_db():
+            result = await db.execute(select(Trade).filter(Trade.trade_id == trade_id))
+            row = result.scalar_one_or_none()
+            break
+        if row is None:
+            return None
+        trade = self._from_model(TradeState, row)
+        if not trade.is_terminal:
+            self._put(trade)
+        return trade
+
+    def transition_trade(self, trade_id: str, status: TradeStatus, **changes) -> TradeState:
+        """Move a trade to a new status, applying column changes with it"""
+        trade = self._require(self.trades, trade_id, "Trade")
+        if status not in TRADE_TRANSITIONS[trade.status]:
+            raise InvalidTransition(f"Trade {trade_id}: {trade.status.value} -> {status.value} not allowed")
+
+        now = datetime.utcnow()
+        if status == TradeStatus.SUBMITTED:
+            changes.setdefault("submitted_at", now)
+        elif status == TradeStatus.FILLED:
+            changes.setdefault("filled_at", now)
+        elif status == TradeStatus.CLOSED:
+            changes.setdefault("closed_at", now)
+            if isinstance(changes.get("exit_reason"), str):
+                changes["exit_reason"] = EXIT_REASONS.get(changes["exit_reason"].upper(), ExitReason.MANUAL)
+        return self._apply(trade, status=status, **changes)
+
+    def update_trade(self, trade_id: str, **changes) -> TradeState:
+        """Change trade columns without a status transition (stop loss, size)"""
+        return self._apply(self._require(self.trades, trade_id, "Trade"), **changes)
+
+    # =============================================================================
+    # ORDERS
+    # =============================================================================
+
+    def create_order(
+        self,
+        trade_id: str,
+        symbol: str,
+        side: str,
+        quantity: float,
+        order_type: str,
+        price: Optional[float] = None,
+        reduce_only: bool = False
+    ) -> OrderState:
+        """Create a PENDING order for a trade before it is sent"""
+        trade = self._require(self.trades, trade_id, "Trade")
+        order_type = OrderType(order_type.upper())
+        order = OrderState(
+            order_id=str(uuid.uuid4()),
+            trade_id=trade.id,
+            symbol=symbol,
+            side=OrderSide(side.upper()),
+            order_type=order_type,
+            quantity=float(quantity),
+            price=price if order_type != OrderType.STOP_LOSS else None,
+            stop_price=price if order_type == OrderType.STOP_LOSS else None,
+            reduce_only=reduce_only,
+            is_paper_trade=self.paper_trading
+        )
+        self._commit(order)
+        return order
+
+    def get_order(self, order_id: str) -> Optional[OrderState]:
+        """Order by client or exchange order ID"""
+        return self.orders.get(order_id) or self.orders.get(self._by_exchange_id.get(str(order_id), ""))
+
+    def transition_order(self, order_id: str, status: OrderStatus, **changes) -> OrderState:
+        """Move an order (client or exchange ID) to a new status, applying column changes with it"""
+        order = self.get_order(order_id)
+        if order is None:
+            raise KeyError(f"Order {order_id} not found")
+        if status not in ORDER_TRANSITIONS[order.status]:
+            raise InvalidTransition(f"Order {order.order_id}: {order.status.value} -> {status.value} not allowed")
+
+        now = datetime.utcnow()
+        if status == OrderStatus.SUBMITTED:
+            changes.setdefault("submitted_at", now)
+        elif status == OrderStatus.FILLED:
+            changes.setdefault("filled_at", now)
+        elif status in (OrderStatus.CANCELLED, OrderStatus.EXPIRED):
+            changes.setdefault("cancelled_at", now)
+        return self._apply(order, status=status, **changes)
+
+    def trade_orders(self, trade_id: str, order_type: Optional[OrderType] = None, open_only: bool = True) -> List[OrderState]:
+        """Orders of a trade held in memory"""
+        trade = self.trades.get(trade_id)
+        if trade is None:
+            return []
+        return [
+            order for order in self.orders.values()
+            if order.trade_id == trade.id
+            and (order_type is None or order.order_type == order_type)
+            and not (open_only and order.is_terminal)
+        ]
+
+    def open_orders(self) -> List[OrderState]:
+        """Orders not yet in a terminal status"""
+        return [order for order in self.orders.values() if not order.is_terminal]
+
+    def trade_id_of(self, order: OrderState) -> Optional[str]:
+        """Trade ID an order belongs to"""
+        return self._trade_ids.get(order.trade_id)
+
+    def pending_trades(self) -> List[TradeState]:
+        """Trades changed in memory that the database does not have yet"""
+        return [self.trades[trade_id] for kind, trade_id in self._dirty if kind == "trade" and trade_id in self.trades]
+
+    # =============================================================================
+    # STATE CHANGES AND JOURNAL
+    # =============================================================================
+
+    @staticmethod
+    def _key(entity: Entity) -> Tuple[str, str]:
+        return ("trade", entity.trade_id) if isinstance(entity, TradeState) else ("order", entity.order_id)
+
+    @staticmethod
+    def _require(index: Dict[str, Entity], key: str, label: str) -> Entity:
+        entity = index.get(key)
+        if entity is None:
+            raise KeyError(f"{label} {key} not found")
+        return entity
+
+    def _put(self, entity: Entity):
+        if isinstance(entity, TradeState):
+            self.trades[entity.trade_id] = entity
+            self._trade_ids[entity.id] = entity.trade_id
+        else:
+            self.orders[entity.order_id] = entity
+            if entity.exchange_order_id:
+                self._by_exchange_id[str(entity.exchange_order_id)] = entity.order_id
+
+    def _apply(self, entity: Entity, **changes) -> Entity:
+        for name, value in changes.items():
+            setattr(entity, name, value)
+        entity.updated_at = datetime.utcnow()
+        self._commit(entity)
+        self.transitions += 1
+        return entity
+
+    def _commit(self, entity: Entity):
+        """Queue the entity's new state to the journal, publish it and mark it for write-behind"""
+        self.ensure_started()
+        entity.version += 1
+        self._append_journal(entity)
+        self._put(entity)
+        self._dirty[self._key(entity)] = entity.version
+        if len(self._dirty) >= self.flush_batch:
+            self._wake.set()
+
+    @staticmethod
+    def _journal_line(entity: Entity) -> str:
+        kind, _ = OrderStateStore._key(entity)
+        return json.dumps({"kind": kind, "data": _entity_to_dict(entity)}) + "\n"
+
+    def _append_journal(self, entity: Entity):
+        self._journal_queue.put(("append", self._journal_line(entity)))
+        self.journal_records += 1
+
+    def _compact_journal(self):
+        """Queue a rewrite of the journal with only the entities still unwritten"""
+        lines = [self._journal_line(entity) for entity in map(self._lookup, self._dirty) if entity is not None]
+        self._journal_queue.put(("compact", lines))
+
+    def _journal_writer(self):
+        """Writer thread: apply queued journal operations in order, one fsync per group"""
+        journal = None
+        while True:
+            group = [self._journal_queue.get()]
+            while True:
+                try:
+                    group.append(self._journal_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                for item in group:
+                    if item is None:
+                        continue
+                    operation, payload = item
+                    if operation == "append":
+                        if journal is None:
+                            journal = open(self.journal_path, "a")
+                        journal.write(payload)
+                    else:
+                        # Later appends are superseded by (or already written to) the compacted snapshot
+                        if journal is not None:
+                            journal.close()
+                            journal = None
+                        temp_path = f"{self.journal_path}.tmp"
+                        with open(temp_path, "w") as f:
+                            f.writelines(payload)
+                            f.flush()
+                            os.fsync(f.fileno())
+                        os.replace(temp_path, self.journal_path)
+                if journal is not None:
+                    journal.flush()
+                    if self.journal_fsync:
+                        os.fsync(journal.fileno())
+                        self.journal_syncs += 1
+            except Exception as e:
+                logger.error(f"Order journal write failed: {e}")
+
+            if None in group:
+                if journal is not None:
+                    journal.close()
+                return
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Entity]:
+        kind, entity_id = key
+        return self.trades.get(entity_id) if kind == "trade" else self.orders.get(entity_id)
+
+    # =============================================================================
+    # WRITE-BEHIND
+    # =============================================================================
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.flush_failures += 1
+                logger.warning(f"Order state flush failed, {len(self._dirty)} rows kept in journal: {e}")
+
+    async def flush(self):
+        """Upsert changed trades and orders in one transaction, then compact the journal"""
+        if not self._dirty:
+            return
+        started = time.perf_counter()
+        batch = {key: (version, self._lookup(key)) for key, version in self._dirty.items()}
+        trades = [_to_row(entity) for (kind, _), (_, entity) in batch.items() if kind == "trade" and entity]
+        orders = [_to_row(entity) for (kind, _), (_, entity) in batch.items() if kind == "order" and entity]
+
+        async for db in get_db():
+            # Trades first: orders reference them
+            for model, rows, key in ((Trade, trades, "trade_id"), (Order, orders, "order_id")):
+                if rows:
+                    statement = insert(model).values(rows)
+                    await db.execute(statement.on_conflict_do_update(
+                        index_elements=[key],
+                        set_={name: statement.excluded[name] for name in rows[0] if name not in ("id", key)}
+                    ))
+            await db.commit()
+            break
+
+        # Rows changed again while the write was in flight stay dirty
+        for key, (version, _) in batch.items():
+            if self._dirty.get(key) == version:
+                del self._dirty[key]
+        self._evict_settled()
+        self._compact_journal()
+
+        self.flushes += 1
+        self.rows_written += len(trades) + len(orders)
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    def _evict_settled(self):
+        """Drop written trades that are finished, with their finished orders"""
+        for trade_id, trade in list(self.trades.items()):
+            if trade.is_terminal and ("trade", trade_id) not in self._dirty:
+                orders = [order for order in self.orders.values() if order.trade_id == trade.id]
+                if all(order.is_terminal and ("order", order.order_id) not in self._dirty for order in orders):
+                    for order in orders:
+                        self.orders.pop(order.order_id, None)
+                        self._by_exchange_id.pop(str(order.exchange_order_id), None)
+                    del self.trades[trade_id]
+                    self._trade_ids.pop(trade.id, None)
+
+    # =============================================================================
+    # STATISTICS
+    # =============================================================================
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get order state store statistics"""
+        return {
+            "environment": self.environment,
+            "trades_in_memory": len(self.trades),
+            "orders_in_memory": len(self.orders),
+            "open_orders": len(self.open_orders()),
+            "pending_writes": len(self._dirty),
+            "transitions": self.transitions,
+            "journal_records": self.journal_records,
+            "journal_syncs": self.journal_syncs,
+            "journal_queued": self._journal_queue.qsize(),
+            "recovered_records": self.recovered_records,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "rows_written": self.rows_written,
+            "last_flush_ms": round(self.last_flush_ms, 3)
+        }
+
+
+# Shared store per environment (one journal writer per file)
+_stores: Dict[str, OrderStateStore] = {}
+
+
+def get_order_state_store(paper_trading: bool) -> OrderStateStore:
+    """Get the shared order state store for an environment"""
+    key = "testnet" if paper_trading else "live"
+    store = _stores.get(key)
+    if store is None:
+        store = OrderStateStore(paper_trading=paper_trading)
+        _stores[key] = store
+    return store
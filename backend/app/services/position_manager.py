@@ -16,7 +16,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 import math
 
-from app.services.exchanges.delta_exchange import DeltaExchangeConnector
+from app.services.exchanges.connector_pool import get_delta_connector
 from app.database import get_db
 from app.config import Settings
 from app.models.trade import Trade, TradeStatus, TradeType
@@ -42,8 +42,8 @@ class PositionManager:
         # Determine paper trading mode
         self.paper_trading = paper_trading if paper_trading is not None else True  # Default to paper trading for safety
         
-        # Initialize Delta Exchange connector with environment awareness
-        self.delta_connector = DeltaExchangeConnector(paper_trading=self.paper_trading)
+        # Shared Delta Exchange connector for this environment
+        self.delta_connector = get_delta_connector(paper_trading=self.paper_trading)
         
         # Configuration
         self.trailing_stop_threshold = 0.02  # 2% profit before trailing starts
@@ -0,0 +1,468 @@
+"""
+Risk Analytics Engine for Crypto-0DTE System
+
+Loss-distribution estimates for the open portfolio. Builds an aligned
+log-returns matrix for held (and recently gated) symbols from exchange
+candles and computes, with NumPy:
+
+- historical VaR/CVaR from overlapping multi-bar return scenarios
+- parametric (normal) VaR/CVaR from the sample covariance
+- EWMA (RiskMetrics) VaR/CVaR from an exponentially weighted covariance
+- EWMA correlations and correlation-weighted exposure for concentration limits
+
+Candle history, covariances and reports are cached per bar. A new bar
+appends only the missing candles and updates the EWMA covariance
+incrementally, so the pre-trade marginal-VaR lookup is a small matrix
+product against cached state.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.exchanges.connector_pool import get_delta_connector
+
+logger = logging.getLogger(__name__)
+
+
+# Candle resolution -> seconds
+RESOLUTION_SECONDS = {
+    "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "6h": 21600, "1d": 86400,
+}
+
+@dataclass(frozen=True, slots=True)
+class VaREstimate:
+    """Value-at-Risk and Conditional VaR (expected shortfall) as positive USD losses"""
+    method: str
+    confidence: float
+    horizon_bars: int
+    var: float
+    cvar: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "confidence": self.confidence,
+            "horizon_bars": self.horizon_bars,
+            "var": round(self.var, 2),
+            "cvar": round(self.cvar, 2)
+        }
+
+
+# =============================================================================
+# ESTIMATORS
+# =============================================================================
+
+def horizon_returns(returns: np.ndarray, horizon: int) -> np.ndarray:
+    """Overlapping ``horizon``-bar log returns from a (T x N) one-bar log-returns matrix"""
+    if horizon <= 1:
+        return returns
+    cumulative = np.vstack([np.zeros((1, returns.shape[1])), np.cumsum(returns, axis=0)])
+    return cumulative[horizon:] - cumulative[:-horizon]
+
+
+def historical_var_cvar(pnl: np.ndarray, confidence: float) -> Tuple[float, float]:
+    """VaR/CVaR from P&L scenarios (empirical quantile and tail mean)"""
+    if pnl.size == 0:
+        return 0.0, 0.0
+    cutoff = np.quantile(pnl, 1.0 - confidence)
+    tail = pnl[pnl <= cutoff]
+    return max(0.0, -float(cutoff)), max(0.0, -float(tail.mean()) if tail.size else -float(cutoff))
+
+
+def parametric_var_cvar(mean: float, std: float, confidence: float) -> Tuple[float, float]:
+    """Normal VaR/CVaR for a P&L distribution with the given mean and standard deviation"""
+    z = NormalDist().inv_cdf(confidence)
+    var = z * std - mean
+    cvar = std * math.exp(-0.5 * z * z) / (math.sqrt(2.0 * math.pi) * (1.0 - confidence)) - mean
+    return max(0.0, var), max(0.0, cvar)
+
+
+def ewma_covariance(returns: np.ndarray, decay: float) -> np.ndarray:
+    """RiskMetrics EWMA covariance (zero mean), most recent observation weighted highest"""
+    count = returns.shape[0]
+    weights = (1.0 - decay) * decay ** np.arange(count - 1, -1, -1)
+    weights /= weights.sum()
+    return (returns * weights[:, None]).T @ returns
+
+
+def covariance_to_correlation(cov: np.ndarray) -> np.ndarray:
+    """Correlation matrix from a covariance matrix (zero-variance series are uncorrelated)"""
+    std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+    corr = np.clip(np.nan_to_num(corr, nan=0.0, posinf=0.0, neginf=0.0), -1.0, 1.0)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+class RiskAnalyticsEngine:
+    """Per-environment VaR/CVaR engine with per-bar caching"""
+
+    def __init__(self, paper_trading: bool):
+        self.paper_trading = paper_trading
+        self.environment = "testnet" if paper_trading else "live"
+        self.delta_connector = get_delta_connector(paper_trading=paper_trading)
+
+        # Configuration
+        self.resolution = settings.RISK_VAR_RESOLUTION
+        self.bar_seconds = RESOLUTION_SECONDS.get(self.resolution, 300)
+        self.lookback_bars = settings.RISK_VAR_LOOKBACK_BARS
+        self.confidence_levels = tuple(settings.RISK_VAR_CONFIDENCE_LEVELS)
+        self.horizons = tuple(settings.RISK_VAR_HORIZON_BARS)
+        self.ewma_decay = settings.RISK_VAR_EWMA_DECAY
+        self.min_bars = settings.RISK_VAR_MIN_BARS
+        self.default_correlation = settings.RISK_CORRELATION_DEFAULT
+
+        # Candle history per symbol: (bar open times in seconds, closes)
+        self._history: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        # Model built from the aligned history
+        self._model_bar: Optional[int] = None
+        self._symbols: Tuple[str, ...] = ()
+        self._index: Dict[str, int] = {}
+        self._last_time: Optional[float] = None
+        self._returns = np.empty((0, 0))
+        self._mean = np.empty(0)
+        self._cov = np.empty((0, 0))
+        self._ewma_cov = np.empty((0, 0))
+        self._corr = np.empty((0, 0))
+
+        # Reports cached per (bar, exposures)
+        self._report_key: Optional[Tuple] = None
+        self._report: Dict[str, Any] = {}
+
+        self._attempted: set = set()  # Symbols already fetched for the current bar
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.model_builds = 0
+        self.incremental_updates = 0
+
+    # =============================================================================
+    # DATA
+    # =============================================================================
+
+    def _current_bar(self) -> int:
+        """Index of the last closed bar"""
+        return int(time.time() // self.bar_seconds) - 1
+
+    @property
+    def is_current(self) -> bool:
+        return self._model_bar == self._current_bar()
+
+    def covers(self, symbols: Iterable[str]) -> bool:
+        """Whether the model includes every symbol"""
+        return all(symbol in self._index for symbol in symbols)
+
+    async def refresh(self, symbols: Iterable[str]):
+        """Bring candle history and the model up to the last closed bar for these symbols"""
+        wanted = set(symbols) | set(self._symbols)
+        if not wanted:
+            return
+
+        async with self._lock:
+            bar = self._current_bar()
+            if bar != self._model_bar:
+                self._attempted = set()
+            elif wanted <= set(self._symbols) | self._attempted:
+                return
+
+            await asyncio.gather(*(self._update_history(symbol, bar) for symbol in wanted))
+            self._attempted |= wanted
+            self._rebuild_model(bar, wanted)
+
+    def request_refresh(self, symbols: Iterable[str]):
+        """Refresh in the background (coalesces with an in-flight refresh)"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._background_refresh(list(symbols)))
+
+    async def stop(self):
+        """Cancel an in-flight background refresh"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = None
+
+    async def _background_refresh(self, symbols: List[str]):
+        try:
+            await self.refresh(symbols)
+        except Exception as e:
+            logger.warning(f"Risk analytics refresh failed: {e}")
+
+    async def _update_history(self, symbol: str, bar: int):
+        """Fetch only the closed bars missing from the cached history"""
+        end = (bar + 1) * self.bar_seconds
+        cached = self._history.get(symbol)
+        if cached is not None and cached[0].size and cached[0][-1] >= bar * self.bar_seconds:
+            return
+
+        if cached is not None and cached[0].size:
+            start = int(cached[0][-1]) + self.bar_seconds
+        else:
+            start = end - (self.lookback_bars + 1) * self.bar_seconds
+
+        try:
+            candles = await self.delta_connector.get_candles(symbol, self.resolution, start=start, end=end)
+        except Exception as e:
+            logger.warning(f"Risk analytics: candle fetch failed for {symbol}: {e}")
+            return
+        times = np.array([candle["time"] / 1000.0 for candle in candles], dtype=float)
+        closes = np.array([float(candle["close"]) for candle in candles], dtype=float)
+
+        # Keep closed bars with valid prices only
+        mask = (times < end) & (closes > 0)
+        times, closes = times[mask], closes[mask]
+
+        if cached is not None and cached[0].size:
+            new = times > cached[0][-1]
+            times = np.concatenate([cached[0], times[new]])
+            closes = np.concatenate([cached[1], closes[new]])
+
+        keep = self.lookback_bars + 1
+        self._history[symbol] = (times[-keep:], closes[-keep:])
+
+    def _rebuild_model(self, bar: int, symbols: Iterable[str]):
+        """Align histories and (re)compute return statistics"""
+        usable = sorted(
+            symbol for symbol in symbols
+            if symbol in self._history and self._history[symbol][0].size > self.min_bars
+        )
+        if not usable:
+            self._model_bar = bar
+            return
+
+        common = self._history[usable[0]][0]
+        for symbol in usable[1:]:
+            common = np.intersect1d(common, self._history[symbol][0], assume_unique=True)
+
+        if common.size <= self.min_bars:
+            logger.warning(f"Risk analytics: only {common.size} aligned bars for {usable}")
+            self._model_bar = bar
+            return
+
+        closes = np.column_stack([
+            self._history[symbol][1][np.isin(self._history[symbol][0], common, assume_unique=True)]
+            for symbol in usable
+        ])
+        returns = np.diff(np.log(closes), axis=0)
+
+        same_universe = tuple(usable) == self._symbols and self._last_time is not None
+        new_rows = returns[common[1:] > self._last_time] if same_universe else returns[:0]
+
+        if same_universe and new_rows.shape[0] < returns.shape[0]:
+            # Incremental EWMA update: S_t = decay * S_{t-1} + (1 - decay) * r_t r_t'
+            ewma_cov = self._ewma_cov
+            for row in new_rows:
+                ewma_cov = self.ewma_decay * ewma_cov + (1.0 - self.ewma_decay) * np.outer(row, row)
+            if new_rows.shape[0]:
+                self.incremental_updates += 1
+        else:
+            ewma_cov = ewma_covariance(returns, self.ewma_decay)
+            self.model_builds += 1
+
+        self._symbols = tuple(usable)
+        self._index = {symbol: i for i, symbol in enumerate(usable)}
+        self._returns = returns
+        self._mean = returns.mean(axis=0)
+        self._cov = np.atleast_2d(np.cov(returns, rowvar=False))
+        self._ewma_cov = ewma_cov
+        self._corr = covariance_to_correlation(ewma_cov)
+        self._last_time = float(common[-1])
+        self._model_bar = bar
+        self._report_key = None
+
+    # =============================================================================
+    # ESTIMATES
+    # =============================================================================
+
+    def _exposure_vector(self, exposures: Dict[str, float]) -> np.ndarray:
+        """Signed USD exposures aligned with the model universe (unmodelled symbols are ignored)"""
+        vector = np.zeros(len(self._symbols))
+        for symbol, exposure in exposures.items():
+            i = self._index.get(symbol)
+            if i is not None:
+                vector[i] += exposure
+        return vector
+
+    def compute_var(self, exposures: Dict[str, float]) -> Dict[str, Any]:
+        """
+        VaR/CVaR for signed USD exposures by method, confidence and horizon.
+
+        Cached until the next bar or a change in exposures.
+        """
+        key = (self._model_bar, tuple(sorted((s, round(e, 2)) for s, e in exposures.items())))
+        if key == self._report_key:
+            return self._report
+
+        weights = self._exposure_vector(exposures)
+        estimates: List[VaREstimate] = []
+
+        if self._returns.size and weights.any():
+            for horizon in self.horizons:
+                # Historical: linear P&L of overlapping horizon returns
+                scenarios = np.expm1(horizon_returns(self._returns, horizon)) @ weights
+                mean = float(self._mean @ weights) * horizon
+                std = math.sqrt(max(0.0, float(weights @ self._cov @ weights)) * horizon)
+                ewma_std = math.sqrt(max(0.0, float(weights @ self._ewma_cov @ weights)) * horizon)
+
+                for confidence in self.confidence_levels:
+                    estimates.append(VaREstimate("historical", confidence, horizon, *historical_var_cvar(scenarios, confidence)))
+                    estimates.append(VaREstimate("parametric", confidence, horizon, *parametric_var_cvar(mean, std, confidence)))
+                    estimates.append(VaREstimate("ewma", confidence, horizon, *parametric_var_cvar(0.0, ewma_std, confidence)))
+
+        self._report = {
+            "resolution": self.resolution,
+            "bar": self._model_bar,
+            "symbols": list(self._symbols),
+            "unmodelled_symbols": sorted(s for s in exposures if s not in self._index),
+            "estimates": [estimate.to_dict() for estimate in estimates]
+        }
+        self._report_key = key
+        return self._report
+
+    def get_var(
+        self,
+        exposures: Dict[str, float],
+        method: str = "historical",
+        confidence: Optional[float] = None,
+        horizon_bars: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Look up one estimate from the cached report"""
+        confidence = confidence or self.confidence_levels[-1]
+        horizon_bars = horizon_bars or self.horizons[-1]
+        for estimate in self.compute_var(exposures)["estimates"]:
+            if (estimate["method"] == method and estimate["confidence"] == confidence
+                    and estimate["horizon_bars"] == horizon_bars):
+                return estimate
+        return None
+
+    def marginal_var(
+        self,
+        exposures: Dict[str, float],
+        symbol: str,
+        delta_exposure: float,
+        confidence: float,
+        horizon_bars: int
+    ) -> Optional[float]:
+        """
+        Change in EWMA VaR from adding ``delta_exposure`` USD of ``symbol``.
+
+        Returns None if the symbol is not modelled. Negative values mean the
+        order reduces portfolio VaR.
+        """
+        i = self._index.get(symbol)
+        if i is None or not self._ewma_cov.size:
+            return None
+
+        weights = self._exposure_vector(exposures)
+        z = NormalDist().inv_cdf(confidence)
+        scale = z * math.sqrt(horizon_bars)
+
+        before = math.sqrt(max(0.0, float(weights @ self._ewma_cov @ weights)))
+        # w' S w + 2 d (S w)_i + d^2 S_ii
+        after_sq = before * before + 2.0 * delta_exposure * float(self._ewma_cov[i] @ weights) \
+            + delta_exposure * delta_exposure * float(self._ewma_cov[i, i])
+        return scale * (math.sqrt(max(0.0, after_sq)) - before)
+
+    # =============================================================================
+    # CORRELATION
+    # =============================================================================
+
+    def correlation(self, symbol_a: str, symbol_b: str) -> Optional[float]:
+        """EWMA correlation between two symbols, or None if either is not modelled"""
+        i, j = self._index.get(symbol_a), self._index.get(symbol_b)
+        if i is None or j is None:
+            return None
+        return float(self._corr[i, j])
+
+    def correlated_exposure(self, exposures: Dict[str, float], symbol: str) -> float:
+        """
+        Signed USD exposure of the book that co-moves with ``symbol``.
+
+        Sum of exposure_j * corr(symbol, j) over held symbols: one row of the
+        correlation matrix times the exposure vector. Pairs involving an
+        unmodelled symbol use the configured default correlation.
+        """
+        i = self._index.get(symbol)
+        unmodelled = sum(e for s, e in exposures.items() if s not in self._index and s != symbol)
+
+        if i is None:
+            own = exposures.get(symbol, 0.0)
+            others = sum(exposures.values()) - own
+            return own + self.default_correlation * others
+
+        return float(self._corr[i] @ self._exposure_vector(exposures)) + self.default_correlation * unmodelled
+
+    def effective_exposure(self, exposures: Dict[str, float]) -> float:
+        """Correlation-weighted gross exposure sqrt(w' C w) over modelled symbols, plus unmodelled gross"""
+        weights = self._exposure_vector(exposures)
+        modelled = math.sqrt(max(0.0, float(weights @ self._corr @ weights))) if weights.size else 0.0
+        return modelled + sum(abs(e) for s, e in exposures.items() if s not in self._index)
+
+    def get_correlation_matrix(self) -> Dict[str, Any]:
+        """Current EWMA correlation matrix"""
+        return {
+            "bar": self._model_bar,
+            "symbols": list(self._symbols),
+            "matrix": np.round(self._corr, 4).tolist()
+        }
+
+    def get_model(self) -> Dict[str, Any]:
+        """Current model inputs (one-bar log returns and EWMA covariance) for simulation"""
+        return {
+            "symbols": self._symbols,
+            "bar_seconds": self.bar_seconds,
+            "returns": self._returns,
+            "ewma_cov": self._ewma_cov
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get risk analytics statistics"""
+        return {
+            "environment": self.environment,
+            "resolution": self.resolution,
+            "model_bar": self._model_bar,
+            "is_current": self.is_current,
+            "symbols": list(self._symbols),
+            "bars": int(self._returns.shape[0]),
+            "model_builds": self.model_builds,
+            "incremental_updates": self.incremental_updates
+        }
+
+
+# Shared engine per environment
+_engines: Dict[str, RiskAnalyticsEngine] = {}
+
+
+def get_risk_analytics(paper_trading: bool) -> RiskAnalyticsEngine:
+    """Get the shared risk analytics engine for an environment"""
+    key = "testnet" if paper_trading else "live"
+    engine = _engines.get(key)
+    if engine is None:
+        engine = RiskAnalyticsEngine(paper_trading=paper_trading)
+        _engines[key] = engine
+    return engine
+
+
+async def stop_risk_analytics():
+    """Stop every environment's background refresh (before exchange connectors close)"""
+    for engine in _engines.values():
+        await engine.stop()
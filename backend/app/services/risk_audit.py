@@ -0,0 +1,176 @@
+"""
+Risk Audit Writer for Crypto-0DTE System
+
+Moves RiskEvent persistence off the order path. Risk decisions enqueue an
+immutable audit record carrying the risk snapshot they were evaluated
+against; a background writer batch-inserts records into risk_events. The
+queue is bounded (records are dropped and counted when it is full rather
+than blocking the gate) and is drained on shutdown.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.database import get_db
+from app.models.risk_event import RiskEvent, RiskEventType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RiskAuditRecord:
+    """Immutable risk event, mapped 1:1 onto RiskEvent columns"""
+    event_type: RiskEventType
+    correlation_id: str
+    decision: str
+    environment: str
+    paper_trading: bool
+    created_at: datetime
+    symbol: Optional[str] = None
+    side: Optional[str] = None
+    quantity: Optional[float] = None
+    price: Optional[float] = None
+    notional_usd: Optional[float] = None
+    portfolio_value_usd: Optional[float] = None
+    daily_pnl_usd: Optional[float] = None
+    total_exposure_usd: Optional[float] = None
+    open_positions_count: Optional[float] = None
+    reason: Optional[str] = None
+    risk_score: Optional[float] = None
+    confidence: Optional[float] = None
+    details: Optional[str] = None
+
+
+class RiskAuditWriter:
+    """Bounded-queue, batching writer for risk audit records (one per process)"""
+
+    def __init__(self):
+        self.queue_size = settings.RISK_AUDIT_QUEUE_SIZE
+        self.batch_size = settings.RISK_AUDIT_BATCH_SIZE
+        self.flush_interval = settings.RISK_AUDIT_FLUSH_INTERVAL
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.records_written = 0
+        self.records_dropped = 0
+        self.records_failed = 0
+        self.batches_written = 0
+
+    def ensure_started(self):
+        """Start the background writer (idempotent)"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("📝 Risk audit writer started")
+
+    def submit(self, record: RiskAuditRecord) -> bool:
+        """
+        Enqueue an audit record without waiting for the database.
+
+        Returns:
+            False if the queue was full and the record was dropped
+        """
+        self.ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.records_dropped += 1
+            self._record_metrics("dropped")
+            logger.error(
+                f"Risk audit queue full ({self.queue_size}), dropped {record.event_type.value} "
+                f"for {record.correlation_id}"
+            )
+            return False
+        return True
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop the writer after flushing every queued record"""
+        if self._task is None:
+            return
+
+        # Let the running writer drain the queue, then cancel it while idle
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Risk audit drain timed out with {self._queue.qsize()} records queued")
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        logger.info(f"📝 Risk audit writer stopped ({self.records_written} records written)")
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+
+            # Collect more records until the batch is full or the flush interval elapses
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._write_batch(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _write_batch(self, batch: List[RiskAuditRecord]):
+        """Insert a batch in one statement; failures are logged and counted, never raised"""
+        try:
+            async for db in get_db():
+                await db.execute(insert(RiskEvent), [asdict(record) for record in batch])
+                await db.commit()
+                break
+
+            self.records_written += len(batch)
+            self.batches_written += 1
+            self._record_metrics("written", len(batch))
+            logger.debug(f"Risk audit batch written: {len(batch)} events")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.records_failed += len(batch)
+            self._record_metrics("failed", len(batch))
+            logger.error(f"Failed to persist {len(batch)} risk events: {e}")
+
+    def _record_metrics(self, outcome: str, count: int = 1):
+        try:
+            from app.services.metrics_service import metrics_service
+            metrics_service.record_risk_audit(outcome, count, self._queue.qsize() if self._queue else 0)
+        except Exception as e:
+            logger.debug(f"Failed to record risk audit metrics: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get audit writer statistics"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "records_written": self.records_written,
+            "records_dropped": self.records_dropped,
+            "records_failed": self.records_failed,
+            "batches_written": self.batches_written
+        }
+
+
+# Global writer instance
+risk_audit_writer = RiskAuditWriter()
@@ -0,0 +1,162 @@
+"""
+Pre-Trade Risk Gate Benchmark for Crypto-0DTE System
+
+Drives RiskManager.check_order_risk_gate at a fixed order rate against a
+stubbed exchange connector with in-memory risk state and audit trail (no
+network or database), then reports the per-check and per-phase latency
+breakdown recorded by the metrics service.
+
+Usage:
+    python -m app.services.risk_gate_benchmark [orders_per_second] [seconds] [connector_latency_ms]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+from app.services.metrics_service import metrics_service
+from app.services.risk_audit import risk_audit_writer
+from app.services.risk_manager import RiskManager
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_PRICES = {"BTCUSDT": 65000.0, "ETHUSDT": 3200.0, "SOLUSDT": 150.0}
+
+
+class StubConnector:
+    """Exchange connector stand-in with fixed prices and an optional simulated round trip"""
+
+    def __init__(self, prices: Dict[str, float], latency_ms: float = 0.0, seed: int = 7):
+        self.prices = prices
+        self.latency = latency_ms / 1000
+        self.rng = np.random.default_rng(seed)
+        self.calls = 0
+
+    async def _round_trip(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    def _ticker(self, symbol: str) -> Dict[str, Any]:
+        price = self.prices.get(symbol, 100.0)
+        return {"symbol": symbol, "close": price, "mark_price": price, "volume": 5e8, "volatility": 0.05}
+
+    async def get_account_balance(self) -> Dict[str, Any]:
+        await self._round_trip()
+        return {"total_balance": 100000.0, "available_balance": 100000.0}
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        await self._round_trip()
+        return self._ticker(symbol)
+
+    async def get_tickers(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        await self._round_trip()
+        return {symbol: self._ticker(symbol) for symbol in symbols}
+
+    async def get_market_data(self, symbol: str) -> Dict[str, Any]:
+        await self._round_trip()
+        return {"volatility": 0.05, "volume_24h": 5e8}
+
+    async def get_candles(self, symbol: str, resolution: str, start: int, end: int) -> List[Dict[str, Any]]:
+        """Random-walk closes ending at the stub price"""
+        await self._round_trip()
+        step = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600}.get(resolution, 300)
+        times = np.arange(start, end, step)
+        walk = np.cumsum(self.rng.normal(0, 0.002, times.size))
+        closes = self.prices.get(symbol, 100.0) * np.exp(walk - walk[-1])
+        return [{"time": int(t) * 1000, "close": float(c)} for t, c in zip(times, closes)]
+
+    def add_private_event_listener(self, listener):
+        pass
+
+    def remove_private_event_listener(self, listener):
+        pass
+
+
+async def run_benchmark(rate: float, seconds: float, connector_latency_ms: float = 0.0) -> Dict[str, Any]:
+    """Submit orders open-loop at ``rate`` per second and return latency and throughput figures"""
+    connector = StubConnector(BENCHMARK_PRICES, latency_ms=connector_latency_ms)
+    risk_manager = RiskManager(paper_trading=True)
+    for component in (risk_manager, risk_manager.risk_state, risk_manager.risk_analytics):
+        component.delta_connector = connector
+
+    # In-memory state: no reconcile against the trades table, audit batches discarded
+    async def _discard(batch):
+        risk_audit_writer.records_written += len(batch)
+
+    risk_audit_writer._write_batch = _discard
+    risk_manager.risk_state._loaded = True
+    risk_manager.equity_curve._loaded = True
+    await risk_manager.risk_state.refresh_balance()
+
+    symbols = list(BENCHMARK_PRICES)
+    total = int(rate * seconds)
+    latencies = np.zeros(total)
+    approved = 0
+
+    async def _order(i: int):
+        nonlocal approved
+        symbol = symbols[i % len(symbols)]
+        start = time.perf_counter()
+        allowed, _ = await risk_manager.check_order_risk_gate(symbol, "buy" if i % 2 else "sell", 0.001)
+        latencies[i] = time.perf_counter() - start
+        approved += allowed
+
+    # Warm up the returns model and price cache outside the measured run
+    await risk_manager.check_order_risk_gate(symbols[0], "buy", 0.001)
+
+    tasks = []
+    began = time.perf_counter()
+    for i in range(total):
+        delay = began + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_order(i)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - began
+
+    await risk_manager.risk_state.stop()
+    risk_manager.equity_curve._pending.clear()  # Nothing to checkpoint without a database
+    await risk_manager.equity_curve.stop()
+    await risk_audit_writer.stop()
+
+    p50, p95, p99 = np.percentile(latencies * 1000, (50, 95, 99))
+    return {
+        "orders": total,
+        "approved": approved,
+        "target_rate": rate,
+        "achieved_rate": round(total / elapsed, 1),
+        "connector_calls": connector.calls,
+        "gate_latency_ms": {
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "max": round(float(latencies.max() * 1000), 3)
+        },
+        "breakdown": metrics_service.get_risk_latency_breakdown()
+    }
+
+
+def _print_report(report: Dict[str, Any]):
+    print(
+        f"{report['orders']} orders, {report['approved']} approved: target {report['target_rate']:.0f}/s, "
+        f"achieved {report['achieved_rate']}/s, {report['connector_calls']} connector calls"
+    )
+    print(f"gate latency (ms): {report['gate_latency_ms']}")
+    for path, kinds in report["breakdown"].items():
+        for kind, entries in kinds.items():
+            for name, stats in sorted(entries.items(), key=lambda item: -item[1]["p99_ms"]):
+                print(
+                    f"  {path:<10} {kind:<6} {name:<18} p50 {stats['p50_ms']:>8.3f}  p95 {stats['p95_ms']:>8.3f}  "
+                    f"p99 {stats['p99_ms']:>8.3f}  max {stats['max_ms']:>8.3f}  over budget {stats['over_budget']}"
+                )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.ERROR)
+    args = [float(arg) for arg in sys.argv[1:]]
+    rate, seconds, connector_latency_ms = (args + [1000.0, 5.0, 0.0][len(args):])[:3]
+    _print_report(asyncio.run(run_benchmark(rate, seconds, connector_latency_ms)))
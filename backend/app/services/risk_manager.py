@@ -12,27 +12,72 @@ Comprehensive risk management for autonomous trading:
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Tuple
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import math
+import time
 import statistics
 import uuid
 import json
+import numpy as np
 
 from sqlalchemy import select
-from app.services.exchanges.delta_exchange import DeltaExchangeConnector
+from app.services.exchanges.connector_pool import get_delta_connector
+from app.services.risk_state import OPEN_TRADE_STATUSES, RiskSnapshot, get_risk_state
+from app.services.risk_audit import RiskAuditRecord, risk_audit_writer
+from app.services.risk_analytics import get_risk_analytics
+from app.services.equity_curve import get_equity_curve
+from app.services.order_state import get_order_state_store
+from app.services.stress_testing import StressScenario, stress_tester
 from app.database import get_db
 from app.config import Settings
-from app.models.trade import Trade, TradeStatus, TradeType
+from app.models.trade import Trade, TradeType
 from app.models.signal import Signal, SignalType
-from app.models.risk_event import RiskEvent, RiskEventType
+from app.models.risk_event import RiskEventType
 from app.models.signal_event import SignalEvent, SignalEventType
 from app.services.metrics_service import metrics_service
 
 logger = logging.getLogger(__name__)
 
 
+# Gate check name -> (risk_type, reason prefix, denial log key for the check result)
+GATE_CHECK_DENIALS = {
+    "daily_loss": ("daily_loss_limit", None, None),
+    "asset_exposure": ("asset_exposure_limit", None, None),
+    "consecutive_loss": ("consecutive_loss_breaker", None, None),
+    "event_pause": ("event_pause", None, None),
+    "portfolio_risk": ("portfolio_risk_limit", "Portfolio risk limit", "portfolio_check"),
+    "balance": ("insufficient_balance", "Insufficient balance", "balance_check"),
+    "market_conditions": ("market_conditions", "Market conditions", "market_check"),
+    "marginal_var": ("marginal_var_limit", None, None)
+}
+
+# Checks answered from the in-memory risk snapshot or local counters (no I/O);
+# run inline before any task is spawned for the checks that may wait on I/O
+SNAPSHOT_CHECKS = frozenset({
+    "signal_rate_limit",
+    "daily_loss",
+    "asset_exposure",
+    "consecutive_loss",
+    "event_pause",
+    "portfolio_risk",
+    "balance"
+})
+
+
+@dataclass(slots=True)
+class ParentApproval:
+    """Risk gate approval of an entry order, inherited by the trade's reduce-only exits"""
+    token: str  # Trace ID of the approving gate decision
+    trade_id: str
+    symbol: str
+    side: str  # Entry side (BUY/SELL)
+    size: float
+    approved_at: datetime
+
+
 class RiskDenied(Exception):
     """Exception raised when an order is denied by the risk gate"""
     def __init__(self, reason: str, risk_type: str = "general"):
@@ -60,22 +105,45 @@ class RiskManager:
         # Determine paper trading mode
         self.paper_trading = paper_trading if paper_trading is not None else True  # Default to paper trading for safety
         
-        # Initialize Delta Exchange connector with environment awareness
-        self.delta_connector = DeltaExchangeConnector(paper_trading=self.paper_trading)
+        # Shared Delta Exchange connector for this environment
+        self.delta_connector = get_delta_connector(paper_trading=self.paper_trading)
+        
+        # Shared in-memory risk state (exposure, P&L, loss streak, balance)
+        self.risk_state = get_risk_state(paper_trading=self.paper_trading)
+        
+        # Shared VaR/CVaR engine (returns matrix cached per bar)
+        self.risk_analytics = get_risk_analytics(paper_trading=self.paper_trading)
+        
+        # Shared high-water mark / drawdown tracker (persisted equity curve)
+        self.equity_curve = get_equity_curve(paper_trading=self.paper_trading)
         
         # Risk Configuration
         self.max_portfolio_risk = 0.02        # 2% max portfolio risk per trade
         self.max_daily_loss = 0.05            # 5% max daily loss
         self.max_drawdown = 0.15              # 15% max drawdown
         self.max_position_size = 0.10         # 10% max position size of portfolio
-        self.max_correlation_exposure = 0.30  # 30% max exposure to correlated assets
+        self.max_correlation_exposure = 0.30  # 30% max correlation-weighted exposure co-moving with a symbol
+        self.correlated_position_threshold = self.settings.RISK_CORRELATED_POSITION_THRESHOLD
         self.max_open_positions = 5           # Max 5 open positions
         self.min_account_balance = 1000       # Minimum account balance to trade
+        self.max_marginal_var = self.settings.RISK_MAX_MARGINAL_VAR  # Max VaR added per order (fraction of portfolio)
+        self.var_gate_confidence = self.settings.RISK_VAR_GATE_CONFIDENCE
+        self.var_gate_horizon = self.settings.RISK_VAR_GATE_HORIZON_BARS
         
         # Risk Gate Configuration (Critical Safety Parameters)
         self.max_consecutive_losses = 4       # Max 4 consecutive losses before pause
         self.consecutive_loss_pause_hours = 12  # Pause trading for 12 hours after consecutive losses
         self.event_pause_active = False       # Event-based trading pause flag
+        self.check_timeout = self.settings.RISK_CHECK_TIMEOUT  # Per-check timeout (seconds)
+        
+        # Latency budgets (seconds); over-budget checks are flagged, or time out when enforced
+        self.check_budget = self.settings.RISK_CHECK_BUDGET_MS / 1000
+        self.check_budgets = {name: ms / 1000 for name, ms in self.settings.RISK_CHECK_BUDGETS_MS.items()}
+        self.gate_budget = self.settings.RISK_GATE_BUDGET_MS / 1000
+        self.enforce_check_budget = self.settings.RISK_CHECK_BUDGET_ENFORCE
+        
+        # Entry approvals by trade ID; bracket exits (SL/TP) are verified against these
+        self.parent_approvals: Dict[str, ParentApproval] = {}
         
         # Risk Metrics
         self.daily_pnl = 0.0
@@ -124,6 +192,10 @@ class RiskManager:
             # Save risk metrics
             await self._save_risk_metrics()
             
+            # Stop background refreshes that would reopen the exchange session
+            await self.risk_state.stop()
+            await self.risk_analytics.stop()
+            
             # Cleanup Delta connector
             await self.delta_connector.cleanup()
             
@@ -147,6 +219,7 @@ class RiskManager:
             signal_type = signal.get("signal_type")
             confidence = signal.get("confidence", 0)
             entry_price = signal.get("entry_price", 0)
+            direction = -1.0 if str(getattr(signal_type, "value", signal_type)).upper() == SignalType.SELL.value else 1.0
             
             logger.debug(f"Validating signal: {symbol} {signal_type} ({confidence:.1%})")
             
@@ -154,35 +227,36 @@ class RiskManager:
             if confidence < self.min_signal_confidence:
                 return False, f"Signal confidence too low: {confidence:.1%} < {self.min_signal_confidence:.1%}"
             
-            # Check signal rate limiting
-            rate_limit_check = await self._check_signal_rate_limits(symbol)
-            if not rate_limit_check["allowed"]:
-                return False, rate_limit_check["reason"]
-            
-            # Check portfolio risk limits
-            portfolio_check = await self._check_portfolio_risk_limits()
-            if not portfolio_check["allowed"]:
-                return False, portfolio_check["reason"]
+            started = time.perf_counter()
+            spans: Dict[str, float] = {}
             
-            # Check position limits
-            position_check = await self._check_position_limits(symbol)
-            if not position_check["allowed"]:
-                return False, position_check["reason"]
-            
-            # Check market conditions
-            market_check = await self._check_market_conditions(symbol)
-            if not market_check["allowed"]:
-                return False, market_check["reason"]
-            
-            # Check correlation limits
-            correlation_check = await self._check_correlation_limits(symbol)
-            if not correlation_check["allowed"]:
-                return False, correlation_check["reason"]
+            # Independent checks run concurrently against one risk snapshot;
+            # the first denial cancels the rest
+            self.risk_state.ensure_started()
+            try:
+                await self.risk_state.ensure_fresh()
+            except Exception as e:
+                logger.warning(f"Risk state refresh failed, validating on cached state: {e}")
+            snapshot = self.risk_state.snapshot()
+            mark = self._span(spans, "state", started)
+            
+            checks = {
+                "signal_rate_limit": lambda: self._check_signal_rate_limits(symbol),
+                "portfolio_risk": lambda: self._check_portfolio_risk_limits(snapshot),
+                "position_limits": lambda: self._check_position_limits(symbol, direction),
+                "market_conditions": lambda: self._check_market_conditions(symbol),
+                "correlation": lambda: self._check_correlation_limits(symbol, direction, snapshot),
+                "balance": lambda: self._check_minimum_balance(snapshot)
+            }
+            denial, check_latency = await self._run_risk_checks(
+                checks, fail_open=("market_conditions", "correlation"), path="signal"
+            )
+            self._span(spans, "checks", mark)
+            self._record_spans("signal", spans, started)
+            logger.debug(f"Signal validation latency (ms) for {symbol}: phases {spans}, checks {check_latency}")
             
-            # Check account balance
-            balance_check = await self._check_minimum_balance()
-            if not balance_check["allowed"]:
-                return False, balance_check["reason"]
+            if denial is not None:
+                return False, denial["reason"]
             
             # All checks passed
             await self._record_signal_validation(symbol, True)
@@ -198,7 +272,8 @@ class RiskManager:
         side: str,
         size: float,
         price: Optional[float] = None,
-        order_type: str = "market"
+        order_type: str = "market",
+        parent_trade_id: Optional[str] = None
     ) -> Tuple[bool, str]:
         """
         CRITICAL RISK CHOKE-POINT: Check all risk criteria before any order placement.
@@ -216,18 +291,27 @@ class RiskManager:
             size: Order size
             price: Order price (for limit orders)
             order_type: Order type (market/limit)
+            parent_trade_id: Entry order's trade; an approval is kept for its bracket exits
         
         Returns:
             Tuple of (is_allowed, reason)
         """
         # Generate trace ID for correlation
         trace_id = str(uuid.uuid4())[:8]
+        started = time.perf_counter()
+        spans: Dict[str, float] = {}  # Phase latency (ms)
         
-        # Get current market data for context
+        # Load/refresh shared risk state (no I/O when the cache is fresh)
+        self.risk_state.ensure_started()
         try:
-            current_price = await self.delta_connector.get_current_price(symbol)
-        except:
-            current_price = price or 0
+            await self.risk_state.ensure_fresh()
+        except Exception as e:
+            logger.warning(f"Risk state refresh failed, gating on cached state: {e}")
+        mark = self._span(spans, "state", started)
+        
+        # Get current market data for context (cached ticker when recent)
+        current_price = await self._get_gate_price(symbol, price)
+        mark = self._span(spans, "price", mark)
         
         # Structured log entry
         risk_context = {
@@ -246,120 +330,55 @@ class RiskManager:
         logger.info(f"🛡️ RISK GATE [{trace_id}]: {json.dumps(risk_context)}")
         
         try:
-            # 1. Check daily loss limits
-            daily_pnl = await self._calculate_daily_pnl()
-            if daily_pnl < -self.max_daily_loss:
-                reason = f"Daily loss limit exceeded: {daily_pnl:.2f} < -{self.max_daily_loss:.2f}"
-                risk_denial = {
-                    "trace_id": trace_id,
-                    "risk_type": "daily_loss_limit",
-                    "reason": reason,
-                    "daily_pnl": daily_pnl,
-                    "max_daily_loss": self.max_daily_loss,
-                    "verdict": "DENIED"
-                }
-                logger.warning(f"🚫 RISK DENIED [{trace_id}]: {json.dumps(risk_denial)}")
-                return False, reason
-            
-            # 2. Check per-asset exposure limits
-            current_exposure = await self._get_asset_exposure(symbol)
-            portfolio_value = await self._get_portfolio_value()
-            
-            if portfolio_value > 0:
-                exposure_ratio = current_exposure / portfolio_value
-                if exposure_ratio > self.max_position_size:
-                    reason = f"Asset exposure limit exceeded: {exposure_ratio:.1%} > {self.max_position_size:.1%}"
-                    risk_denial = {
-                        "trace_id": trace_id,
-                        "risk_type": "asset_exposure_limit",
-                        "reason": reason,
-                        "current_exposure": current_exposure,
-                        "portfolio_value": portfolio_value,
-                        "exposure_ratio": exposure_ratio,
-                        "max_position_size": self.max_position_size,
-                        "verdict": "DENIED"
-                    }
-                    logger.warning(f"🚫 RISK DENIED [{trace_id}]: {json.dumps(risk_denial)}")
-                    return False, reason
-            
-            # 3. Check consecutive loss breaker
-            consecutive_losses = await self._count_consecutive_losses()
-            if consecutive_losses >= self.max_consecutive_losses:
-                reason = f"Consecutive loss breaker tripped: {consecutive_losses} >= {self.max_consecutive_losses}"
-                risk_denial = {
-                    "trace_id": trace_id,
-                    "risk_type": "consecutive_loss_breaker",
-                    "reason": reason,
-                    "consecutive_losses": consecutive_losses,
-                    "max_consecutive_losses": self.max_consecutive_losses,
-                    "verdict": "DENIED"
-                }
-                logger.warning(f"🚫 RISK DENIED [{trace_id}]: {json.dumps(risk_denial)}")
-                return False, reason
-            
-            # 4. Check event pause status
-            if await self._is_event_pause_active():
-                reason = "Event pause active - no new positions allowed"
-                risk_denial = {
-                    "trace_id": trace_id,
-                    "risk_type": "event_pause",
-                    "reason": reason,
-                    "verdict": "DENIED"
-                }
-                logger.warning(f"🚫 RISK DENIED [{trace_id}]: {json.dumps(risk_denial)}")
-                return False, reason
-            
-            # 5. Check portfolio risk limits
-            portfolio_check = await self._check_portfolio_risk_limits()
-            if not portfolio_check["allowed"]:
-                reason = f"Portfolio risk limit: {portfolio_check['reason']}"
-                risk_denial = {
-                    "trace_id": trace_id,
-                    "risk_type": "portfolio_risk_limit",
-                    "reason": reason,
-                    "portfolio_check": portfolio_check,
-                    "verdict": "DENIED"
-                }
-                logger.warning(f"🚫 RISK DENIED [{trace_id}]: {json.dumps(risk_denial)}")
-                return False, reason
-            
-            # 6. Check minimum balance
-            balance_check = await self._check_minimum_balance()
-            if not balance_check["allowed"]:
-                reason = f"Insufficient balance: {balance_check['reason']}"
-                risk_denial = {
-                    "trace_id": trace_id,
-                    "risk_type": "insufficient_balance",
-                    "reason": reason,
-                    "balance_check": balance_check,
-                    "verdict": "DENIED"
-                }
-                logger.warning(f"🚫 RISK DENIED [{trace_id}]: {json.dumps(risk_denial)}")
-                return False, reason
+            snapshot = self.risk_state.snapshot()
+            
+            # Independent checks run concurrently; the first denial cancels the rest.
+            # Market-data checks fail open on timeout, as on error; all others fail closed.
+            checks = {
+                "daily_loss": lambda: self._check_daily_loss_limit(snapshot),
+                "asset_exposure": lambda: self._check_asset_exposure_limit(symbol, snapshot),
+                "consecutive_loss": lambda: self._check_consecutive_loss_breaker(snapshot),
+                "event_pause": self._check_event_pause,
+                "portfolio_risk": lambda: self._check_portfolio_risk_limits(snapshot),
+                "balance": lambda: self._check_minimum_balance(snapshot),
+                "market_conditions": lambda: self._check_market_conditions(symbol),
+                "marginal_var": lambda: self._check_marginal_var(symbol, side, size, price or current_price, snapshot)
+            }
+            denial, check_latency = await self._run_risk_checks(
+                checks, fail_open=("market_conditions", "marginal_var"), path="order_gate"
+            )
+            mark = self._span(spans, "checks", mark)
             
-            # 7. Check market conditions
-            market_check = await self._check_market_conditions(symbol)
-            if not market_check["allowed"]:
-                reason = f"Market conditions: {market_check['reason']}"
+            if denial is not None:
+                risk_type, reason_prefix, detail_key = GATE_CHECK_DENIALS[denial["check"]]
+                reason = f"{reason_prefix}: {denial['reason']}" if reason_prefix else denial["reason"]
                 risk_denial = {
                     "trace_id": trace_id,
-                    "risk_type": "market_conditions",
-                    "reason": reason,
-                    "market_check": market_check,
-                    "verdict": "DENIED"
+                    "risk_type": risk_type,
+                    "reason": reason
                 }
+                if detail_key:
+                    risk_denial[detail_key] = {k: v for k, v in denial.items() if k != "check"}
+                else:
+                    risk_denial.update(denial.get("details", {}))
+                risk_denial["check_latency_ms"] = check_latency
+                risk_denial["phase_latency_ms"] = self._record_spans("order_gate", spans, started)
+                risk_denial["verdict"] = "DENIED"
                 logger.warning(f"🚫 RISK DENIED [{trace_id}]: {json.dumps(risk_denial)}")
                 return False, reason
             
             # All risk checks passed
+            portfolio_value = snapshot.portfolio_value
             risk_approval = {
                 "trace_id": trace_id,
                 "verdict": "APPROVED",
-                "daily_pnl": daily_pnl,
-                "exposure_ratio": exposure_ratio if portfolio_value > 0 else 0,
-                "consecutive_losses": consecutive_losses,
+                "daily_pnl": snapshot.daily_pnl,
+                "exposure_ratio": snapshot.exposure_by_symbol.get(symbol, 0.0) / portfolio_value if portfolio_value > 0 else 0,
+                "consecutive_losses": snapshot.consecutive_losses,
                 "portfolio_value": portfolio_value,
-                "checks_passed": ["daily_loss", "asset_exposure", "consecutive_loss", "event_pause", "portfolio_risk", "balance", "market_conditions"]
+                "checks_passed": list(checks),
+                "check_latency_ms": check_latency,
+                "phase_latency_ms": spans
             }
             logger.info(f"✅ RISK APPROVED [{trace_id}]: {json.dumps(risk_approval)}")
             
@@ -377,8 +396,21 @@ class RiskManager:
                 notional_usd=size * (price or current_price),
                 decision="approved",
                 reason="All risk checks passed",
-                details=json.dumps(risk_approval)
+                details=json.dumps(risk_approval),
+                snapshot=snapshot
             )
+            self._span(spans, "audit", mark)
+            self._record_spans("order_gate", spans, started)
+            
+            if parent_trade_id:
+                self.parent_approvals[parent_trade_id] = ParentApproval(
+                    token=trace_id,
+                    trade_id=parent_trade_id,
+                    symbol=symbol,
+                    side=side.upper(),
+                    size=float(size),
+                    approved_at=datetime.utcnow()
+                )
             
             return True, "Risk gate passed - order approved"
             
@@ -395,6 +427,190 @@ class RiskManager:
             logger.warning(f"🚫 RISK DENIED [{trace_id}]: {json.dumps(risk_error)}")
             return False, reason
     
+    async def check_bracket_order(
+        self,
+        parent_trade_id: str,
+        symbol: str,
+        side: str,
+        size: float,
+        price: Optional[float] = None,
+        order_type: str = "stop_market",
+        kind: str = "bracket"
+    ) -> Tuple[bool, str]:
+        """
+        Verify a reduce-only exit of a trade: a bracket leg (stop loss / take profit)
+        or a position close or reduction (``kind="exit"``).
+    
+        An exit on the opposite side of its parent entry, no larger than the approved
+        size, inherits the parent's approval instead of re-running the full gate.
+        Without an approval (e.g. after a restart) it is verified against the open
+        position instead. Only an order that would not reduce risk goes through
+        check_order_risk_gate, so protection is never denied by limits it cannot breach.
+    
+        Returns:
+            Tuple of (is_allowed, reason)
+        """
+        started = time.perf_counter()
+        exit_side = side.upper()
+        approval = self.parent_approvals.get(parent_trade_id)
+    
+        if approval is not None:
+            reduces_risk = (
+                approval.symbol == symbol
+                and approval.side != exit_side
+                and size <= approval.size * (1 + 1e-9)
+            )
+            basis = f"parent approval {approval.token}"
+            token = approval.token
+        else:
+            # Reduce-only against the net position held in symbol
+            position = self.risk_state.position_size(symbol)
+            direction = 1.0 if exit_side == TradeType.BUY.value else -1.0
+            reduces_risk = position * direction < 0 and size <= abs(position) * (1 + 1e-9)
+            basis = f"open position {position:g}"
+            token = str(uuid.uuid4())[:8]
+    
+        if not reduces_risk:
+            logger.warning(
+                f"{kind.capitalize()} order for trade {parent_trade_id} does not reduce risk "
+                f"({exit_side} {size} {symbol} vs {basis}); running full risk gate"
+            )
+            return await self.check_order_risk_gate(symbol, side, size, price, order_type)
+    
+        bracket_approval = {
+            "trace_id": token,
+            "verdict": "APPROVED",
+            "parent_trade_id": parent_trade_id,
+            "basis": basis,
+            "order_type": order_type
+        }
+        logger.info(f"✅ {kind.upper()} APPROVED [{token}]: {json.dumps(bracket_approval)}")
+        metrics_service.record_risk_gate_decision("approved", f"{kind}_child")
+    
+        await self._persist_risk_event(
+            event_type=RiskEventType.ORDER_APPROVED,
+            correlation_id=token,
+            symbol=symbol,
+            side=side,
+            quantity=size,
+            price=price,
+            notional_usd=size * price if price else None,
+            decision="approved",
+            reason=f"Reduce-only {kind} order verified against {basis}",
+            details=json.dumps(bracket_approval)
+        )
+        self._record_spans(kind, {}, started)
+    
+        return True, f"{kind.capitalize()} order approved ({basis})"
+    
+    def release_parent_approval(self, trade_id: str):
+        """Drop a trade's entry approval once it is closed or its entry failed"""
+        self.parent_approvals.pop(trade_id, None)
+    
+    def resize_parent_approval(self, trade_id: str, size: float):
+        """Limit a trade's entry approval to the size actually filled (its exits cannot exceed the position)"""
+        approval = self.parent_approvals.get(trade_id)
+        if approval is not None:
+            approval.size = min(approval.size, size)
+    
+    async def _run_risk_checks(
+        self,
+        checks: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]],
+        fail_open: Tuple[str, ...] = (),
+        path: str = "order_gate"
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, float]]:
+        """
+        Run independent risk checks, snapshot checks inline and the rest concurrently.
+        
+        Checks in SNAPSHOT_CHECKS run first, in order, without a task or timeout,
+        and the first denial returns before anything else is spawned. The remaining
+        checks each get RISK_CHECK_TIMEOUT, or their latency budget when budgets are
+        enforced; a timed-out check denies unless it is listed in ``fail_open``.
+        Checks that finish over budget are flagged. The first denial cancels the
+        checks still running.
+        
+        Returns:
+            Tuple of (first denial result tagged with its check name or None,
+            per-check latency in milliseconds for the checks that completed)
+        """
+        latencies: Dict[str, float] = {}
+        
+        async def _timed(
+            name: str, check: Callable[[], Awaitable[Dict[str, Any]]], inline: bool = False
+        ) -> Dict[str, Any]:
+            budget = self.check_budgets.get(name, self.check_budget)
+            by_budget = self.enforce_check_budget and budget < self.check_timeout and not inline
+            timeout = budget if by_budget else self.check_timeout
+            
+            start = time.perf_counter()
+            try:
+                result = await (check() if inline else asyncio.wait_for(check(), timeout=timeout))
+                outcome = "allowed" if result["allowed"] else "denied"
+            except asyncio.TimeoutError:
+                if by_budget:
+                    reason = f"{name} check exceeded its {budget * 1000:.1f}ms latency budget"
+                else:
+                    reason = f"{name} check timed out after {timeout:.2f}s"
+                result = {"allowed": name in fail_open, "reason": reason}
+                outcome = "timeout"
+            
+            elapsed = time.perf_counter() - start
+            latencies[name] = round(elapsed * 1000, 3)
+            metrics_service.record_risk_check(path, name, outcome, elapsed)
+            
+            if elapsed > budget:
+                if by_budget and outcome == "timeout":
+                    action = "failed_open" if result["allowed"] else "denied"
+                else:
+                    action = "flagged"
+                metrics_service.record_risk_budget_exceeded(path, name, action)
+                logger.warning(
+                    f"⏱️ Risk check over budget ({path}): {name} {elapsed * 1000:.2f}ms > "
+                    f"{budget * 1000:.1f}ms ({action})"
+                )
+            return {**result, "check": name}
+        
+        for name, check in checks.items():
+            if name in SNAPSHOT_CHECKS:
+                result = await _timed(name, check, inline=True)
+                if not result["allowed"]:
+                    return result, latencies
+        
+        tasks = [
+            asyncio.create_task(_timed(name, check))
+            for name, check in checks.items() if name not in SNAPSHOT_CHECKS
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if not result["allowed"]:
+                    return result, latencies
+            return None, latencies
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _span(self, spans: Dict[str, float], phase: str, since: float) -> float:
+        """Record a phase duration in milliseconds; returns the phase end time"""
+        now = time.perf_counter()
+        spans[phase] = round((now - since) * 1000, 3)
+        return now
+    
+    def _record_spans(self, path: str, spans: Dict[str, float], started: float) -> Dict[str, float]:
+        """Export phase spans and the total, flagging a total over the gate budget"""
+        total = time.perf_counter() - started
+        spans["total"] = round(total * 1000, 3)
+        for phase, ms in spans.items():
+            metrics_service.record_risk_gate_phase(path, phase, ms / 1000)
+        
+        if total > self.gate_budget:
+            metrics_service.record_risk_budget_exceeded(path, "total", "flagged", kind="phases")
+            logger.warning(
+                f"⏱️ Risk {path} over budget: {total * 1000:.2f}ms > {self.gate_budget * 1000:.1f}ms {spans}"
+            )
+        return spans
+    
     async def calculate_position_size(
         self,
         symbol: str,
@@ -508,6 +724,23 @@ class RiskManager:
                 risk_factors.append(f"High position count: {open_positions}")
                 risk_score += 0.1
             
+            # Check tail risk (historical VaR at the gate confidence/horizon vs. the daily loss limit)
+            value_at_risk = {}
+            correlated_exposure = 0.0
+            exposures = self.risk_state.net_exposures()
+            if exposures:
+                await self.risk_analytics.refresh(exposures)
+                value_at_risk = self.risk_analytics.compute_var(exposures)
+                correlated_exposure = self.risk_analytics.effective_exposure(exposures)
+                headline_var = self.risk_analytics.get_var(
+                    exposures, "historical", self.var_gate_confidence, self.var_gate_horizon
+                )
+                if headline_var and portfolio_value > 0:
+                    var_pct = headline_var["var"] / portfolio_value
+                    if var_pct > self.max_daily_loss:
+                        risk_factors.append(f"High VaR: {var_pct:.1%}")
+                        risk_score += 0.3
+            
             # Determine risk level
             if risk_score >= 0.7:
                 risk_level = "HIGH"
@@ -524,11 +757,15 @@ class RiskManager:
                     "portfolio_value": portfolio_value,
                     "total_exposure": total_exposure,
                     "exposure_percentage": exposure_pct,
+                    "correlated_exposure": correlated_exposure,
                     "daily_pnl": daily_pnl,
                     "daily_pnl_percentage": daily_pnl / portfolio_value if portfolio_value > 0 else 0,
                     "current_drawdown": drawdown,
+                    "max_drawdown": self.equity_curve.max_drawdown,
+                    "high_water_mark": self.equity_curve.high_water_mark,
                     "open_positions": open_positions,
-                    "max_positions": self.max_open_positions
+                    "max_positions": self.max_open_positions,
+                    "value_at_risk": value_at_risk
                 },
                 "limits": {
                     "max_daily_loss": self.max_daily_loss,
@@ -710,12 +947,118 @@ class RiskManager:
             logger.error(f"Error checking signal rate limits: {e}")
             return {"allowed": False, "reason": f"Rate limit check error: {str(e)}"}
     
-    async def _check_portfolio_risk_limits(self) -> Dict[str, Any]:
+    async def _check_daily_loss_limit(self, snapshot: RiskSnapshot) -> Dict[str, Any]:
+        """Check daily loss limit (max_daily_loss is a fraction of portfolio value)"""
+        daily_pnl = snapshot.daily_pnl
+        portfolio_value = snapshot.portfolio_value
+        daily_loss_pct = -daily_pnl / portfolio_value if portfolio_value > 0 and daily_pnl < 0 else 0.0
+        
+        if daily_loss_pct > self.max_daily_loss:
+            return {
+                "allowed": False,
+                "reason": f"Daily loss limit exceeded: {daily_loss_pct:.1%} > {self.max_daily_loss:.1%}",
+                "details": {
+                    "daily_pnl": daily_pnl,
+                    "daily_loss_pct": daily_loss_pct,
+                    "max_daily_loss": self.max_daily_loss
+                }
+            }
+        return {"allowed": True}
+    
+    async def _check_asset_exposure_limit(self, symbol: str, snapshot: RiskSnapshot) -> Dict[str, Any]:
+        """Check per-asset exposure as a fraction of portfolio value"""
+        portfolio_value = snapshot.portfolio_value
+        if portfolio_value <= 0:
+            return {"allowed": True}
+        
+        current_exposure = snapshot.exposure_by_symbol.get(symbol, 0.0)
+        exposure_ratio = current_exposure / portfolio_value
+        if exposure_ratio > self.max_position_size:
+            return {
+                "allowed": False,
+                "reason": f"Asset exposure limit exceeded: {exposure_ratio:.1%} > {self.max_position_size:.1%}",
+                "details": {
+                    "current_exposure": current_exposure,
+                    "portfolio_value": portfolio_value,
+                    "exposure_ratio": exposure_ratio,
+                    "max_position_size": self.max_position_size
+                }
+            }
+        return {"allowed": True}
+    
+    async def _check_consecutive_loss_breaker(self, snapshot: RiskSnapshot) -> Dict[str, Any]:
+        """Check the consecutive loss breaker"""
+        consecutive_losses = snapshot.consecutive_losses
+        if consecutive_losses >= self.max_consecutive_losses:
+            return {
+                "allowed": False,
+                "reason": f"Consecutive loss breaker tripped: {consecutive_losses} >= {self.max_consecutive_losses}",
+                "details": {
+                    "consecutive_losses": consecutive_losses,
+                    "max_consecutive_losses": self.max_consecutive_losses
+                }
+            }
+        return {"allowed": True}
+    
+    async def _check_event_pause(self) -> Dict[str, Any]:
+        """Check event pause status"""
+        if await self._is_event_pause_active():
+            return {"allowed": False, "reason": "Event pause active - no new positions allowed"}
+        return {"allowed": True}
+    
+    async def _check_marginal_var(
+        self,
+        symbol: str,
+        side: str,
+        size: float,
+        price: float,
+        snapshot: RiskSnapshot
+    ) -> Dict[str, Any]:
+        """Check the VaR an order adds to the portfolio (EWMA, gate confidence and horizon)"""
+        try:
+            portfolio_value = snapshot.portfolio_value
+            if portfolio_value <= 0 or not price:
+                return {"allowed": True}
+            
+            exposures = self.risk_state.net_exposures()
+            await self._ensure_risk_model(set(exposures) | {symbol})
+            
+            direction = 1.0 if side.upper() == TradeType.BUY.value else -1.0
+            marginal_var = self.risk_analytics.marginal_var(
+                exposures, symbol, direction * size * price, self.var_gate_confidence, self.var_gate_horizon
+            )
+            if marginal_var is None:
+                return {"allowed": True}  # No return history for symbol
+            
+            marginal_var_pct = marginal_var / portfolio_value
+            if marginal_var_pct > self.max_marginal_var:
+                return {
+                    "allowed": False,
+                    "reason": f"Marginal VaR limit exceeded: {marginal_var_pct:.2%} > {self.max_marginal_var:.2%}",
+                    "details": {
+                        "marginal_var": marginal_var,
+                        "marginal_var_pct": marginal_var_pct,
+                        "max_marginal_var": self.max_marginal_var,
+                        "confidence": self.var_gate_confidence,
+                        "horizon_bars": self.var_gate_horizon
+                    }
+                }
+            return {"allowed": True}
+            
+        except Exception as e:
+            logger.error(f"Error checking marginal VaR: {e}")
+            return {"allowed": True}  # Allow on error, like other market-data checks
+    
+    async def _check_portfolio_risk_limits(self, snapshot: Optional[RiskSnapshot] = None) -> Dict[str, Any]:
         """Check portfolio-level risk limits"""
         try:
             # Check daily loss limit
-            daily_pnl = await self._calculate_daily_pnl()
-            portfolio_value = await self._get_portfolio_value()
+            if snapshot is not None:
+                daily_pnl = snapshot.daily_pnl
+                portfolio_value = snapshot.portfolio_value
+            else:
+                daily_pnl = await self._calculate_daily_pnl()
+                portfolio_value = await self._get_portfolio_value()
             
             if portfolio_value > 0:
                 daily_loss_pct = abs(daily_pnl) / portfolio_value if daily_pnl < 0 else 0
@@ -740,7 +1083,15 @@ class RiskManager:
             logger.error(f"Error checking portfolio risk limits: {e}")
             return {"allowed": False, "reason": f"Portfolio risk check error: {str(e)}"}
     
-    async def _check_position_limits(self, symbol: str) -> Dict[str, Any]:
+    async def _ensure_risk_model(self, symbols: set):
+        """Make sure the returns model covers symbols; a stale model is refreshed off the request path"""
+        if not self.risk_analytics.covers(symbols):
+            await self.risk_analytics.refresh(symbols)
+        elif not self.risk_analytics.is_current:
+            # Use the previous bar's model now
+            self.risk_analytics.request_refresh(symbols)
+    
+    async def _check_position_limits(self, symbol: str, direction: float = 1.0) -> Dict[str, Any]:
         """Check position-related limits"""
         try:
             # Check maximum open positions
@@ -759,6 +1110,20 @@ class RiskManager:
                     "reason": f"Already have position in {symbol}"
                 }
             
+            # A same-direction position in a highly correlated symbol is effectively the same trade
+            exposures = self.risk_state.net_exposures()
+            if exposures:
+                await self._ensure_risk_model(set(exposures) | {symbol})
+                for held_symbol, exposure in exposures.items():
+                    correlation = self.risk_analytics.correlation(symbol, held_symbol)
+                    if (correlation is not None and correlation >= self.correlated_position_threshold
+                            and exposure * direction > 0):
+                        return {
+                            "allowed": False,
+                            "reason": f"Already have correlated position in {held_symbol} "
+                                      f"(correlation {correlation:.2f} with {symbol})"
+                        }
+            
             return {"allowed": True}
             
         except Exception as e:
@@ -768,7 +1133,11 @@ class RiskManager:
     async def _check_market_conditions(self, symbol: str) -> Dict[str, Any]:
         """Check market conditions for trading"""
         try:
-            market_data = await self.delta_connector.get_market_data(symbol)
+            ticker = self.risk_state.get_ticker(symbol)
+            if ticker is not None:
+                market_data = {"volatility": ticker.get("volatility", 0), "volume_24h": ticker.get("volume", 0)}
+            else:
+                market_data = await self.delta_connector.get_market_data(symbol)
             
             # Check volatility
             volatility = market_data.get("volatility", 0)
@@ -792,31 +1161,35 @@ class RiskManager:
             logger.error(f"Error checking market conditions: {e}")
             return {"allowed": True}  # Allow on error to avoid blocking
     
-    async def _check_correlation_limits(self, symbol: str) -> Dict[str, Any]:
-        """Check correlation exposure limits"""
+    async def _check_correlation_limits(
+        self,
+        symbol: str,
+        direction: float = 1.0,
+        snapshot: Optional[RiskSnapshot] = None
+    ) -> Dict[str, Any]:
+        """Check correlation-weighted exposure in the trade's direction (EWMA correlations)"""
         try:
-            # Get current positions
-            open_positions = await self._get_open_positions()
+            exposures = self.risk_state.net_exposures()
+            if not exposures:
+                return {"allowed": True}
             
-            # Calculate exposure to correlated assets
-            # For simplicity, we'll consider BTC and ETH as different asset classes
-            crypto_exposure = 0.0
-            portfolio_value = await self._get_portfolio_value()
+            portfolio_value = snapshot.portfolio_value if snapshot is not None else await self._get_portfolio_value()
+            await self._ensure_risk_model(set(exposures) | {symbol})
             
-            for position in open_positions:
-                if position["symbol"].startswith(("BTC", "ETH")):
-                    position_value = position["current_price"] * position["size"]
-                    crypto_exposure += position_value
+            # Book exposure that moves with symbol: one correlation row times the exposure vector
+            correlated_exposure = direction * self.risk_analytics.correlated_exposure(exposures, symbol)
+            exposure_pct = correlated_exposure / portfolio_value if portfolio_value > 0 else 0
             
-            # Add proposed position exposure
-            if symbol.startswith(("BTC", "ETH")):
-                exposure_pct = crypto_exposure / portfolio_value if portfolio_value > 0 else 0
-                
-                if exposure_pct > self.max_correlation_exposure:
-                    return {
-                        "allowed": False,
-                        "reason": f"Correlation exposure limit: {exposure_pct:.1%} >= {self.max_correlation_exposure:.1%}"
+            if exposure_pct > self.max_correlation_exposure:
+                return {
+                    "allowed": False,
+                    "reason": f"Correlation exposure limit: {exposure_pct:.1%} >= {self.max_correlation_exposure:.1%}",
+                    "details": {
+                        "correlated_exposure": correlated_exposure,
+                        "exposure_pct": exposure_pct,
+                        "max_correlation_exposure": self.max_correlation_exposure
                     }
+                }
             
             return {"allowed": True}
             
@@ -824,11 +1197,14 @@ class RiskManager:
             logger.error(f"Error checking correlation limits: {e}")
             return {"allowed": True}  # Allow on error
     
-    async def _check_minimum_balance(self) -> Dict[str, Any]:
+    async def _check_minimum_balance(self, snapshot: Optional[RiskSnapshot] = None) -> Dict[str, Any]:
         """Check minimum account balance"""
         try:
-            balance = await self.delta_connector.get_account_balance()
-            available_balance = balance.get("available_balance", 0)
+            if snapshot is not None:
+                available_balance = snapshot.available_balance
+            else:
+                balance = await self.delta_connector.get_account_balance()
+                available_balance = balance.get("available_balance", 0)
             
             if available_balance < self.min_account_balance:
                 return {
@@ -850,12 +1226,30 @@ class RiskManager:
     async def _get_portfolio_value(self) -> float:
         """Get current portfolio value"""
         try:
-            balance = await self.delta_connector.get_account_balance()
-            return balance.get("total_balance", 0)
+            await self.risk_state.ensure_fresh()
+            return self.risk_state.snapshot().portfolio_value
         except Exception as e:
             logger.error(f"Error getting portfolio value: {e}")
             return 0.0
     
+    async def _get_gate_price(self, symbol: str, price: Optional[float] = None) -> float:
+        """Current price for gating: cached ticker if recent, else fetched and cached"""
+        ticker = self.risk_state.get_ticker(symbol)
+        if ticker is None:
+            try:
+                ticker = await self.delta_connector.get_ticker(symbol)
+                if ticker:
+                    self.risk_state.update_ticker(symbol, ticker)
+            except Exception as e:
+                logger.debug(f"Ticker fetch failed for {symbol}: {e}")
+                ticker = None
+        
+        if ticker:
+            current_price = ticker.get("close") or ticker.get("mark_price")
+            if current_price:
+                return float(current_price)
+        return price or 0
+    
     async def _calculate_total_exposure(self) -> float:
         """Calculate total position exposure"""
         try:
@@ -873,63 +1267,36 @@ class RiskManager:
             return 0.0
     
     async def _calculate_daily_pnl(self) -> float:
-        """Calculate daily P&L"""
+        """
+        Calculate daily P&L.
+        
+        Realized P&L since UTC midnight is kept incrementally by the risk state
+        (seeded from a SQL SUM); unrealized P&L is valued at current marks.
+        """
         try:
-            # Get today's trades
-            today = datetime.utcnow().date()
-            daily_pnl = 0.0
-            
-            async for db in get_db():
-                result = await db.execute(
-                    select(Trade).filter(
-                        Trade.created_at >= today,
-                        Trade.status == TradeStatus.CLOSED
-                    )
-                )
-                daily_trades = result.scalars().all()
-                
-                daily_pnl = sum(float(trade.realized_pnl or 0) for trade in daily_trades)
-                break  # Exit after getting the data
-                
-            # Add unrealized P&L from open positions
-            open_positions = await self._get_open_positions()
-            for position in open_positions:
-                daily_pnl += position.get("unrealized_pnl", 0)
-            
-            return daily_pnl
+            await self.risk_state.ensure_fresh()
+            await self.risk_state.get_marks(self.risk_state.held_symbols)
+            return self.risk_state.snapshot().daily_pnl
             
         except Exception as e:
             logger.error(f"Error calculating daily P&L: {e}")
             return 0.0
     
     async def _calculate_current_drawdown(self) -> float:
-        """Calculate current drawdown from peak"""
+        """Current drawdown of equity from its high-water mark (O(1), no I/O once loaded)"""
         try:
-            # This would typically track the peak portfolio value
-            # For now, we'll use a simplified calculation
-            current_value = await self._get_portfolio_value()
-            
-            # Get historical peak (simplified)
-            peak_value = max(current_value, self.min_account_balance * 2)  # Assume some peak
-            
-            drawdown = (peak_value - current_value) / peak_value if peak_value > 0 else 0
-            return max(0, drawdown)
+            await self.equity_curve.ensure_loaded()
+            return self.equity_curve.drawdown
             
         except Exception as e:
             logger.error(f"Error calculating drawdown: {e}")
             return 0.0
     
     async def _count_open_positions(self) -> int:
-        """Count open positions"""
+        """Count open positions (in-memory counter maintained by the risk state)"""
         try:
-            async for db in get_db():
-                result = await db.execute(
-                    select(Trade).filter(
-                        Trade.status.in_([TradeStatus.OPEN, TradeStatus.PARTIALLY_FILLED])
-                    )
-                )
-                trades = result.scalars().all()
-                return len(trades)
+            await self.risk_state.ensure_fresh()
+            return self.risk_state.snapshot().open_positions
         except Exception as e:
             logger.error(f"Error counting open positions: {e}")
             return 0
@@ -937,58 +1304,69 @@ class RiskManager:
     async def _has_existing_position(self, symbol: str) -> bool:
         """Check if there's an existing position in symbol"""
         try:
-            async for db in get_db():
-                result = await db.execute(
-                    select(Trade).filter(
-                        Trade.symbol == symbol,
-                        Trade.status.in_([TradeStatus.OPEN, TradeStatus.PARTIALLY_FILLED])
-                    )
-                )
-                existing = result.scalars().first()
-                return existing is not None
+            await self.risk_state.ensure_fresh()
+            return self.risk_state.has_position(symbol)
         except Exception as e:
             logger.error(f"Error checking existing position: {e}")
             return False
     
     async def _get_open_positions(self) -> List[Dict[str, Any]]:
-        """Get all open positions"""
+        """
+        Get this environment's open positions, valued at current marks in one batched lookup.
+        
+        Trades the order state store has not written behind yet come from memory.
+        """
         try:
+            pending = {
+                trade.trade_id: trade
+                for trade in get_order_state_store(self.paper_trading).pending_trades()
+                if trade.is_paper_trade == self.paper_trading
+            }
             open_trades = []
             async for db in get_db():
                 result = await db.execute(
                     select(Trade).filter(
-                        Trade.status.in_([TradeStatus.OPEN, TradeStatus.PARTIALLY_FILLED])
+                        Trade.is_paper_trade == self.paper_trading,
+                        Trade.status.in_(OPEN_TRADE_STATUSES),
+                        Trade.trade_id.notin_(pending)
                     )
                 )
-                open_trades = result.scalars().all()
+                open_trades = list(result.scalars().all())
                 break  # Exit after getting the data
-            
-            positions = []
-            for trade in open_trades:
-                # Get current price
-                current_price = await self.delta_connector.get_current_price(trade.symbol)
-                
-                # Calculate unrealized P&L
-                entry_price = float(trade.entry_price) if trade.entry_price else 0
-                size = float(trade.size)
-                
-                if trade.trade_type == TradeType.BUY:
-                    unrealized_pnl = (current_price - entry_price) * size
-                else:
-                    unrealized_pnl = (entry_price - current_price) * size
-                
-                positions.append({
+            open_trades += [trade for trade in pending.values() if trade.status in OPEN_TRADE_STATUSES]
+            
+            if not open_trades:
+                return []
+            
+            # One price lookup for every symbol held (cached marks or a single all-tickers call)
+            marks = await self.risk_state.get_marks(trade.symbol for trade in open_trades)
+            
+            # Value all positions in one vectorized pass
+            sizes = np.array([float(trade.filled_quantity or trade.quantity or 0) for trade in open_trades])
+            entry_prices = np.array([float(trade.average_fill_price or trade.entry_price or 0) for trade in open_trades])
+            directions = np.array([1.0 if trade.trade_type == TradeType.BUY else -1.0 for trade in open_trades])
+            # Without a mark, value at entry (zero unrealized P&L) rather than at zero
+            current_prices = np.array([
+                marks.get(trade.symbol, entry_prices[i]) for i, trade in enumerate(open_trades)
+            ])
+            unrealized_pnls = directions * sizes * (current_prices - entry_prices)
+            
+            return [
+                {
                     "trade_id": trade.id,
                     "symbol": trade.symbol,
                     "side": trade.trade_type.value,
-                    "size": size,
-                    "entry_price": entry_price,
-                    "current_price": current_price,
-                    "unrealized_pnl": unrealized_pnl,
+                    "size": float(sizes[i]),
+                    "entry_price": float(entry_prices[i]),
+                    "current_price": float(current_prices[i]),
+                    "unrealized_pnl": float(unrealized_pnls[i]),
+                    "stop_loss_price": float(trade.stop_loss_price) if trade.stop_loss_price else None,
+                    "target_price": float(trade.target_price) if trade.target_price else None,
+                    "leverage": float(getattr(trade, "leverage", None) or 1.0),
                     "created_at": trade.created_at
-                })
-            
-            return positions
+                }
+                for i, trade in enumerate(open_trades)
+            ]
             
         except Exception as e:
             logger.error(f"Error getting open positions: {e}")
@@ -1118,21 +1496,30 @@ class RiskManager:
             logger.error(f"Error getting risk summary: {e}")
             return {"error": str(e)}
     
+    async def run_stress_test(self, scenario: StressScenario) -> Dict[str, Any]:
+        """
+        Monte Carlo stress test of the open positions.
+        
+        Raises:
+            ValueError: If the scenario is invalid
+        """
+        positions = await self._get_open_positions()
+        symbols = {position["symbol"] for position in positions}
+        if symbols:
+            await self.risk_analytics.refresh(symbols)
+        
+        report = await stress_tester.run(
+            scenario, positions, self.risk_analytics.get_model(), await self._get_portfolio_value()
+        )
+        report["environment"] = "testnet" if self.paper_trading else "live"
+        report["timestamp"] = datetime.utcnow()
+        return report
+    
     async def _get_asset_exposure(self, symbol: str) -> float:
         """Get current exposure for a specific asset"""
         try:
-            async for db in get_db():
-                result = await db.execute(
-                    select(Trade).where(
-                        Trade.symbol == symbol,
-                        Trade.status.in_([TradeStatus.OPEN, TradeStatus.PARTIAL])
-                    )
-                )
-                trades = result.scalars().all()
-                
-                total_exposure = sum(trade.size * trade.entry_price for trade in trades)
-                return total_exposure
-                
+            await self.risk_state.ensure_fresh()
+            return self.risk_state.snapshot().exposure_by_symbol.get(symbol, 0.0)
         except Exception as e:
             logger.error(f"Error getting asset exposure for {symbol}: {e}")
             return 0.0
@@ -1140,23 +1527,8 @@ class RiskManager:
     async def _count_consecutive_losses(self) -> int:
         """Count consecutive losing trades"""
         try:
-            async for db in get_db():
-                result = await db.execute(
-                    select(Trade).where(
-                        Trade.status == TradeStatus.CLOSED
-                    ).order_by(Trade.exit_time.desc()).limit(10)
-                )
-                recent_trades = result.scalars().all()
-                
-                consecutive_losses = 0
-                for trade in recent_trades:
-                    if trade.pnl < 0:
-                        consecutive_losses += 1
-                    else:
-                        break
-                
-                return consecutive_losses
-                
+            await self.risk_state.ensure_fresh()
+            return self.risk_state.snapshot().consecutive_losses
         except Exception as e:
             logger.error(f"Error counting consecutive losses: {e}")
             return 0
@@ -1213,45 +1585,37 @@ class RiskManager:
         reason: str = None,
         risk_score: float = None,
         confidence: float = None,
-        details: str = None
+        details: str = None,
+        snapshot: Optional[RiskSnapshot] = None
     ):
-        """Persist risk event to database for audit trail"""
+        """Queue risk event for the audit trail (written in batches off the order path)"""
         try:
-            async for db in get_db():
-                # Get current portfolio metrics
-                portfolio_value = await self._get_portfolio_value()
-                daily_pnl = await self._calculate_daily_pnl()
-                total_exposure = await self._calculate_total_exposure()
-                open_positions_count = await self._count_open_positions()
-                
-                # Create risk event
-                risk_event = RiskEvent(
-                    event_type=event_type,
-                    correlation_id=correlation_id,
-                    symbol=symbol,
-                    side=side,
-                    quantity=quantity,
-                    price=price,
-                    notional_usd=notional_usd,
-                    portfolio_value_usd=portfolio_value,
-                    daily_pnl_usd=daily_pnl,
-                    total_exposure_usd=total_exposure,
-                    open_positions_count=open_positions_count,
-                    decision=decision,
-                    reason=reason,
-                    risk_score=risk_score,
-                    confidence=confidence,
-                    environment="testnet" if self.paper_trading else "live",
-                    paper_trading=self.paper_trading,
-                    details=details
-                )
-                
-                db.add(risk_event)
-                await db.commit()
-                
-                logger.debug(f"Risk event persisted: {event_type} for {correlation_id}")
-                
+            # Portfolio metrics come from the in-memory risk state
+            if snapshot is None:
+                snapshot = self.risk_state.snapshot()
+            
+            risk_audit_writer.submit(RiskAuditRecord(
+                event_type=event_type,
+                correlation_id=correlation_id,
+                symbol=symbol,
+                side=side,
+                quantity=quantity,
+                price=price,
+                notional_usd=notional_usd,
+                portfolio_value_usd=snapshot.portfolio_value,
+                daily_pnl_usd=snapshot.daily_pnl,
+                total_exposure_usd=snapshot.total_exposure,
+                open_positions_count=snapshot.open_positions,
+                decision=decision,
+                reason=reason,
+                risk_score=risk_score,
+                confidence=confidence,
+                environment="testnet" if self.paper_trading else "live",
+                paper_trading=self.paper_trading,
+                details=details,
+                created_at=datetime.now(timezone.utc)
+            ))
+            
         except Exception as e:
-            logger.error(f"Failed to persist risk event: {e}")
-            # Don't fail the main operation if persistence fails
-
+            logger.error(f"Failed to queue risk event: {e}")
+            # Don't fail the main operation if auditing fails
@@ -0,0 +1,600 @@
+"""
+Risk State Cache for Crypto-0DTE System
+
+Event-driven, in-memory risk state shared by every RiskManager in an
+environment. Exposure, unrealized and daily realized P&L, open position
+count, consecutive losses and account balance are maintained incrementally
+from fills, trade closes, price ticks and balance refreshes, so the
+pre-trade risk gate evaluates an O(1) snapshot instead of querying the
+database and exchange on every order.
+
+The database and exchange remain the source of truth: a background task
+refreshes balances and marks, and periodically reconciles positions,
+today's realized P&L and the loss streak from the trades table, merged
+with the trades the order state store has not written yet. Equity
+changes feed the environment's equity curve (high-water mark/drawdown).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, date
+from typing import Collection, Dict, Iterable, List, Optional, Any
+
+from sqlalchemy import select, func
+
+from app.config import settings
+from app.database import get_db
+from app.models.trade import Trade, TradeStatus, TradeType
+from app.services.exchanges.connector_pool import get_delta_connector
+from app.services.equity_curve import get_equity_curve
+from app.services.order_state import get_order_state_store
+
+logger = logging.getLogger(__name__)
+
+
+# Trade statuses that hold market exposure (entry filled, not yet closed)
+OPEN_TRADE_STATUSES = (TradeStatus.FILLED, TradeStatus.PARTIALLY_FILLED)
+
+# Closed trades inspected when rebuilding the consecutive-loss streak
+LOSS_STREAK_LOOKBACK = 20
+
+# Database rebuilds attempted before a reconcile that keeps racing live fills gives up
+RECONCILE_ATTEMPTS = 3
+
+
+@dataclass(frozen=True, slots=True)
+class RiskSnapshot:
+    """Immutable point-in-time view of risk state"""
+    portfolio_value: float
+    available_balance: float
+    daily_realized_pnl: float
+    unrealized_pnl: float
+    total_exposure: float
+    exposure_by_symbol: Dict[str, float]
+    open_positions: int
+    consecutive_losses: int
+    balance_age_seconds: float
+    timestamp: float
+
+    @property
+    def daily_pnl(self) -> float:
+        """Realized P&L since UTC midnight plus unrealized P&L"""
+        return self.daily_realized_pnl + self.unrealized_pnl
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "portfolio_value": self.portfolio_value,
+            "available_balance": self.available_balance,
+            "daily_realized_pnl": self.daily_realized_pnl,
+            "unrealized_pnl": self.unrealized_pnl,
+            "daily_pnl": self.daily_pnl,
+            "total_exposure": self.total_exposure,
+            "exposure_by_symbol": dict(self.exposure_by_symbol),
+            "open_positions": self.open_positions,
+            "consecutive_losses": self.consecutive_losses,
+            "balance_age_seconds": round(self.balance_age_seconds, 3)
+        }
+
+
+class RiskStateCache:
+    """In-memory risk state for one trading environment"""
+
+    def __init__(self, paper_trading: bool):
+        self.paper_trading = paper_trading
+        self.environment = "testnet" if paper_trading else "live"
+        self.delta_connector = get_delta_connector(paper_trading=paper_trading)
+        self.equity_curve = get_equity_curve(paper_trading=paper_trading)
+
+        # Configuration
+        self.refresh_interval = settings.RISK_STATE_REFRESH_INTERVAL
+        self.reconcile_interval = settings.RISK_STATE_RECONCILE_INTERVAL
+        self.max_balance_age = settings.RISK_STATE_MAX_AGE
+        self.max_mark_age = settings.RISK_STATE_MARK_MAX_AGE
+
+        # Balance
+        self.total_balance = 0.0
+        self.available_balance = 0.0
+        self._balance_updated = 0.0  # monotonic; 0 = never loaded
+        self._unsettled_realized = 0.0  # Realized P&L not yet reflected in the fetched balance
+
+        # Positions: symbol -> {"size": signed size, "entry_price": float, "count": open trades}
+        self._positions: Dict[str, Dict[str, float]] = {}
+
+        # Marks and tickers: symbol -> (value, monotonic timestamp)
+        self._marks: Dict[str, float] = {}
+        self._tickers: Dict[str, tuple] = {}
+
+        # Incrementally maintained aggregates
+        self._exposure: Dict[str, float] = {}
+        self._unrealized: Dict[str, float] = {}
+        self._total_exposure = 0.0
+        self._total_unrealized = 0.0
+        self._open_positions = 0
+
+        # Daily realized P&L (UTC day) and loss streak
+        self._day: date = datetime.utcnow().date()
+        self._daily_realized = 0.0
+        self._consecutive_losses = 0
+
+        # Bumped on every position open/exit; reconcile discards rebuilds that raced one
+        self._position_events = 0
+        self._reconciles_skipped = 0
+
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._balance_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._balance_refresh_pending = False
+
+    # =============================================================================
+    # LIFECYCLE
+    # =============================================================================
+
+    def ensure_started(self):
+        """Start background refresh and subscribe to exchange events (idempotent)"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self.delta_connector.add_private_event_listener(self._on_private_event)
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+            self.equity_curve.ensure_started()
+            logger.info(f"Risk state cache started for {self.environment}")
+
+    async def stop(self):
+        """Stop background refresh"""
+        self.delta_connector.remove_private_event_listener(self._on_private_event)
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = None
+
+    async def ensure_fresh(self):
+        """Load state on first use and refresh a stale balance; no I/O when fresh"""
+        if not self._loaded:
+            async with self._load_lock:
+                if not self._loaded:
+                    await self.equity_curve.ensure_loaded()
+                    await self.reconcile()
+        if time.monotonic() - self._balance_updated > self.max_balance_age:
+            await self.refresh_balance()
+
+    async def _refresh_loop(self):
+        last_reconcile = time.monotonic()
+        while True:
+            try:
+                await asyncio.sleep(self.refresh_interval)
+                await self.refresh_balance()
+                await self.refresh_marks()
+
+                if time.monotonic() - last_reconcile >= self.reconcile_interval:
+                    await self.reconcile()
+                    last_reconcile = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Risk state refresh failed: {e}")
+
+    # =============================================================================
+    # SNAPSHOT
+    # =============================================================================
+
+    def snapshot(self) -> RiskSnapshot:
+        """Current risk state (O(symbols held))"""
+        self._check_day_rollover()
+        now = time.monotonic()
+        return RiskSnapshot(
+            portfolio_value=self.total_balance,
+            available_balance=self.available_balance,
+            daily_realized_pnl=self._daily_realized,
+            unrealized_pnl=self._total_unrealized,
+            total_exposure=self._total_exposure,
+            exposure_by_symbol=dict(self._exposure),
+            open_positions=self._open_positions,
+            consecutive_losses=self._consecutive_losses,
+            balance_age_seconds=now - self._balance_updated if self._balance_updated else float("inf"),
+            timestamp=time.time()
+        )
+
+    @property
+    def held_symbols(self) -> List[str]:
+        """Symbols with an open position"""
+        return list(self._positions)
+    
+    def net_exposures(self) -> Dict[str, float]:
+        """Signed USD exposure per held symbol (long positive, short negative)"""
+        return {
+            symbol: position["size"] * self._marks.get(symbol, position["entry_price"])
+            for symbol, position in self._positions.items()
+        }
+    
+    def has_position(self, symbol: str) -> bool:
+        """Whether an open position exists in symbol"""
+        return symbol in self._positions
+    
+    def position_size(self, symbol: str) -> float:
+        """Signed net position size in symbol (long positive, short negative)"""
+        position = self._positions.get(symbol)
+        return position["size"] if position else 0.0
+    
+    def get_ticker(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Latest cached ticker for a symbol if younger than max_age"""
+        entry = self._tickers.get(symbol)
+        if entry is None:
+            return None
+        ticker, updated = entry
+        if time.monotonic() - updated > (self.max_mark_age if max_age is None else max_age):
+            return None
+        return ticker
+
+    async def get_marks(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        Mark prices for a set of symbols.
+        
+        Cached tickers younger than RISK_STATE_MARK_MAX_AGE are reused; the
+        rest are fetched together in one all-tickers request. Symbols the
+        exchange does not return are omitted.
+        """
+        marks: Dict[str, float] = {}
+        missing = []
+        for symbol in set(symbols):
+            ticker = self.get_ticker(symbol)
+            if ticker is not None and symbol in self._marks:
+                marks[symbol] = self._marks[symbol]
+            else:
+                missing.append(symbol)
+        
+        if missing:
+            tickers = await self.delta_connector.get_tickers(missing)
+            for symbol, ticker in tickers.items():
+                self.update_ticker(symbol, ticker)
+                if symbol in self._marks:
+                    marks[symbol] = self._marks[symbol]
+        
+        return marks
+    
+    def _check_day_rollover(self):
+        today = datetime.utcnow().date()
+        if today != self._day:
+            logger.info(f"Risk state day rollover: realized P&L {self._daily_realized:.2f} for {self._day}")
+            self._day = today
+            self._daily_realized = 0.0
+
+    # =============================================================================
+    # EVENTS
+    # =============================================================================
+
+    def update_mark(self, symbol: str, price: float):
+        """Apply a price tick to one symbol's exposure and unrealized P&L"""
+        if not price or price <= 0:
+            return
+        self._marks[symbol] = float(price)
+        self._revalue(symbol)
+        self._record_equity()
+
+    def update_ticker(self, symbol: str, ticker: Dict[str, Any]):
+        """Cache a ticker and apply its price as the mark"""
+        self._tickers[symbol] = (ticker, time.monotonic())
+        price = ticker.get("mark_price") or ticker.get("close")
+        if price:
+            self.update_mark(symbol, float(price))
+
+    def record_position_opened(self, symbol: str, side: str, size: float, entry_price: float):
+        """Apply an entry fill"""
+        signed_size = float(size) if side.upper() == TradeType.BUY.value else -float(size)
+        position = self._positions.setdefault(symbol, {"size": 0.0, "entry_price": 0.0, "count": 0})
+
+        new_size = position["size"] + signed_size
+        if new_size and (position["size"] == 0 or (position["size"] > 0) == (signed_size > 0)):
+            position["entry_price"] = (
+                abs(position["size"]) * position["entry_price"] + abs(signed_size) * float(entry_price)
+            ) / abs(new_size)
+        position["size"] = new_size
+        position["count"] += 1
+        self._open_positions += 1
+        self._position_events += 1
+
+        if symbol not in self._marks and entry_price:
+            self._marks[symbol] = float(entry_price)
+        self._revalue(symbol)
+        self._record_equity()
+
+    def record_position_closed(
+        self,
+        symbol: str,
+        side: str,
+        size: float,
+        realized_pnl: float,
+        closed_at: Optional[datetime] = None,
+        trade_pnl: Optional[float] = None
+    ):
+        """
+        Apply a trade close: reduce the position and update daily P&L and loss streak.
+
+        realized_pnl is the P&L of this exit; trade_pnl, the trade's total after earlier
+        partial exits, decides the loss streak (defaults to realized_pnl).
+        """
+        self._apply_exit(symbol, side, size, realized_pnl, closed_at, closes_trade=True)
+        trade_pnl = realized_pnl if trade_pnl is None else trade_pnl
+        self._consecutive_losses = self._consecutive_losses + 1 if (trade_pnl or 0) < 0 else 0
+        self._record_equity()
+
+    def record_position_reduced(
+        self,
+        symbol: str,
+        side: str,
+        size: float,
+        realized_pnl: float,
+        closed_at: Optional[datetime] = None
+    ):
+        """Apply a partial exit of a trade that stays open (loss streak unchanged)"""
+        self._apply_exit(symbol, side, size, realized_pnl, closed_at, closes_trade=False)
+        self._record_equity()
+
+    def _apply_exit(
+        self,
+        symbol: str,
+        side: str,
+        size: float,
+        realized_pnl: float,
+        closed_at: Optional[datetime],
+        closes_trade: bool
+    ):
+        self._position_events += 1
+        position = self._positions.get(symbol)
+        if position:
+            signed_size = float(size) if side.upper() == TradeType.BUY.value else -float(size)
+            position["size"] -= signed_size
+            if closes_trade:
+                position["count"] = max(0, position["count"] - 1)
+                self._open_positions = max(0, self._open_positions - 1)
+            if position["count"] == 0 or abs(position["size"]) < 1e-12:
+                del self._positions[symbol]
+            self._revalue(symbol)
+
+        self._check_day_rollover()
+        if (closed_at or datetime.utcnow()).date() == self._day:
+            self._daily_realized += float(realized_pnl or 0)
+
+        # Realized P&L changes the balance; count it until the refresh (off the critical path) lands
+        self._unsettled_realized += float(realized_pnl or 0)
+        self._schedule_balance_refresh()
+
+    def _on_private_event(self, channel: str, event: Dict[str, Any]):
+        """Exchange private stream listener (marks from positions, balance after fills)"""
+        if channel == "positions":
+            symbol = event.get("product_symbol") or event.get("symbol")
+            mark = event.get("mark_price")
+            if symbol and mark:
+                self.update_mark(symbol, float(mark))
+        elif channel == "user_trades":
+            self._schedule_balance_refresh()
+
+    def _schedule_balance_refresh(self):
+        if self._balance_refresh_pending:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._balance_refresh_pending = True
+        asyncio.create_task(self._deferred_balance_refresh())
+
+    async def _deferred_balance_refresh(self):
+        try:
+            await self.refresh_balance()
+        except Exception as e:
+            logger.debug(f"Deferred balance refresh failed: {e}")
+        finally:
+            self._balance_refresh_pending = False
+
+    @property
+    def equity(self) -> float:
+        """Wallet balance plus realized P&L not yet in it plus unrealized P&L"""
+        return self.total_balance + self._unsettled_realized + self._total_unrealized
+
+    def _record_equity(self):
+        """Feed the equity curve once a balance has been loaded (aggregates must be consistent)"""
+        if self._balance_updated and self.total_balance > 0:
+            self.equity_curve.record(self.equity)
+
+    def _revalue(self, symbol: str):
+        """Recompute one symbol's exposure and unrealized P&L and adjust the totals"""
+        position = self._positions.get(symbol)
+        mark = self._marks.get(symbol)
+
+        if position and mark:
+            exposure = abs(position["size"]) * mark
+            unrealized = position["size"] * (mark - position["entry_price"])
+        else:
+            exposure = unrealized = 0.0
+
+        self._total_exposure += exposure - self._exposure.get(symbol, 0.0)
+        self._total_unrealized += unrealized - self._unrealized.get(symbol, 0.0)
+
+        if position:
+            self._exposure[symbol] = exposure
+            self._unrealized[symbol] = unrealized
+        else:
+            self._exposure.pop(symbol, None)
+            self._unrealized.pop(symbol, None)
+
+    # =============================================================================
+    # REFRESH AND RECONCILIATION
+    # =============================================================================
+
+    async def refresh_balance(self):
+        """Fetch account balance from the exchange"""
+        async with self._balance_lock:
+            balance = await self.delta_connector.get_account_balance()
+            self.total_balance = float(balance.get("total_balance", 0))
+            self.available_balance = float(balance.get("available_balance", 0))
+            self._balance_updated = time.monotonic()
+            self._unsettled_realized = 0.0
+        self._record_equity()
+
+    async def refresh_marks(self):
+        """Refresh tickers for every held symbol (one batched request)"""
+        if not self._positions:
+            return
+        tickers = await self.delta_connector.get_tickers(list(self._positions))
+        for symbol, ticker in tickers.items():
+            self.update_ticker(symbol, ticker)
+
+    async def reconcile(self):
+        """
+        Rebuild positions, today's realized P&L and the loss streak from the database.
+
+        Trades the order state store has not written behind yet are taken from
+        memory instead of their (stale or missing) database rows. A rebuild that
+        overlapped a position open or exit is discarded and retried, so the swap
+        never rolls back a fill applied while the queries were in flight.
+        """
+        for attempt in range(1, RECONCILE_ATTEMPTS + 1):
+            events = self._position_events
+            rebuilt = await self._rebuild_from_db()
+            if self._position_events == events:
+                break
+            logger.debug(f"Risk state reconcile raced a position change (attempt {attempt}), rebuilding")
+        else:
+            if self._loaded:
+                # The incrementally maintained state is current; the next interval retries
+                self._reconciles_skipped += 1
+                logger.warning(
+                    f"Risk state reconcile skipped for {self.environment}: "
+                    f"positions kept changing during {RECONCILE_ATTEMPTS} rebuilds"
+                )
+                return
+            logger.warning(f"Risk state initial load for {self.environment} raced position changes")
+
+        positions, today_start, daily_realized, consecutive_losses = rebuilt
+
+        # Swap in the rebuilt state and recompute aggregates
+        self._positions = positions
+        self._open_positions = sum(int(p["count"]) for p in positions.values())
+        self._exposure, self._unrealized = {}, {}
+        self._total_exposure = self._total_unrealized = 0.0
+        for symbol in positions:
+            self._revalue(symbol)
+
+        self._day = today_start.date()
+        self._daily_realized = daily_realized
+        self._consecutive_losses = consecutive_losses
+        self._loaded = True
+        self._record_equity()
+
+        logger.debug(
+            f"Risk state reconciled: {self._open_positions} open positions, "
+            f"daily realized {daily_realized:.2f}, loss streak {consecutive_losses}"
+        )
+
+    async def _rebuild_from_db(self):
+        """Query positions, today's realized P&L and the loss streak without touching live state"""
+        today_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        pending = {
+            trade.trade_id: trade
+            for trade in get_order_state_store(self.paper_trading).pending_trades()
+            if trade.is_paper_trade == self.paper_trading
+        }
+        async for db in get_db():
+            result = await db.execute(
+                select(Trade).filter(
+                    Trade.is_paper_trade == self.paper_trading,
+                    Trade.status.in_(OPEN_TRADE_STATUSES),
+                    Trade.trade_id.notin_(pending)
+                )
+            )
+            open_trades = list(result.scalars().all())
+
+            daily_realized = await query_realized_pnl_since(db, today_start, self.paper_trading, exclude=pending)
+
+            result = await db.execute(
+                select(Trade.closed_at, Trade.realized_pnl).filter(
+                    Trade.is_paper_trade == self.paper_trading,
+                    Trade.status == TradeStatus.CLOSED,
+                    Trade.closed_at.isnot(None),
+                    Trade.trade_id.notin_(pending)
+                ).order_by(Trade.closed_at.desc()).limit(LOSS_STREAK_LOOKBACK)
+            )
+            recent_closes = [(closed_at, float(pnl or 0)) for closed_at, pnl in result.all()]
+            break
+
+        for trade in pending.values():
+            if trade.status in OPEN_TRADE_STATUSES:
+                open_trades.append(trade)
+            elif trade.status == TradeStatus.CLOSED and trade.closed_at is not None:
+                recent_closes.append((trade.closed_at, float(trade.realized_pnl or 0)))
+                if trade.closed_at >= today_start:
+                    daily_realized += float(trade.realized_pnl or 0)
+        recent_closes.sort(key=lambda close: close[0], reverse=True)
+        recent_pnls = [pnl for _, pnl in recent_closes[:LOSS_STREAK_LOOKBACK]]
+
+        positions: Dict[str, Dict[str, float]] = {}
+        for trade in open_trades:
+            size = float(trade.filled_quantity or trade.quantity or 0)
+            entry = float(trade.average_fill_price or trade.entry_price or 0)
+            signed_size = size if trade.trade_type == TradeType.BUY else -size
+            position = positions.setdefault(trade.symbol, {"size": 0.0, "entry_price": 0.0, "count": 0})
+            new_size = position["size"] + signed_size
+            if new_size:
+                position["entry_price"] = (abs(position["size"]) * position["entry_price"] + size * entry) / abs(new_size)
+            position["size"] = new_size
+            position["count"] += 1
+
+        consecutive_losses = 0
+        for pnl in recent_pnls:
+            if pnl >= 0:
+                break
+            consecutive_losses += 1
+
+        return positions, today_start, daily_realized, consecutive_losses
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get risk state cache statistics"""
+        return {
+            "environment": self.environment,
+            "loaded": self._loaded,
+            "reconciles_skipped": self._reconciles_skipped,
+            "symbols_held": len(self._positions),
+            **self.snapshot().to_dict()
+        }
+
+
+async def query_realized_pnl_since(
+    db,
+    since: datetime,
+    paper_trading: bool,
+    exclude: Collection[str] = ()
+) -> float:
+    """Realized P&L of an environment's trades closed since a time (SUM over the status/closed_at index)"""
+    result = await db.execute(
+        select(func.coalesce(func.sum(Trade.realized_pnl), 0)).filter(
+            Trade.is_paper_trade == paper_trading,
+            Trade.status == TradeStatus.CLOSED,
+            Trade.closed_at >= since,
+            Trade.trade_id.notin_(exclude)
+        )
+    )
+    return float(result.scalar() or 0)
+
+
+# Shared risk state per environment
+_risk_states: Dict[str, RiskStateCache] = {}
+
+
+def get_risk_state(paper_trading: bool) -> RiskStateCache:
+    """Get the shared risk state cache for an environment"""
+    key = "testnet" if paper_trading else "live"
+    state = _risk_states.get(key)
+    if state is None:
+        state = RiskStateCache(paper_trading=paper_trading)
+        _risk_states[key] = state
+    return state
+
+
+async def stop_risk_states():
+    """Stop every environment's refresh loop (before exchange connectors close)"""
+    for state in _risk_states.values():
+        await state.stop()
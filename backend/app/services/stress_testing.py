@@ -0,0 +1,579 @@
+"""
+Monte Carlo Stress Testing for Crypto-0DTE System
+
+Simulates correlated price paths for the open positions and reports the
+resulting P&L distribution, liquidation risk and stop/target hit
+probabilities. Paths are either Gaussian (GBM on the EWMA covariance from
+risk analytics) or bootstrapped from demeaned historical one-bar returns, with
+market-wide Poisson jumps on top, and start from an optional instantaneous
+gap scenario such as "BTC -15%, ETH at beta 1.3".
+
+Paths are split into chunks across a process pool. Inputs that scale with
+history (the returns matrix) and every per-path output are shared-memory
+arrays, so workers write results in place and only chunk bounds and
+seeds are pickled.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+SIMULATION_MODELS = ("gbm", "bootstrap")
+SECONDS_PER_YEAR = 365 * 86400
+
+# Per-path, per-position outcome codes
+OUTCOME_OPEN = 0
+OUTCOME_STOP = 1
+OUTCOME_TARGET = 2
+OUTCOME_LIQUIDATED = 3
+
+
+@dataclass
+class StressScenario:
+    """Stress test request: simulation settings plus an optional instantaneous gap"""
+    paths: Optional[int] = None
+    horizon_bars: Optional[int] = None
+    model: str = "gbm"
+    # Gap applied at t=0 as simple returns, e.g. {"BTCUSDT": -0.15}
+    shocks: Dict[str, float] = field(default_factory=dict)
+    # Or one driver shock propagated by beta (correlation-implied where not given)
+    shock_symbol: Optional[str] = None
+    shock_pct: float = 0.0
+    betas: Dict[str, float] = field(default_factory=dict)
+    vol_multiplier: float = 1.0
+    jump_intensity: Optional[float] = None  # Jumps per day
+    jump_mean: Optional[float] = None
+    jump_std: Optional[float] = None
+    seed: Optional[int] = None
+
+
+# =============================================================================
+# SIMULATION KERNEL (runs in worker processes)
+# =============================================================================
+
+def simulate_paths(
+    inputs: Dict[str, Any],
+    returns: Optional[np.ndarray],
+    pnl_out: np.ndarray,
+    min_pnl_out: np.ndarray,
+    outcomes_out: np.ndarray,
+    seed: Any
+):
+    """
+    Simulate ``len(pnl_out)`` paths and write results into the output arrays.
+
+    Positions are checked every bar (including the t=0 gap) in order
+    liquidation, stop, target. Liquidations lose the position to the
+    liquidation price, stops fill at the simulated price (gapping through the
+    stop is not protected) and targets fill at the target.
+    """
+    rng = np.random.default_rng(seed)
+    count = pnl_out.shape[0]
+
+    marks = inputs["marks"]
+    chol = inputs["chol"]
+    drift = inputs["drift"]
+    boot_cols = inputs["boot_cols"]
+    pos_symbol = inputs["pos_symbol"]
+    qty = inputs["qty"]
+    pos_mark = marks[pos_symbol]
+    liq = inputs["liq"]
+    target = inputs["target"]
+    # Compare direction-signed prices so longs and shorts share one test
+    sign = np.sign(qty)
+    signed_liq = liq * sign
+    signed_floor = np.fmax(signed_liq, inputs["stop"] * sign)  # First adverse level: liquidation or stop
+    signed_target = target * sign
+    jump_prob = inputs["jump_prob"]
+    jump_mean = inputs["jump_mean"]
+    jump_std = inputs["jump_std"]
+
+    k = marks.shape[0]
+    gaussian = returns is None or boot_cols.shape[0] < k
+
+    log_prices = np.tile(np.log(marks) + inputs["gap"], (count, 1))
+    is_open = np.ones((count, qty.shape[0]), dtype=bool)
+    outcomes_out[:] = OUTCOME_OPEN
+    realized = np.zeros(count)
+    min_pnl_out[:] = np.inf
+
+    for step in range(inputs["steps"] + 1):
+        if step:
+            if gaussian:
+                moves = rng.standard_normal((count, k)) @ chol.T + drift
+            else:
+                moves = np.empty((count, k))
+            if returns is not None:
+                moves[:, boot_cols] = returns[rng.integers(0, returns.shape[0], count)]
+            if jump_prob > 0:
+                jumped = rng.random(count) < jump_prob
+                jumps = int(jumped.sum())
+                if jumps:
+                    moves[jumped] += rng.normal(jump_mean, jump_std, jumps)[:, None]
+            log_prices += moves
+
+        prices = np.exp(log_prices[:, pos_symbol])
+        signed = prices * sign
+        adverse = is_open & (signed <= signed_floor)
+        favourable = is_open & (signed >= signed_target)
+
+        if adverse.any() or favourable.any():
+            liquidated = adverse & (signed <= signed_liq)
+            stopped = adverse & ~liquidated
+            targeted = favourable & ~adverse
+            closed = adverse | targeted
+            exits = np.where(liquidated, liq, np.where(stopped, prices, target))
+            realized += np.where(closed, (exits - pos_mark) * qty, 0.0).sum(axis=1)
+            outcomes_out[liquidated] = OUTCOME_LIQUIDATED
+            outcomes_out[stopped] = OUTCOME_STOP
+            outcomes_out[targeted] = OUTCOME_TARGET
+            is_open &= ~closed
+
+        pnl = realized + ((prices - pos_mark) * is_open) @ qty
+        np.minimum(min_pnl_out, pnl, out=min_pnl_out)
+
+    pnl_out[:] = pnl
+
+
+def _attach(spec: Tuple[str, Tuple[int, ...], str]) -> Tuple[SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _simulate_chunk(
+    inputs: Dict[str, Any],
+    shared: Dict[str, Tuple[str, Tuple[int, ...], str]],
+    start: int,
+    count: int,
+    seed: Any
+) -> int:
+    """Worker entry point: attach shared arrays and simulate paths [start, start + count)"""
+    handles = []
+    try:
+        arrays = {}
+        for key, spec in shared.items():
+            shm, array = _attach(spec)
+            handles.append(shm)
+            arrays[key] = array
+
+        stop = start + count
+        simulate_paths(
+            inputs,
+            arrays.get("returns"),
+            arrays["pnl"][start:stop],
+            arrays["min_pnl"][start:stop],
+            arrays["outcomes"][start:stop],
+            seed
+        )
+        return count
+    finally:
+        arrays = None
+        for shm in handles:
+            shm.close()
+
+
+# =============================================================================
+# STRESS TESTER
+# =============================================================================
+
+class StressTester:
+    """Runs stress scenarios on a lazily started process pool (one per process)"""
+
+    def __init__(self):
+        self.workers = settings.STRESS_TEST_WORKERS or os.cpu_count() or 1
+        self.default_paths = settings.STRESS_TEST_DEFAULT_PATHS
+        self.max_paths = settings.STRESS_TEST_MAX_PATHS
+        self.min_chunk_paths = settings.STRESS_TEST_MIN_CHUNK_PATHS
+        self.horizon_bars = settings.STRESS_TEST_HORIZON_BARS
+        self.default_volatility = settings.STRESS_TEST_DEFAULT_VOLATILITY
+        self.jump_intensity = settings.STRESS_TEST_JUMP_INTENSITY
+        self.jump_mean = settings.STRESS_TEST_JUMP_MEAN
+        self.jump_std = settings.STRESS_TEST_JUMP_STD
+        self.maintenance_margin = settings.STRESS_TEST_MAINTENANCE_MARGIN
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = asyncio.Lock()  # One run at a time; each run already uses every worker
+
+        # Statistics
+        self.runs = 0
+        self.paths_simulated = 0
+        self.last_elapsed_seconds: Optional[float] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawn: forking a process with a running event loop and open sockets is unsafe
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+            logger.info(f"🎲 Stress test pool started with {self.workers} workers")
+        return self._executor
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("🎲 Stress test pool stopped")
+
+    async def run(
+        self,
+        scenario: StressScenario,
+        positions: List[Dict[str, Any]],
+        model: Dict[str, Any],
+        portfolio_value: float
+    ) -> Dict[str, Any]:
+        """
+        Run a stress scenario against open positions.
+
+        Args:
+            scenario: Simulation settings and gap shocks
+            positions: Open positions as returned by RiskManager._get_open_positions
+            model: Return history and EWMA covariance from RiskAnalyticsEngine.get_model
+            portfolio_value: Account equity used for liquidation and percentage figures
+
+        Raises:
+            ValueError: If the scenario is invalid
+        """
+        paths = scenario.paths if scenario.paths is not None else self.default_paths
+        steps = scenario.horizon_bars if scenario.horizon_bars is not None else self.horizon_bars
+        if not 1 <= paths <= self.max_paths:
+            raise ValueError(f"paths must be between 1 and {self.max_paths}")
+        if steps < 0:
+            raise ValueError("horizon_bars must be non-negative")
+        if scenario.model not in SIMULATION_MODELS:
+            raise ValueError(f"model must be one of {SIMULATION_MODELS}")
+        if scenario.vol_multiplier < 0:
+            raise ValueError("vol_multiplier must be non-negative")
+
+        positions = [p for p in positions if p["size"] > 0 and p["current_price"] > 0]
+        if not positions:
+            return {"paths": 0, "positions": [], "message": "No open positions to stress"}
+
+        inputs, returns = self._build_inputs(scenario, positions, model, steps)
+
+        async with self._lock:
+            started = time.perf_counter()
+            pnl, min_pnl, outcomes = await self._simulate(inputs, returns, paths, scenario.seed)
+            elapsed = time.perf_counter() - started
+
+        self.runs += 1
+        self.paths_simulated += paths
+        self.last_elapsed_seconds = elapsed
+        logger.info(f"🎲 Stress test: {paths} paths x {steps} bars over {len(positions)} positions in {elapsed:.2f}s")
+
+        report = self._summarize(inputs, positions, pnl, min_pnl, outcomes, portfolio_value)
+        report.update({
+            "paths": paths,
+            "horizon_bars": steps,
+            "horizon_seconds": steps * model["bar_seconds"],
+            "model": scenario.model,
+            "gap": {symbol: round(math.expm1(gap), 6) for symbol, gap in zip(inputs["symbols"], inputs["gap"])},
+            "unmodelled_symbols": inputs["unmodelled"],
+            "elapsed_seconds": round(elapsed, 3)
+        })
+        return report
+
+    # -------------------------------------------------------------------------
+    # Inputs
+    # -------------------------------------------------------------------------
+
+    def _build_inputs(
+        self,
+        scenario: StressScenario,
+        positions: List[Dict[str, Any]],
+        model: Dict[str, Any],
+        steps: int
+    ) -> Tuple[Dict[str, Any], Optional[np.ndarray]]:
+        """Per-symbol dynamics and per-position levels as flat arrays for the kernel"""
+        symbols = sorted({p["symbol"] for p in positions})
+        index = {symbol: i for i, symbol in enumerate(symbols)}
+        k = len(symbols)
+
+        marks = np.zeros(k)
+        for p in positions:
+            marks[index[p["symbol"]]] = p["current_price"]
+
+        # Covariance: EWMA block for modelled symbols, default volatility (uncorrelated) otherwise
+        model_index = {symbol: i for i, symbol in enumerate(model["symbols"])}
+        modelled = [symbol for symbol in symbols if symbol in model_index]
+        default_var = self.default_volatility ** 2 * model["bar_seconds"] / SECONDS_PER_YEAR
+        cov = np.diag(np.full(k, default_var))
+        if modelled and model["ewma_cov"].size:
+            rows = [model_index[symbol] for symbol in modelled]
+            cols = [index[symbol] for symbol in modelled]
+            cov[np.ix_(cols, cols)] = model["ewma_cov"][np.ix_(rows, rows)]
+        cov *= scenario.vol_multiplier ** 2
+
+        # Cholesky on a slightly regularized matrix (EWMA estimates can be near-singular)
+        chol = np.linalg.cholesky(cov + np.eye(k) * 1e-12)
+
+        returns = None
+        boot_cols = np.empty(0, dtype=np.int64)
+        if scenario.model == "bootstrap" and modelled and model["returns"].size:
+            # Demeaned: keep the empirical shape and co-movement, not the lookback's trend
+            rows = [model_index[symbol] for symbol in modelled]
+            history = model["returns"][:, rows]
+            returns = np.ascontiguousarray((history - history.mean(axis=0)) * scenario.vol_multiplier)
+            boot_cols = np.array([index[symbol] for symbol in modelled], dtype=np.int64)
+
+        gap = np.log1p(self._gap_returns(scenario, symbols, index, cov))
+
+        directions = np.array([1.0 if p["side"] == "BUY" else -1.0 for p in positions])
+        sizes = np.array([p["size"] for p in positions])
+        entries = np.array([p["entry_price"] or p["current_price"] for p in positions])
+        leverage = np.array([max(1.0, float(p.get("leverage") or 1.0)) for p in positions])
+
+        # Isolated-margin liquidation price: the move that consumes initial minus maintenance margin
+        liq = entries * (1.0 - directions * (1.0 / leverage - self.maintenance_margin))
+        liq = np.where(liq > 0, liq, np.nan)
+
+        def levels(key: str) -> np.ndarray:
+            return np.array([float(p.get(key) or 0.0) or np.nan for p in positions])
+
+        jump_intensity = scenario.jump_intensity if scenario.jump_intensity is not None else self.jump_intensity
+        inputs = {
+            "symbols": symbols,
+            "unmodelled": [symbol for symbol in symbols if symbol not in model_index],
+            "steps": steps,
+            "marks": marks,
+            "gap": gap,
+            "chol": chol,
+            "drift": -0.5 * np.diag(cov),
+            "boot_cols": boot_cols,
+            "pos_symbol": np.array([index[p["symbol"]] for p in positions], dtype=np.int64),
+            "qty": directions * sizes,
+            "stop": levels("stop_loss_price"),
+            "target": levels("target_price"),
+            "liq": liq,
+            "margin": float(np.sum(sizes * marks[[index[p["symbol"]] for p in positions]]) * self.maintenance_margin),
+            "jump_prob": 1.0 - math.exp(-max(0.0, jump_intensity) * model["bar_seconds"] / 86400),
+            "jump_mean": scenario.jump_mean if scenario.jump_mean is not None else self.jump_mean,
+            "jump_std": scenario.jump_std if scenario.jump_std is not None else self.jump_std
+        }
+        return inputs, returns
+
+    @staticmethod
+    def _gap_returns(
+        scenario: StressScenario,
+        symbols: List[str],
+        index: Dict[str, int],
+        cov: np.ndarray
+    ) -> np.ndarray:
+        """Instantaneous simple returns per symbol from explicit shocks or a beta-propagated driver shock"""
+        gap = np.zeros(len(symbols))
+
+        if scenario.shock_symbol and scenario.shock_pct:
+            driver = index.get(scenario.shock_symbol)
+            for symbol, i in index.items():
+                if symbol == scenario.shock_symbol:
+                    beta = 1.0
+                elif symbol in scenario.betas:
+                    beta = scenario.betas[symbol]
+                elif driver is not None and cov[driver, driver] > 0:
+                    beta = cov[i, driver] / cov[driver, driver]
+                else:
+                    beta = 1.0  # Driver not held: assume the book moves with it
+                gap[i] = beta * scenario.shock_pct
+
+        for symbol, shock in scenario.shocks.items():
+            if symbol in index:
+                gap[index[symbol]] = shock
+
+        if (gap <= -1.0).any():
+            raise ValueError("shocks must be greater than -100%")
+        return gap
+
+    # -------------------------------------------------------------------------
+    # Execution
+    # -------------------------------------------------------------------------
+
+    async def _simulate(
+        self,
+        inputs: Dict[str, Any],
+        returns: Optional[np.ndarray],
+        paths: int,
+        seed: Optional[int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        positions = inputs["qty"].shape[0]
+        chunks = max(1, min(self.workers, paths // self.min_chunk_paths))
+        seeds = np.random.SeedSequence(seed).spawn(chunks)
+
+        if chunks == 1:
+            # Small runs: a worker thread, no process or shared-memory overhead
+            pnl, min_pnl = np.empty(paths), np.empty(paths)
+            outcomes = np.empty((paths, positions), dtype=np.int8)
+            await asyncio.to_thread(simulate_paths, inputs, returns, pnl, min_pnl, outcomes, seeds[0])
+            return pnl, min_pnl, outcomes
+
+        blocks: List[SharedMemory] = []
+        shared: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+        views: Dict[str, np.ndarray] = {}
+
+        def allocate(key: str, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+            dtype = np.dtype(dtype)
+            shm = SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+            blocks.append(shm)
+            shared[key] = (shm.name, shape, dtype.str)
+            views[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            return views[key]
+
+        try:
+            if returns is not None:
+                allocate("returns", returns.shape, returns.dtype)[:] = returns
+            allocate("pnl", (paths,), np.float64)
+            allocate("min_pnl", (paths,), np.float64)
+            allocate("outcomes", (paths, positions), np.int8)
+
+            # Pickle only the small per-symbol/per-position inputs
+            kernel_inputs = {key: value for key, value in inputs.items() if key not in ("symbols", "unmodelled")}
+            bounds = np.linspace(0, paths, chunks + 1).astype(int)
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            await asyncio.gather(*(
+                loop.run_in_executor(
+                    executor, _simulate_chunk, kernel_inputs, shared,
+                    int(bounds[i]), int(bounds[i + 1] - bounds[i]), seeds[i]
+                )
+                for i in range(chunks)
+            ))
+
+            return views["pnl"].copy(), views["min_pnl"].copy(), views["outcomes"].copy()
+
+        finally:
+            views.clear()
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    # -------------------------------------------------------------------------
+    # Report
+    # -------------------------------------------------------------------------
+
+    def _summarize(
+        self,
+        inputs: Dict[str, Any],
+        positions: List[Dict[str, Any]],
+        pnl: np.ndarray,
+        min_pnl: np.ndarray,
+        outcomes: np.ndarray,
+        portfolio_value: float
+    ) -> Dict[str, Any]:
+        # Imported here so spawned workers do not load the exchange connector stack
+        from app.services.risk_analytics import historical_var_cvar
+
+        percentiles = (1, 5, 25, 50, 75, 95, 99)
+        values = np.percentile(pnl, percentiles)
+        tail = {}
+        for confidence in settings.RISK_VAR_CONFIDENCE_LEVELS:
+            var, cvar = historical_var_cvar(pnl, confidence)
+            tail[str(confidence)] = {"var": round(var, 2), "cvar": round(cvar, 2)}
+
+        # Account liquidation: equity touches the maintenance margin of the book at any bar
+        account_liquidated = portfolio_value + min_pnl <= inputs["margin"]
+
+        per_position = []
+        for i, p in enumerate(positions):
+            column = outcomes[:, i]
+            per_position.append({
+                "trade_id": str(p["trade_id"]),
+                "symbol": p["symbol"],
+                "side": p["side"],
+                "size": p["size"],
+                "current_price": p["current_price"],
+                "stop_loss_price": p.get("stop_loss_price"),
+                "target_price": p.get("target_price"),
+                "liquidation_price": None if np.isnan(inputs["liq"][i]) else round(float(inputs["liq"][i]), 8),
+                "stop_hit_probability": float(np.mean(column == OUTCOME_STOP)),
+                "target_hit_probability": float(np.mean(column == OUTCOME_TARGET)),
+                "liquidation_probability": float(np.mean(column == OUTCOME_LIQUIDATED))
+            })
+
+        def pct(value: float) -> Optional[float]:
+            return round(value / portfolio_value, 6) if portfolio_value > 0 else None
+
+        return {
+            "portfolio_value": portfolio_value,
+            "pnl": {
+                "mean": round(float(pnl.mean()), 2),
+                "std": round(float(pnl.std()), 2),
+                "min": round(float(pnl.min()), 2),
+                "max": round(float(pnl.max()), 2),
+                "mean_pct": pct(float(pnl.mean())),
+                "probability_of_loss": float(np.mean(pnl < 0)),
+                "percentiles": {str(q): round(float(v), 2) for q, v in zip(percentiles, values)},
+                "tail": tail
+            },
+            "worst_interim_pnl": {
+                "median": round(float(np.median(min_pnl)), 2),
+                "p1": round(float(np.percentile(min_pnl, 1)), 2)
+            },
+            "liquidation": {
+                "account_probability": float(np.mean(account_liquidated)),
+                "maintenance_margin": round(inputs["margin"], 2),
+                "any_position_probability": float(np.mean((outcomes == OUTCOME_LIQUIDATED).any(axis=1)))
+            },
+            "positions": per_position
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get stress tester statistics"""
+        return {
+            "workers": self.workers,
+            "pool_running": self._executor is not None,
+            "runs": self.runs,
+            "paths_simulated": self.paths_simulated,
+            "last_elapsed_seconds": self.last_elapsed_seconds
+        }
+
+
+# Global stress tester instance
+stress_tester = StressTester()
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m app.services.stress_testing [paths]
+    import sys
+
+    async def _benchmark(paths: int):
+        positions = [
+            {"trade_id": "btc-long", "symbol": "BTCUSDT", "side": "BUY", "size": 0.5, "entry_price": 60000.0,
+             "current_price": 61000.0, "stop_loss_price": 57000.0, "target_price": 66000.0, "leverage": 5},
+            {"trade_id": "eth-long", "symbol": "ETHUSDT", "side": "BUY", "size": 8.0, "entry_price": 3000.0,
+             "current_price": 3050.0, "stop_loss_price": 2800.0, "target_price": 3400.0, "leverage": 3},
+            {"trade_id": "eth-short", "symbol": "ETHUSDT", "side": "SELL", "size": 2.0, "entry_price": 3100.0,
+             "current_price": 3050.0, "stop_loss_price": 3250.0, "target_price": None, "leverage": 10},
+        ]
+        rng = np.random.default_rng(7)
+        vol = 0.7 / math.sqrt(SECONDS_PER_YEAR / 300)
+        returns = rng.multivariate_normal([0, 0], [[vol ** 2, 0.8 * vol * vol * 1.2], [0.8 * vol * vol * 1.2, (1.2 * vol) ** 2]], 1000)
+        model = {"symbols": ("BTCUSDT", "ETHUSDT"), "bar_seconds": 300, "returns": returns,
+                 "ewma_cov": np.cov(returns, rowvar=False)}
+        scenario = StressScenario(paths=paths, shock_symbol="BTCUSDT", shock_pct=-0.15, betas={"ETHUSDT": 1.3}, seed=1)
+
+        tester = StressTester()
+        try:
+            for model_name in SIMULATION_MODELS:
+                scenario.model = model_name
+                report = await tester.run(scenario, positions, model, portfolio_value=100000.0)
+                print(f"{model_name}: {report['paths']} paths in {report['elapsed_seconds']}s "
+                      f"(workers={tester.workers}) pnl p1={report['pnl']['percentiles']['1']} "
+                      f"p50={report['pnl']['percentiles']['50']} "
+                      f"stop_hit={[p['stop_hit_probability'] for p in report['positions']]} "
+                      f"liq={report['liquidation']}")
+        finally:
+            tester.shutdown()
+
+    asyncio.run(_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
@@ -11,20 +11,23 @@ Handles automated trade execution, order management, and position lifecycle:
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import time
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
-from decimal import Decimal
 import uuid
 
-from app.services.exchanges.delta_exchange import DeltaExchangeConnector
+from app.services.exchanges.connector_pool import get_delta_connector
 from app.services.risk_manager import RiskManager
-from app.database import get_db
+from app.services.trade_lifecycle import TrackedOrder, TradeLifecycleEngine
+from app.services.order_state import InvalidTransition, OrderState, TradeState, get_order_state_store
+from app.services.execution_queue import ExecutionPriority, ExecutionQueue, ExecutionRejected
+from app.services.metrics_service import metrics_service
 from app.config import Settings
-from app.models.trade import Trade, TradeStatus, TradeType
-from app.models.order import Order, OrderStatus, OrderType
+from app.models.trade import TradeStatus, TradeType
+from app.models.order import OrderStatus, OrderType
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 logger = logging.getLogger(__name__)
 
@@ -51,18 +54,29 @@ class TradeExecutionEngine:
         # Determine paper trading mode
         self.paper_trading = paper_trading if paper_trading is not None else True  # Default to paper trading for safety
         
-        # Initialize Delta Exchange connector with environment awareness
-        self.delta_connector = DeltaExchangeConnector(paper_trading=self.paper_trading)
+        # Shared Delta Exchange connector for this environment
+        self.delta_connector = get_delta_connector(paper_trading=self.paper_trading)
         
         # Initialize Risk Manager for risk gate checks
         self.risk_manager = RiskManager(paper_trading=self.paper_trading)
         
         self.active_orders = {}
-        self.order_monitoring_tasks = {}
+        
+        # Exit orders of open trades, closed out from order events by one task
+        self.lifecycle = TradeLifecycleEngine(
+            self.delta_connector, on_exit_filled=self._on_exit_filled, on_exit_lost=self._on_exit_lost
+        )
+        
+        # Authoritative trade/order state (journaled, written behind to the database)
+        self.order_state = get_order_state_store(self.paper_trading)
+        
+        # Entries, exits and stop adjustments are run by a prioritized worker pool
+        self.execution_queue = ExecutionQueue(environment="testnet" if self.paper_trading else "live")
         
         # Configuration
         self.max_slippage = 0.005  # 0.5% max slippage
         self.order_timeout = 300   # 5 minutes order timeout
+        self.order_reconcile_interval = self.settings.DELTA_ORDER_RECONCILE_INTERVAL  # REST check when no stream event arrives
         self.retry_attempts = 3    # Max retry attempts
         
         logger.info("Trade Execution Engine initialized")
@@ -83,6 +97,9 @@ class TradeExecutionEngine:
             # Initialize Risk Manager (now non-blocking)
             await self.risk_manager.initialize()
             
+            # Replay unwritten state changes from the journal before anything else touches it
+            self.order_state.ensure_started()
+            
             # Try to load existing orders, but don't block startup if it fails
             try:
                 await self._load_existing_orders()
@@ -99,9 +116,12 @@ class TradeExecutionEngine:
     async def cleanup(self):
         """Cleanup the trade execution engine"""
         try:
-            # Cancel monitoring tasks
-            for task in self.order_monitoring_tasks.values():
-                task.cancel()
+            # Refuse queued requests and let running ones finish
+            await self.execution_queue.stop()
+            
+            # Stop exit order tracking, then write out pending state changes
+            await self.lifecycle.stop()
+            await self.order_state.stop()
             
             # Cleanup Delta connector
             await self.delta_connector.cleanup()
@@ -141,6 +161,28 @@ class TradeExecutionEngine:
         Returns:
             Dict with execution results
         """
+        return await self._submit(
+            ExecutionPriority.ENTRY,
+            symbol,
+            f"{side.upper()} {size} {symbol}",
+            partial(
+                self._execute_trade,
+                symbol, side, size, entry_price, stop_loss, take_profit, reasoning, order_type
+            )
+        )
+    
+    async def _execute_trade(
+        self,
+        symbol: str,
+        side: str,
+        size: float,
+        entry_price: Optional[float],
+        stop_loss: Optional[float],
+        take_profit: Optional[float],
+        reasoning: str,
+        order_type: str
+    ) -> Dict[str, Any]:
+        """Execute a trade (run by an execution queue worker)"""
         try:
             logger.info(f"🎯 Executing trade: {side} {size} {symbol}")
             
@@ -157,34 +199,57 @@ class TradeExecutionEngine:
             
             # Create trade record
             trade_id = str(uuid.uuid4())
-            trade_record = await self._create_trade_record(
+            trade_record = self._create_trade_record(
                 trade_id, symbol, side, size, entry_price, stop_loss, take_profit, reasoning
             )
             
-            # Execute main order
+            # Execute main order (its risk approval covers the bracket exits below)
             main_order_result = await self._execute_main_order(
-                trade_id, symbol, side, size, entry_price, order_type
+                trade_id, symbol, side, size, entry_price, order_type, bracket_parent=True
             )
             
             if not main_order_result["success"]:
-                await self._update_trade_status(trade_id, TradeStatus.FAILED)
+                self.risk_manager.release_parent_approval(trade_id)
+                if main_order_result.get("risk_denied"):
+                    trade_status = TradeStatus.REJECTED
+                else:
+                    trade_status = {
+                        "CANCELLED": TradeStatus.CANCELLED,
+                        "REJECTED": TradeStatus.REJECTED
+                    }.get(main_order_result.get("order_status"), TradeStatus.FAILED)
+                self._update_trade_status(trade_id, trade_status)
                 return {
                     "success": False,
                     "error": f"Main order execution failed: {main_order_result['error']}"
                 }
             
-            # Set up stop loss and take profit orders
-            if stop_loss:
-                await self._setup_stop_loss_order(trade_id, symbol, side, size, stop_loss)
+            filled_at = time.perf_counter()
+            fill_size = float(main_order_result["fill_size"])
             
-            if take_profit:
-                await self._setup_take_profit_order(trade_id, symbol, side, size, take_profit)
+            # Entry filled (in full, or in part before it was cancelled): the position is open
+            self._update_trade_status(
+                trade_id,
+                TradeStatus.PARTIALLY_FILLED if main_order_result["partial"] else TradeStatus.FILLED,
+                filled_quantity=fill_size,
+                average_fill_price=main_order_result.get("fill_price")
+            )
+            
+            # Apply the fill to the shared risk state before protective legs are gated
+            self.risk_manager.risk_state.record_position_opened(
+                symbol,
+                side,
+                fill_size,
+                float(main_order_result.get("fill_price") or entry_price or 0)
+            )
+            self.risk_manager.resize_parent_approval(trade_id, fill_size)
             
-            # Start monitoring the trade
+            # Start monitoring the trade (before its exits go out, so no event is missed)
             await self._start_trade_monitoring(trade_id)
             
-            # Update trade status
-            await self._update_trade_status(trade_id, TradeStatus.OPEN)
+            # Set up stop loss and take profit orders together, sized to the position actually opened
+            protection = await self._setup_bracket_orders(
+                trade_id, symbol, side, fill_size, stop_loss, take_profit, filled_at
+            )
             
             result = {
                 "success": True,
@@ -192,10 +257,13 @@ class TradeExecutionEngine:
                 "symbol": symbol,
                 "side": side,
                 "size": size,
+                "filled_size": fill_size,
                 "entry_price": main_order_result.get("fill_price", entry_price),
                 "stop_loss": stop_loss,
                 "take_profit": take_profit,
                 "order_id": main_order_result["order_id"],
+                "protection": protection["outcome"],
+                "time_to_protected_ms": protection["time_to_protected_ms"],
                 "timestamp": datetime.utcnow()
             }
             
@@ -226,6 +294,21 @@ class TradeExecutionEngine:
         Returns:
             Dict with closure results
         """
+        priority = ExecutionPriority.EMERGENCY_EXIT if exit_type == "EMERGENCY" else ExecutionPriority.EXIT
+        return await self._submit_for_trade(
+            priority,
+            trade_id,
+            f"close {trade_id} ({exit_type})",
+            partial(self._close_position, trade_id, exit_type, exit_price)
+        )
+    
+    async def _close_position(
+        self,
+        trade_id: str,
+        exit_type: str,
+        exit_price: Optional[float]
+    ) -> Dict[str, Any]:
+        """Close an existing position (run by an execution queue worker)"""
         try:
             logger.info(f"🚪 Closing position: {trade_id} ({exit_type})")
             
@@ -233,46 +316,57 @@ class TradeExecutionEngine:
             trade = await self._get_trade_record(trade_id)
             if not trade:
                 return {"success": False, "error": "Trade not found"}
+            if trade.status not in (TradeStatus.FILLED, TradeStatus.PARTIALLY_FILLED):
+                # Already closed (e.g. by its stop loss or take profit) or never opened
+                return {"success": False, "error": f"Trade is not open ({trade.status.value})"}
             
             # Cancel existing stop loss and take profit orders
             await self._cancel_related_orders(trade_id)
             
             # Determine exit side (opposite of entry)
             exit_side = "SELL" if trade.trade_type == TradeType.BUY else "BUY"
+            position_size = float(trade.filled_quantity or trade.quantity)
             
-            # Execute exit order
+            # Execute exit order (reduce-only: it can never open a reverse position)
             exit_order_result = await self._execute_main_order(
                 trade_id,
                 trade.symbol,
                 exit_side,
-                float(trade.size),
+                position_size,
                 exit_price,
-                "MARKET" if exit_price is None else "LIMIT"
+                "MARKET" if exit_price is None else "LIMIT",
+                reduce_only=True
             )
             
             if not exit_order_result["success"]:
+                # Nothing closed: the position must not stay without its stop loss and take profit
+                await self._replace_protection(trade, position_size)
                 return {
                     "success": False,
                     "error": f"Exit order failed: {exit_order_result['error']}"
                 }
             
-            # Calculate realized PnL
-            realized_pnl = await self._calculate_realized_pnl(
-                trade,
-                exit_order_result.get("fill_price", exit_price)
-            )
+            if exit_order_result["partial"]:
+                # Part of the position is still open: book what closed and protect the rest again
+                closed_size = float(exit_order_result["fill_size"])
+                realized_pnl = await self._book_partial_exit(
+                    trade, closed_size, exit_order_result.get("fill_price") or exit_price
+                )
+                await self._replace_protection(trade, position_size - closed_size)
+                return {
+                    "success": False,
+                    "error": f"Exit order closed {closed_size} of {position_size}",
+                    "trade_id": trade_id,
+                    "closed_size": closed_size,
+                    "remaining_size": position_size - closed_size,
+                    "realized_pnl": realized_pnl,
+                    "exit_type": exit_type
+                }
             
-            # Update trade record
-            await self._update_trade_closure(
-                trade_id,
-                exit_order_result.get("fill_price", exit_price),
-                realized_pnl,
-                exit_type
+            realized_pnl = await self._finalize_trade_closure(
+                trade, exit_order_result.get("fill_price", exit_price), exit_type, exit_order_result["order_id"]
             )
             
-            # Stop monitoring
-            await self._stop_trade_monitoring(trade_id)
-            
             result = {
                 "success": True,
                 "trade_id": trade_id,
@@ -292,6 +386,114 @@ class TradeExecutionEngine:
                 "error": str(e)
             }
     
+    async def _finalize_trade_closure(
+        self,
+        trade: TradeState,
+        exit_price: float,
+        exit_type: str,
+        exit_order_id: Optional[str] = None
+    ) -> float:
+        """Book a trade's exit: record closure, release risk state and stop tracking; returns the trade's realized PnL"""
+        trade_id = trade.trade_id
+        position_size = float(trade.filled_quantity or trade.quantity)
+        
+        # Calculate realized PnL of the remaining position; earlier partial exits are already booked
+        exit_pnl = await self._calculate_realized_pnl(trade, exit_price)
+        realized_pnl = float(trade.realized_pnl or 0) + exit_pnl
+        
+        # Update trade record; exposure and P&L are booked only by the exit that closes it
+        if self._update_trade_closure(trade_id, exit_price, realized_pnl, exit_type, exit_order_id):
+            self.risk_manager.risk_state.record_position_closed(
+                trade.symbol,
+                trade.trade_type.value,
+                position_size,
+                exit_pnl,
+                trade_pnl=realized_pnl
+            )
+        
+        # Stop monitoring
+        await self._stop_trade_monitoring(trade_id)
+        self.risk_manager.release_parent_approval(trade_id)
+        
+        return realized_pnl
+    
+    async def _book_partial_exit(self, trade: TradeState, closed_size: float, exit_price: Optional[float]) -> float:
+        """Book part of a position closed by an exit; returns that part's PnL (zero without a fill price)"""
+        exit_price = exit_price or float(trade.average_fill_price or trade.entry_price or 0)
+        exit_pnl = await self._calculate_realized_pnl(trade, exit_price, closed_size)
+        remaining = float(trade.filled_quantity or trade.quantity) - closed_size
+        try:
+            self.order_state.update_trade(
+                trade.trade_id,
+                quantity=remaining,
+                filled_quantity=remaining,
+                realized_pnl=float(trade.realized_pnl or 0) + exit_pnl
+            )
+        except KeyError as e:
+            logger.error(f"Error booking partial exit: {e}")
+        self.risk_manager.risk_state.record_position_reduced(
+            trade.symbol, trade.trade_type.value, closed_size, exit_pnl
+        )
+        logger.info(f"📉 Trade {trade.trade_id}: closed {closed_size}, {remaining} still open, PnL {exit_pnl:.2f}")
+        return exit_pnl
+    
+    async def _replace_protection(self, trade: TradeState, size: float):
+        """Replace a trade's stop loss and take profit with orders for its current size"""
+        if trade.stop_loss_price:
+            await self._cancel_stop_loss_order(trade.trade_id)
+            await self._setup_stop_loss_order(
+                trade.trade_id, trade.symbol, trade.trade_type.value, size, float(trade.stop_loss_price)
+            )
+        
+        if trade.target_price:
+            await self._cancel_take_profit_order(trade.trade_id)
+            await self._setup_take_profit_order(
+                trade.trade_id, trade.symbol, trade.trade_type.value, size, float(trade.target_price)
+            )
+    
+    async def _on_exit_filled(self, order: TrackedOrder, order_status: Dict[str, Any]):
+        """Lifecycle callback: a stop loss or take profit filled, so the position is already flat"""
+        trade = await self._get_trade_record(order.trade_id)
+        if not trade:
+            logger.error(f"Trade {order.trade_id} not found for filled {order.order_type} {order.order_id}")
+            return
+        
+        # Without a reported fill price, book at the order's trigger/limit price
+        exit_price = order_status.get("fill_price") or float(
+            trade.stop_loss_price if order.order_type == "STOP_LOSS" else trade.target_price
+        )
+        self._update_order_status(
+            order.order_id,
+            OrderStatus.FILLED,
+            filled_quantity=order_status.get("fill_size"),
+            average_fill_price=exit_price
+        )
+        
+        # Close the trade in turn with queued closes on its symbol
+        await self._submit(
+            ExecutionPriority.EXIT,
+            trade.symbol,
+            f"{order.order_type.lower()} fill {order.trade_id}",
+            partial(self._close_on_exit_fill, trade, order, exit_price)
+        )
+    
+    async def _close_on_exit_fill(self, trade: TradeState, order: TrackedOrder, exit_price: float) -> Dict[str, Any]:
+        """Book a trade closed by its stop loss or take profit (run by an execution queue worker)"""
+        if trade.is_terminal:
+            logger.info(f"Trade {order.trade_id} already {trade.status.value}; {order.order_type} fill not booked again")
+            return {"success": False, "error": f"Trade already {trade.status.value}"}
+        
+        # Cancel the other leg of the bracket
+        await self._cancel_related_orders(order.trade_id)
+        
+        realized_pnl = await self._finalize_trade_closure(trade, exit_price, order.order_type, order.order_id)
+        logger.info(f"✅ Position closed by {order.order_type}: {order.trade_id}, PnL: {realized_pnl:.2f}")
+        return {"success": True, "trade_id": order.trade_id, "realized_pnl": realized_pnl}
+    
+    def _on_exit_lost(self, order: TrackedOrder):
+        """Lifecycle callback: the exchange cancelled or rejected a stop loss or take profit"""
+        self._update_order_status(order.order_id, OrderStatus(order.status))
+    
     async def emergency_close_position(self, trade_id: str) -> Dict[str, Any]:
         """Emergency close position with market orders"""
         logger.critical(f"🚨 Emergency closing position: {trade_id}")
@@ -304,6 +506,15 @@ class TradeExecutionEngine:
     
     async def update_stop_loss(self, trade_id: str, new_stop_loss: float) -> Dict[str, Any]:
         """Update stop loss for an existing position"""
+        return await self._submit_for_trade(
+            ExecutionPriority.STOP_ADJUST,
+            trade_id,
+            f"stop loss {trade_id} -> {new_stop_loss}",
+            partial(self._update_stop_loss, trade_id, new_stop_loss)
+        )
+    
+    async def _update_stop_loss(self, trade_id: str, new_stop_loss: float) -> Dict[str, Any]:
+        """Replace a position's stop loss order (run by an execution queue worker)"""
         try:
             logger.info(f"🛡️ Updating stop loss for {trade_id}: {new_stop_loss}")
             
@@ -320,12 +531,12 @@ class TradeExecutionEngine:
                 trade_id,
                 trade.symbol,
                 trade.trade_type.value,
-                float(trade.size),
+                float(trade.filled_quantity or trade.quantity),
                 new_stop_loss
             )
             
             # Update trade record
-            await self._update_trade_stop_loss(trade_id, new_stop_loss)
+            self._update_trade_stop_loss(trade_id, new_stop_loss)
             
             return {
                 "success": True,
@@ -339,6 +550,15 @@ class TradeExecutionEngine:
     
     async def reduce_position_size(self, trade_id: str, new_size: float) -> Dict[str, Any]:
         """Reduce position size by partially closing"""
+        return await self._submit_for_trade(
+            ExecutionPriority.EXIT,
+            trade_id,
+            f"reduce {trade_id} -> {new_size}",
+            partial(self._reduce_position_size, trade_id, new_size)
+        )
+    
+    async def _reduce_position_size(self, trade_id: str, new_size: float) -> Dict[str, Any]:
+        """Partially close a position (run by an execution queue worker)"""
         try:
             logger.info(f"📉 Reducing position size for {trade_id}: {new_size}")
             
@@ -347,7 +567,10 @@ class TradeExecutionEngine:
             if not trade:
                 return {"success": False, "error": "Trade not found"}
             
-            current_size = float(trade.size)
+            if trade.status not in (TradeStatus.FILLED, TradeStatus.PARTIALLY_FILLED):
+                return {"success": False, "error": f"Trade is not open ({trade.status.value})"}
+            
+            current_size = float(trade.filled_quantity or trade.quantity)
             if new_size >= current_size:
                 return {"success": False, "error": "New size must be smaller than current size"}
             
@@ -363,7 +586,8 @@ class TradeExecutionEngine:
                 exit_side,
                 size_to_close,
                 None,  # Market order
-                "MARKET"
+                "MARKET",
+                reduce_only=True
             )
             
             if not partial_close_result["success"]:
@@ -372,34 +596,75 @@ class TradeExecutionEngine:
                     "error": f"Partial close failed: {partial_close_result['error']}"
                 }
             
-            # Update trade size
-            await self._update_trade_size(trade_id, new_size)
-            
-            # Update stop loss and take profit orders for new size
-            if trade.stop_loss:
-                await self._cancel_stop_loss_order(trade_id)
-                await self._setup_stop_loss_order(
-                    trade_id, trade.symbol, trade.trade_type.value, new_size, float(trade.stop_loss)
-                )
+            # Book what actually closed (less than requested if the order was cancelled part-filled)
+            closed_size = float(partial_close_result["fill_size"])
+            realized_pnl = await self._book_partial_exit(trade, closed_size, partial_close_result.get("fill_price"))
+            remaining_size = current_size - closed_size
             
-            if trade.take_profit:
-                await self._cancel_take_profit_order(trade_id)
-                await self._setup_take_profit_order(
-                    trade_id, trade.symbol, trade.trade_type.value, new_size, float(trade.take_profit)
-                )
+            # Update stop loss and take profit orders for the remaining size
+            await self._replace_protection(trade, remaining_size)
             
-            return {
-                "success": True,
+            result = {
+                "success": not partial_close_result["partial"],
                 "trade_id": trade_id,
                 "old_size": current_size,
-                "new_size": new_size,
-                "closed_size": size_to_close
+                "new_size": remaining_size,
+                "closed_size": closed_size,
+                "realized_pnl": realized_pnl
             }
+            if partial_close_result["partial"]:
+                result["error"] = f"Reduce order closed {closed_size} of {size_to_close}"
+            return result
             
         except Exception as e:
             logger.error(f"Error reducing position size for {trade_id}: {e}")
             return {"success": False, "error": str(e)}
     
+    async def _submit(
+        self,
+        priority: ExecutionPriority,
+        symbol: str,
+        description: str,
+        operation: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run an operation through the execution queue"""
+        try:
+            return await self.execution_queue.submit(priority, symbol, operation, description)
+        except ExecutionRejected as e:
+            logger.warning(f"⏳ Not executed ({description}): {e}")
+            return {"success": False, "error": str(e), "queue_rejected": True}
+    
+    async def _submit_for_trade(
+        self,
+        priority: ExecutionPriority,
+        trade_id: str,
+        description: str,
+        operation: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run an operation on an existing trade through the execution queue (serialized on its symbol)"""
+        trade = await self._get_trade_record(trade_id)
+        if not trade:
+            return {"success": False, "error": "Trade not found"}
+        return await self._submit(priority, trade.symbol, description, operation)
+    
+    async def get_execution_status(self) -> Dict[str, Any]:
+        """Get execution queue, exit tracking and order state status"""
+        return {
+            "paper_trading": self.paper_trading,
+            "queue": self.execution_queue.get_statistics(),
+            "lifecycle": self.lifecycle.get_statistics(),
+            "order_state": self.order_state.get_statistics(),
+            "timestamp": datetime.utcnow()
+        }
+    
+    async def get_execution_queue(self) -> Dict[str, Any]:
+        """Get queued and running execution requests in service order"""
+        return {
+            **self.execution_queue.get_queue(),
+            "depth": self.execution_queue.depth,
+            "timestamp": datetime.utcnow()
+        }
+    
     async def _validate_trade_parameters(
         self,
         symbol: str,
@@ -466,18 +731,33 @@ class TradeExecutionEngine:
         side: str,
         size: float,
         price: Optional[float],
-        order_type: str
+        order_type: str,
+        bracket_parent: bool = False,
+        reduce_only: bool = False
     ) -> Dict[str, Any]:
-        """Execute the main entry or exit order"""
+        """Execute the main entry or exit order (an approved entry is the parent of its SL/TP)"""
         try:
-            # 🛡️ CRITICAL RISK GATE: Check all risk criteria before order placement
-            risk_allowed, risk_reason = await self.risk_manager.check_order_risk_gate(
-                symbol=symbol,
-                side=side,
-                size=size,
-                price=price,
-                order_type=order_type
-            )
+            if reduce_only:
+                # 🛡️ RISK GATE: A closing exit only has to reduce risk; loss limits must never block it
+                risk_allowed, risk_reason = await self.risk_manager.check_bracket_order(
+                    parent_trade_id=trade_id,
+                    symbol=symbol,
+                    side=side,
+                    size=size,
+                    price=price,
+                    order_type=order_type,
+                    kind="exit"
+                )
+            else:
+                # 🛡️ CRITICAL RISK GATE: Check all risk criteria before order placement
+                risk_allowed, risk_reason = await self.risk_manager.check_order_risk_gate(
+                    symbol=symbol,
+                    side=side,
+                    size=size,
+                    price=price,
+                    order_type=order_type,
+                    parent_trade_id=trade_id if bracket_parent else None
+                )
             
             if not risk_allowed:
                 logger.warning(f"🚫 ORDER BLOCKED BY RISK GATE: {risk_reason}")
@@ -490,38 +770,78 @@ class TradeExecutionEngine:
             # Prepare order parameters
             order_params = {
                 "symbol": symbol,
-                "side": side.upper(),
+                "side": side.lower(),
                 "size": size,
-                "type": order_type.upper()
+                "order_type": order_type.lower(),
+                "reduce_only": reduce_only
             }
             
             if order_type.upper() == "LIMIT" and price:
                 order_params["price"] = price
             
+            # Record the order before it goes out (in memory and journaled, no database round trip)
+            order = self._create_order_record(trade_id, symbol, side, size, price, order_type, reduce_only)
+            
+            # Fills are pushed over the private stream; start it before the order goes out
+            self.delta_connector.start_private_stream()
+            
             # Execute order on Delta Exchange (only after risk gate approval)
-            order_result = await self.delta_connector.place_order(**order_params)
+            order_result = await self._place_exchange_order(**order_params)
             
             if not order_result["success"]:
+                self._update_order_status(
+                    order.order_id, OrderStatus.FAILED, exchange_error_message=str(order_result["error"])
+                )
                 return {
                     "success": False,
                     "error": order_result["error"]
                 }
             
             order_id = order_result["order_id"]
-            
-            # Create order record
-            await self._create_order_record(
-                order_id, trade_id, symbol, side, size, price, order_type
-            )
+            self._update_order_status(order.order_id, OrderStatus.SUBMITTED, exchange_order_id=str(order_id))
+            if bracket_parent:
+                self._update_trade_status(trade_id, TradeStatus.SUBMITTED, exchange_order_id=str(order_id))
             
             # Monitor order execution
             fill_result = await self._monitor_order_execution(order_id)
+            if not fill_result["filled"] and not fill_result.get("status"):
+                # Timed out (or lost track): pull the order, then take its final state
+                fill_result = await self._cancel_unfilled_order(order_id)
+            
+            status = "FILLED" if fill_result["filled"] else fill_result["status"]
+            fill_size = float(fill_result.get("fill_size") or 0) or (size if status == "FILLED" else 0.0)
+            
+            if fill_size <= 0:
+                if status in ("CANCELLED", "REJECTED"):
+                    self._update_order_status(order.order_id, OrderStatus(status))
+                else:
+                    logger.error(f"🚨 Order {order_id} still {status} after its cancel request")
+                return {
+                    "success": False,
+                    "error": f"Order not filled: {fill_result.get('error')}",
+                    "order_id": order_id,
+                    "order_status": status
+                }
+            
+            # Filled in full, or in part before it was cancelled: either way the fill is a position
+            partial_fill = status != "FILLED"
+            if partial_fill:
+                logger.warning(f"⚠️ Order {order_id} {status.lower()} after filling {fill_size} of {size}")
+                if status == "PARTIALLY_FILLED":
+                    logger.error(f"🚨 Order {order_id} still live after its cancel request; later fills are not booked")
+            self._update_order_status(
+                order.order_id,
+                OrderStatus(status),
+                filled_quantity=fill_size,
+                average_fill_price=fill_result.get("fill_price")
+            )
             
             return {
                 "success": True,
                 "order_id": order_id,
                 "fill_price": fill_result.get("fill_price"),
-                "fill_size": fill_result.get("fill_size", size)
+                "fill_size": fill_size,
+                "partial": partial_fill
             }
             
         except Exception as e:
@@ -531,6 +851,42 @@ class TradeExecutionEngine:
                 "error": str(e)
             }
     
+    async def _setup_bracket_orders(
+        self,
+        trade_id: str,
+        symbol: str,
+        side: str,
+        size: float,
+        stop_loss: Optional[float],
+        take_profit: Optional[float],
+        filled_at: float
+    ) -> Dict[str, Any]:
+        """Place the stop loss and take profit of a filled entry concurrently and record time-to-protected"""
+        legs = {}
+        if stop_loss:
+            legs["stop_loss"] = self._setup_stop_loss_order(trade_id, symbol, side, size, stop_loss)
+        if take_profit:
+            legs["take_profit"] = self._setup_take_profit_order(trade_id, symbol, side, size, take_profit)
+        if not legs:
+            return {"outcome": "none", "orders": {}, "time_to_protected_ms": None}
+        
+        order_ids = dict(zip(legs, await asyncio.gather(*legs.values())))
+        elapsed = time.perf_counter() - filled_at
+        
+        placed = [leg for leg, order_id in order_ids.items() if order_id]
+        outcome = "protected" if len(placed) == len(legs) else "partial" if placed else "unprotected"
+        metrics_service.record_time_to_protected(symbol, outcome, elapsed)
+        
+        if outcome == "protected":
+            logger.info(f"🛡️ Trade {trade_id} protected in {elapsed * 1000:.1f}ms ({', '.join(placed)})")
+        else:
+            logger.error(
+                f"🚨 Trade {trade_id} {outcome} after {elapsed * 1000:.1f}ms: "
+                f"missing {', '.join(leg for leg in legs if leg not in placed)}"
+            )
+        
+        return {"outcome": outcome, "orders": order_ids, "time_to_protected_ms": round(elapsed * 1000, 3)}
+    
     async def _setup_stop_loss_order(
         self,
         trade_id: str,
@@ -538,14 +894,15 @@ class TradeExecutionEngine:
         side: str,
         size: float,
         stop_loss_price: float
-    ):
-        """Set up stop loss order for a position"""
+    ) -> Optional[str]:
+        """Set up stop loss order for a position; returns its order ID"""
         try:
             # Determine stop loss side (opposite of main position)
             stop_side = "SELL" if side.upper() == "BUY" else "BUY"
             
-            # 🛡️ RISK GATE: Check risk criteria for stop loss order
-            risk_allowed, risk_reason = await self.risk_manager.check_order_risk_gate(
+            # 🛡️ RISK GATE: Reduce-only exit, verified against the parent trade's approval
+            risk_allowed, risk_reason = await self.risk_manager.check_bracket_order(
+                parent_trade_id=trade_id,
                 symbol=symbol,
                 side=stop_side,
                 size=size,
@@ -555,35 +912,38 @@ class TradeExecutionEngine:
             
             if not risk_allowed:
                 logger.warning(f"🚫 STOP LOSS BLOCKED BY RISK GATE: {risk_reason}")
-                return
+                return None
+            
+            order = self._create_order_record(trade_id, symbol, stop_side, size, stop_loss_price, "STOP_LOSS")
             
             # Create stop loss order
-            stop_order_result = await self.delta_connector.place_stop_order(
+            stop_order_result = await self._place_exchange_order(
                 symbol=symbol,
-                side=stop_side,
+                side=stop_side.lower(),
                 size=size,
+                order_type="stop_market",
                 stop_price=stop_loss_price,
-                order_type="STOP_MARKET"
+                reduce_only=True
             )
             
             if stop_order_result["success"]:
-                # Record stop loss order
-                await self._create_order_record(
-                    stop_order_result["order_id"],
-                    trade_id,
-                    symbol,
-                    stop_side,
-                    size,
-                    stop_loss_price,
-                    "STOP_LOSS"
+                self.lifecycle.track_order(trade_id, stop_order_result["order_id"], symbol, "STOP_LOSS")
+                self._update_order_status(
+                    order.order_id, OrderStatus.SUBMITTED, exchange_order_id=str(stop_order_result["order_id"])
                 )
                 
                 logger.info(f"✅ Stop loss set: {stop_loss_price} for trade {trade_id}")
-            else:
-                logger.error(f"Failed to set stop loss: {stop_order_result['error']}")
+                return stop_order_result["order_id"]
+            
+            self._update_order_status(
+                order.order_id, OrderStatus.FAILED, exchange_error_message=str(stop_order_result["error"])
+            )
+            logger.error(f"Failed to set stop loss: {stop_order_result['error']}")
+            return None
                 
         except Exception as e:
             logger.error(f"Error setting up stop loss: {e}")
+            return None
     
     async def _setup_take_profit_order(
         self,
@@ -592,14 +952,15 @@ class TradeExecutionEngine:
         side: str,
         size: float,
         take_profit_price: float
-    ):
-        """Set up take profit order for a position"""
+    ) -> Optional[str]:
+        """Set up take profit order for a position; returns its order ID"""
         try:
             # Determine take profit side (opposite of main position)
             tp_side = "SELL" if side.upper() == "BUY" else "BUY"
             
-            # 🛡️ RISK GATE: Check risk criteria for take profit order
-            risk_allowed, risk_reason = await self.risk_manager.check_order_risk_gate(
+            # 🛡️ RISK GATE: Reduce-only exit, verified against the parent trade's approval
+            risk_allowed, risk_reason = await self.risk_manager.check_bracket_order(
+                parent_trade_id=trade_id,
                 symbol=symbol,
                 side=tp_side,
                 size=size,
@@ -609,45 +970,90 @@ class TradeExecutionEngine:
             
             if not risk_allowed:
                 logger.warning(f"🚫 TAKE PROFIT BLOCKED BY RISK GATE: {risk_reason}")
-                return
+                return None
+            
+            order = self._create_order_record(trade_id, symbol, tp_side, size, take_profit_price, "TAKE_PROFIT")
             
             # Create take profit order
-            tp_order_result = await self.delta_connector.place_order(
+            tp_order_result = await self._place_exchange_order(
                 symbol=symbol,
-                side=tp_side,
+                side=tp_side.lower(),
                 size=size,
+                order_type="limit",
                 price=take_profit_price,
-                type="LIMIT"
+                reduce_only=True
             )
             
             if tp_order_result["success"]:
-                # Record take profit order
-                await self._create_order_record(
-                    tp_order_result["order_id"],
-                    trade_id,
-                    symbol,
-                    tp_side,
-                    size,
-                    take_profit_price,
-                    "TAKE_PROFIT"
+                self.lifecycle.track_order(trade_id, tp_order_result["order_id"], symbol, "TAKE_PROFIT")
+                self._update_order_status(
+                    order.order_id, OrderStatus.SUBMITTED, exchange_order_id=str(tp_order_result["order_id"])
                 )
                 
                 logger.info(f"✅ Take profit set: {take_profit_price} for trade {trade_id}")
-            else:
-                logger.error(f"Failed to set take profit: {tp_order_result['error']}")
+                return tp_order_result["order_id"]
+            
+            self._update_order_status(
+                order.order_id, OrderStatus.FAILED, exchange_error_message=str(tp_order_result["error"])
+            )
+            logger.error(f"Failed to set take profit: {tp_order_result['error']}")
+            return None
                 
         except Exception as e:
             logger.error(f"Error setting up take profit: {e}")
+            return None
+    
+    async def _place_exchange_order(self, **order_params) -> Dict[str, Any]:
+        """Place an order and normalize the connector's typed result (exchange rejections raise)"""
+        try:
+            placed = await self.delta_connector.place_order(**order_params)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        
+        if str(placed.status).lower() in ("rejected", "cancelled"):
+            return {"success": False, "error": f"Order {placed.status}", "order_id": str(placed.id)}
+        return {"success": True, "order_id": str(placed.id), "status": placed.status}
+    
+    async def _cancel_unfilled_order(self, order_id: str) -> Dict[str, Any]:
+        """Cancel an order that did not fill in time and re-read it (it may have filled before the cancel landed)"""
+        try:
+            await self.delta_connector.cancel_order(order_id)
+        except Exception as e:
+            logger.warning(f"Could not cancel unfilled order {order_id}: {e}")
+        
+        try:
+            order_status = await self.delta_connector.get_order_status(order_id)
+        except Exception as e:
+            logger.error(f"Could not re-read order {order_id} after cancelling it: {e}")
+            return {"filled": False, "status": "CANCELLED", "error": "Order monitoring timeout"}
+        
+        return {
+            "filled": order_status["status"] == "FILLED",
+            "status": order_status["status"],
+            "fill_price": order_status.get("fill_price"),
+            "fill_size": order_status.get("fill_size") or 0.0,
+            "error": f"Order monitoring timeout ({order_status['status'].lower()} after cancel)"
+        }
     
     async def _monitor_order_execution(self, order_id: str) -> Dict[str, Any]:
-        """Monitor order execution until filled or timeout"""
+        """Monitor order execution until filled or timeout (stream-driven, REST fallback)"""
         try:
-            start_time = datetime.utcnow()
-            timeout = timedelta(seconds=self.order_timeout)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.order_timeout
             
-            while datetime.utcnow() - start_time < timeout:
-                # Check order status
-                order_status = await self.delta_connector.get_order_status(order_id)
+            while (remaining := deadline - loop.time()) > 0:
+                stream_connected = self.delta_connector.private_stream_connected
+                
+                if stream_connected:
+                    try:
+                        order_status = await self.delta_connector.wait_for_order_update(
+                            order_id, timeout=min(remaining, self.order_reconcile_interval)
+                        )
+                    except asyncio.TimeoutError:
+                        # No event within the interval: reconcile over REST in case one was missed
+                        order_status = await self.delta_connector.get_order_status(order_id)
+                else:
+                    order_status = await self.delta_connector.get_order_status(order_id)
                 
                 if order_status["status"] == "FILLED":
                     return {
@@ -656,13 +1062,18 @@ class TradeExecutionEngine:
                         "fill_size": order_status["fill_size"]
                     }
                 elif order_status["status"] in ["CANCELLED", "REJECTED"]:
+                    # A cancelled order may still have filled in part
                     return {
                         "filled": False,
+                        "status": order_status["status"],
+                        "fill_price": order_status.get("fill_price"),
+                        "fill_size": order_status.get("fill_size") or 0.0,
                         "error": f"Order {order_status['status']}"
                     }
                 
-                # Wait before next check
-                await asyncio.sleep(5)
+                # Poll interval applies only while the private stream is down
+                if not stream_connected:
+                    await asyncio.sleep(min(5, max(0.0, deadline - loop.time())))
             
             # Timeout reached
             logger.warning(f"Order {order_id} monitoring timeout")
@@ -679,51 +1090,18 @@ class TradeExecutionEngine:
             }
     
     async def _start_trade_monitoring(self, trade_id: str):
-        """Start monitoring a trade for management"""
-        if trade_id not in self.order_monitoring_tasks:
-            task = asyncio.create_task(self._trade_monitoring_loop(trade_id))
-            self.order_monitoring_tasks[trade_id] = task
-            logger.info(f"Started monitoring trade: {trade_id}")
+        """Start monitoring a trade's exit orders (event-driven, shared by all trades)"""
+        self.lifecycle.ensure_started()
+        logger.info(f"Started monitoring trade: {trade_id}")
     
     async def _stop_trade_monitoring(self, trade_id: str):
         """Stop monitoring a trade"""
-        if trade_id in self.order_monitoring_tasks:
-            self.order_monitoring_tasks[trade_id].cancel()
-            del self.order_monitoring_tasks[trade_id]
+        if self.lifecycle.untrack_trade(trade_id):
             logger.info(f"Stopped monitoring trade: {trade_id}")
     
-    async def _trade_monitoring_loop(self, trade_id: str):
-        """Monitor a trade for stop loss/take profit execution"""
-        try:
-            while True:
-                # Check if related orders (stop loss, take profit) have been filled
-                related_orders = await self._get_related_orders(trade_id)
-                
-                for order in related_orders:
-                    order_status = await self.delta_connector.get_order_status(order["order_id"])
-                    
-                    if order_status["status"] == "FILLED":
-                        # Order filled, close the trade
-                        exit_type = "STOP_LOSS" if order["order_type"] == "STOP_LOSS" else "TAKE_PROFIT"
-                        
-                        await self.close_position(
-                            trade_id,
-                            exit_type=exit_type,
-                            exit_price=order_status["fill_price"]
-                        )
-                        
-                        return  # Exit monitoring loop
-                
-                await asyncio.sleep(10)  # Check every 10 seconds
-                
-        except asyncio.CancelledError:
-            logger.info(f"Trade monitoring cancelled for {trade_id}")
-        except Exception as e:
-            logger.error(f"Error in trade monitoring loop for {trade_id}: {e}")
-    
-    # Database operations
+    # Trade and order state (in memory; the store journals and writes behind)
     
-    async def _create_trade_record(
+    def _create_trade_record(
         self,
         trade_id: str,
         symbol: str,
@@ -733,133 +1111,94 @@ class TradeExecutionEngine:
         stop_loss: Optional[float],
         take_profit: Optional[float],
         reasoning: str
-    ) -> Trade:
-        """Create a trade record in the database"""
-        try:
-            db = next(get_db())
-            
-            trade = Trade(
-                id=trade_id,
-                symbol=symbol,
-                trade_type=TradeType.BUY if side.upper() == "BUY" else TradeType.SELL,
-                size=Decimal(str(size)),
-                entry_price=Decimal(str(entry_price)) if entry_price else None,
-                stop_loss=Decimal(str(stop_loss)) if stop_loss else None,
-                take_profit=Decimal(str(take_profit)) if take_profit else None,
-                reasoning=reasoning,
-                status=TradeStatus.PENDING,
-                created_at=datetime.utcnow()
-            )
-            
-            db.add(trade)
-            db.commit()
-            db.refresh(trade)
-            
-            logger.info(f"Created trade record: {trade_id}")
-            return trade
-            
-        except Exception as e:
-            logger.error(f"Error creating trade record: {e}")
-            db.rollback()
-            raise
-        finally:
-            db.close()
+    ) -> TradeState:
+        """Create a pending trade"""
+        trade = self.order_state.create_trade(
+            trade_id,
+            symbol,
+            side,
+            size,
+            entry_price=entry_price,
+            stop_loss_price=stop_loss,
+            target_price=take_profit,
+            signal_reasoning=reasoning
+        )
+        logger.info(f"Created trade record: {trade_id}")
+        return trade
     
-    async def _create_order_record(
+    def _create_order_record(
         self,
-        order_id: str,
         trade_id: str,
         symbol: str,
         side: str,
         size: float,
         price: Optional[float],
-        order_type: str
-    ):
-        """Create an order record in the database"""
+        order_type: str,
+        reduce_only: bool = False
+    ) -> OrderState:
+        """Create a pending order of a trade, before it is sent to the exchange"""
+        return self.order_state.create_order(
+            trade_id,
+            symbol,
+            side,
+            size,
+            order_type,
+            price=price,
+            reduce_only=reduce_only or order_type.upper() in ("STOP_LOSS", "TAKE_PROFIT")
+        )
+    
+    def _update_order_status(self, order_id: str, status: OrderStatus, **changes):
+        """Move an order (client or exchange ID) to a new status"""
         try:
-            db = next(get_db())
-            
-            order = Order(
-                id=order_id,
-                trade_id=trade_id,
-                symbol=symbol,
-                side=side.upper(),
-                size=Decimal(str(size)),
-                price=Decimal(str(price)) if price else None,
-                order_type=OrderType(order_type.upper()),
-                status=OrderStatus.PENDING,
-                created_at=datetime.utcnow()
-            )
-            
-            db.add(order)
-            db.commit()
-            
-            logger.info(f"Created order record: {order_id}")
-            
-        except Exception as e:
-            logger.error(f"Error creating order record: {e}")
-            db.rollback()
-        finally:
-            db.close()
+            self.order_state.transition_order(order_id, status, **changes)
+        except (InvalidTransition, KeyError) as e:
+            logger.warning(f"Order status not updated: {e}")
     
-    async def _get_trade_record(self, trade_id: str) -> Optional[Trade]:
-        """Get trade record from database"""
+    async def _get_trade_record(self, trade_id: str) -> Optional[TradeState]:
+        """Get a trade (from memory; the database only for trades no longer held there)"""
         try:
-            async for db in get_db():
-                result = await db.execute(select(Trade).filter(Trade.id == trade_id))
-                trade = result.scalar_one_or_none()
-                return trade
+            return await self.order_state.fetch_trade(trade_id)
         except Exception as e:
             logger.error(f"Error getting trade record: {e}")
             return None
     
-    async def _update_trade_status(self, trade_id: str, status: TradeStatus):
-        """Update trade status in database"""
+    def _update_trade_status(self, trade_id: str, status: TradeStatus, **changes):
+        """Move a trade to a new status"""
         try:
-            async for db in get_db():
-                result = await db.execute(select(Trade).filter(Trade.id == trade_id))
-                trade = result.scalar_one_or_none()
-                if trade:
-                    trade.status = status
-                    trade.updated_at = datetime.utcnow()
-                    await db.commit()
-                    logger.info(f"Updated trade {trade_id} status to {status.value}")
-        except Exception as e:
+            self.order_state.transition_trade(trade_id, status, **changes)
+            logger.info(f"Updated trade {trade_id} status to {status.value}")
+        except (InvalidTransition, KeyError) as e:
             logger.error(f"Error updating trade status: {e}")
-            async for db in get_db():
-                await db.rollback()
     
-    async def _update_trade_closure(
+    def _update_trade_closure(
         self,
         trade_id: str,
         exit_price: float,
         realized_pnl: float,
-        exit_type: str
-    ):
-        """Update trade with closure information"""
+        exit_type: str,
+        exit_order_id: Optional[str] = None
+    ) -> bool:
+        """Close a trade with its exit details; False if it could not be closed (e.g. already closed)"""
         try:
-            async for db in get_db():
-                result = await db.execute(select(Trade).filter(Trade.id == trade_id))
-                trade = result.scalar_one_or_none()
-                if trade:
-                    trade.exit_price = Decimal(str(exit_price))
-                    trade.realized_pnl = Decimal(str(realized_pnl))
-                    trade.exit_reason = exit_type
-                    trade.status = TradeStatus.CLOSED
-                    trade.closed_at = datetime.utcnow()
-                    trade.updated_at = datetime.utcnow()
-                    await db.commit()
-                    logger.info(f"Updated trade {trade_id} closure")
-        except Exception as e:
+            self.order_state.transition_trade(
+                trade_id,
+                TradeStatus.CLOSED,
+                exit_price=exit_price,
+                realized_pnl=realized_pnl,
+                exit_reason=exit_type,
+                exit_order_id=str(exit_order_id) if exit_order_id else None
+            )
+            logger.info(f"Updated trade {trade_id} closure")
+            return True
+        except (InvalidTransition, KeyError) as e:
             logger.error(f"Error updating trade closure: {e}")
-            async for db in get_db():
-                await db.rollback()
+            return False
     
-    async def _calculate_realized_pnl(self, trade: Trade, exit_price: float) -> float:
-        """Calculate realized PnL for a trade"""
+    async def _calculate_realized_pnl(self, trade: TradeState, exit_price: float, size: Optional[float] = None) -> float:
+        """Calculate realized PnL for a trade (or the part of it given by size)"""
         try:
-            entry_price = float(trade.entry_price) if trade.entry_price else 0
-            size = float(trade.size)
+            entry_price = float(trade.average_fill_price or trade.entry_price or 0)
+            size = float(trade.filled_quantity or trade.quantity) if size is None else size
             
             if trade.trade_type == TradeType.BUY:
                 return (exit_price - entry_price) * size
@@ -909,90 +1248,67 @@ class TradeExecutionEngine:
             }
     
     async def _load_existing_orders(self):
-        """Load existing orders from database"""
+        """Load open trades and orders into the state store and resume exit tracking"""
         try:
-            async for db in get_db():
-                result = await db.execute(
-                    select(Order).filter(
-                        Order.status.in_([OrderStatus.PENDING, OrderStatus.PARTIALLY_FILLED])
-                    )
-                )
-                active_orders = result.scalars().all()
-                
-                for order in active_orders:
-                    self.active_orders[order.id] = {
-                        "order_id": order.id,
-                        "trade_id": order.trade_id,
-                        "symbol": order.symbol,
-                        "side": order.side,
-                        "size": float(order.size),
-                        "price": float(order.price) if order.price else None,
-                        "order_type": order.order_type.value,
-                        "status": order.status.value
-                    }
-                
-                logger.info(f"Loaded {len(self.active_orders)} existing orders")
-                break  # Exit after getting the data
-                
+            loaded = await self.order_state.load_open()
+            
+            for order in self.order_state.open_orders():
+                trade_id = self.order_state.trade_id_of(order)
+                self.active_orders[order.order_id] = {
+                    "order_id": order.exchange_order_id or order.order_id,
+                    "trade_id": trade_id,
+                    "symbol": order.symbol,
+                    "side": order.side.value,
+                    "size": order.quantity,
+                    "price": order.price or order.stop_price,
+                    "order_type": order.order_type.value,
+                    "status": order.status.value
+                }
+                if (
+                    trade_id
+                    and order.exchange_order_id
+                    and order.order_type in (OrderType.STOP_LOSS, OrderType.TAKE_PROFIT)
+                ):
+                    self.lifecycle.track_order(trade_id, order.exchange_order_id, order.symbol, order.order_type.value)
+            
+            # Resume exit tracking for trades opened before the restart
+            if any(self.lifecycle.is_tracking(order["trade_id"]) for order in self.active_orders.values()):
+                self.lifecycle.ensure_started()
+            
+            logger.info(f"Loaded {len(self.active_orders)} existing orders ({loaded} rows from database)")
+            
         except Exception as e:
             logger.error(f"Error loading existing orders: {e}")
     
     async def _cancel_related_orders(self, trade_id: str):
         """Cancel all orders related to a trade"""
         try:
-            related_orders = await self._get_related_orders(trade_id)
-            
-            for order in related_orders:
-                await self.delta_connector.cancel_order(order["order_id"])
-                logger.info(f"Cancelled order {order['order_id']} for trade {trade_id}")
+            for order in self._get_related_orders(trade_id):
+                await self._cancel_order(trade_id, order)
+                logger.info(f"Cancelled order {order.exchange_order_id or order.order_id} for trade {trade_id}")
                 
         except Exception as e:
             logger.error(f"Error cancelling related orders for {trade_id}: {e}")
     
-    async def _get_related_orders(self, trade_id: str) -> List[Dict[str, Any]]:
-        """Get all orders related to a trade"""
-        try:
-            async for db in get_db():
-                result = await db.execute(
-                    select(Order).filter(
-                        Order.trade_id == trade_id,
-                        Order.status.in_([OrderStatus.PENDING, OrderStatus.PARTIALLY_FILLED])
-                    )
-                )
-                orders = result.scalars().all()
-                
-                return [
-                    {
-                        "order_id": order.id,
-                        "order_type": order.order_type.value,
-                        "symbol": order.symbol,
-                    "side": order.side,
-                    "size": float(order.size),
-                    "price": float(order.price) if order.price else None
-                }
-                for order in orders
-            ]
-            
-        except Exception as e:
-            logger.error(f"Error getting related orders: {e}")
-            return []
+    def _get_related_orders(self, trade_id: str, order_type: Optional[OrderType] = None) -> List[OrderState]:
+        """Get the open orders of a trade"""
+        return self.order_state.trade_orders(trade_id, order_type)
+    
+    async def _cancel_order(self, trade_id: str, order: OrderState):
+        """Stop tracking, cancel on the exchange (if it got there) and mark an order cancelled"""
+        if order.exchange_order_id:
+            self.lifecycle.untrack_order(order.exchange_order_id)
+            await self.delta_connector.cancel_order(order.exchange_order_id)
+        self._update_order_status(order.order_id, OrderStatus.CANCELLED)
     
     async def _cancel_stop_loss_order(self, trade_id: str):
         """Cancel stop loss order for a trade"""
         try:
-            async for db in get_db():
-                result = await db.execute(
-                    select(Order).filter(
-                        Order.trade_id == trade_id,
-                        Order.order_type == OrderType.STOP_LOSS,
-                        Order.status.in_([OrderStatus.PENDING, OrderStatus.PARTIALLY_FILLED])
-                    )
-                )
-                stop_order = result.scalar_one_or_none()
-                
-                if stop_order:
-                    await self.delta_connector.cancel_order(stop_order.id)
-                    logger.info(f"Cancelled stop loss order for trade {trade_id}")
+            orders = self._get_related_orders(trade_id, OrderType.STOP_LOSS)
+            for order in orders:
+                await self._cancel_order(trade_id, order)
+            if orders:
+                logger.info(f"Cancelled stop loss order for trade {trade_id}")
                     
         except Exception as e:
             logger.error(f"Error cancelling stop loss order: {e}")
@@ -1000,50 +1316,19 @@ class TradeExecutionEngine:
     async def _cancel_take_profit_order(self, trade_id: str):
         """Cancel take profit order for a trade"""
         try:
-            async for db in get_db():
-                result = await db.execute(
-                    select(Order).filter(
-                        Order.trade_id == trade_id,
-                        Order.order_type == OrderType.TAKE_PROFIT,
-                        Order.status.in_([OrderStatus.PENDING, OrderStatus.PARTIALLY_FILLED])
-                    )
-                )
-                tp_order = result.scalar_one_or_none()
-                
-                if tp_order:
-                    await self.delta_connector.cancel_order(tp_order.id)
-                    logger.info(f"Cancelled take profit order for trade {trade_id}")
+            orders = self._get_related_orders(trade_id, OrderType.TAKE_PROFIT)
+            for order in orders:
+                await self._cancel_order(trade_id, order)
+            if orders:
+                logger.info(f"Cancelled take profit order for trade {trade_id}")
                     
         except Exception as e:
             logger.error(f"Error cancelling take profit order: {e}")
     
-    async def _update_trade_stop_loss(self, trade_id: str, new_stop_loss: float):
+    def _update_trade_stop_loss(self, trade_id: str, new_stop_loss: float):
         """Update stop loss in trade record"""
         try:
-            async for db in get_db():
-                result = await db.execute(select(Trade).filter(Trade.id == trade_id))
-                trade = result.scalar_one_or_none()
-                if trade:
-                    trade.stop_loss = Decimal(str(new_stop_loss))
-                    trade.updated_at = datetime.utcnow()
-                    await db.commit()
-        except Exception as e:
+            self.order_state.update_trade(trade_id, stop_loss_price=new_stop_loss)
+        except KeyError as e:
             logger.error(f"Error updating trade stop loss: {e}")
-            async for db in get_db():
-                await db.rollback()
-    
-    async def _update_trade_size(self, trade_id: str, new_size: float):
-        """Update trade size in record"""
-        try:
-            async for db in get_db():
-                result = await db.execute(select(Trade).filter(Trade.id == trade_id))
-                trade = result.scalar_one_or_none()
-                if trade:
-                    trade.size = Decimal(str(new_size))
-                    trade.updated_at = datetime.utcnow()
-                    await db.commit()
-        except Exception as e:
-            logger.error(f"Error updating trade size: {e}")
-            async for db in get_db():
-                await db.rollback()
 
@@ -0,0 +1,250 @@
+"""
+Trade Lifecycle Engine for Crypto-0DTE System
+
+Tracks the exit orders (stop loss / take profit) of every open trade in one
+in-memory index and drives trades to closed from order events:
+
+- Private stream order events are matched against the index in O(1) and
+  queued to a single consumer task
+- A filled exit closes its trade through the execution engine's callback
+- A cancelled or rejected exit is dropped from the index (the trade loses
+  that protection and a warning is logged)
+
+Work is proportional to order events, not to open trades. A periodic REST
+reconciliation (one open-orders listing, plus a status lookup only for
+tracked orders that have left the book) covers events missed while the
+stream is down.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("FILLED", "CANCELLED", "REJECTED")
+
+# Raw exchange order states of orders no longer on the book
+CLOSED_EXCHANGE_STATES = ("closed", "cancelled", "rejected")
+
+
+@dataclass(slots=True)
+class TrackedOrder:
+    """Exit order of an open trade"""
+    order_id: str
+    trade_id: str
+    symbol: str
+    order_type: str  # STOP_LOSS / TAKE_PROFIT
+    status: str = "OPEN"
+    tracked_at: float = 0.0
+
+
+ExitFilledCallback = Callable[[TrackedOrder, Dict[str, Any]], Awaitable[None]]
+ExitLostCallback = Callable[[TrackedOrder], None]
+
+
+class TradeLifecycleEngine:
+    """Event-driven exit order tracking for one execution engine"""
+
+    def __init__(
+        self,
+        delta_connector,
+        on_exit_filled: ExitFilledCallback,
+        on_exit_lost: Optional[ExitLostCallback] = None
+    ):
+        self.delta_connector = delta_connector
+        self.on_exit_filled = on_exit_filled
+        self.on_exit_lost = on_exit_lost
+
+        # Configuration
+        self.reconcile_interval = settings.DELTA_ORDER_RECONCILE_INTERVAL  # Stream connected
+        self.poll_interval = settings.TRADE_LIFECYCLE_POLL_INTERVAL  # Stream down
+
+        # Order index: order ID -> order, trade ID -> order IDs
+        self._orders: Dict[str, TrackedOrder] = {}
+        self._by_trade: Dict[str, Set[str]] = {}
+
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._handlers: Set[asyncio.Task] = set()  # Exit-fill callbacks in flight
+        self._last_reconcile = time.monotonic()
+
+        # Statistics
+        self.events_received = 0
+        self.events_applied = 0
+        self.exits_filled = 0
+        self.exits_lost = 0
+        self.reconciliations = 0
+        self.reconcile_status_lookups = 0
+
+    # =============================================================================
+    # LIFECYCLE
+    # =============================================================================
+
+    def ensure_started(self):
+        """Subscribe to the private stream and start the consumer task (idempotent)"""
+        if self._task is None or self._task.done():
+            self.delta_connector.add_private_event_listener(self._on_private_event)
+            self.delta_connector.start_private_stream()
+            self._task = asyncio.create_task(self._run())
+            logger.info("Trade lifecycle engine started")
+
+    async def stop(self):
+        """Stop consuming events and wait for in-flight exit handling"""
+        self.delta_connector.remove_private_event_listener(self._on_private_event)
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    # =============================================================================
+    # ORDER INDEX
+    # =============================================================================
+
+    def track_order(self, trade_id: str, order_id: str, symbol: str, order_type: str):
+        """Add an exit order to the index"""
+        order_id = str(order_id)
+        self._orders[order_id] = TrackedOrder(
+            order_id=order_id,
+            trade_id=trade_id,
+            symbol=symbol,
+            order_type=order_type,
+            tracked_at=time.time()
+        )
+        self._by_trade.setdefault(trade_id, set()).add(order_id)
+
+    def untrack_order(self, order_id: str) -> Optional[TrackedOrder]:
+        """Remove one order from the index (e.g. before cancelling it)"""
+        order = self._orders.pop(str(order_id), None)
+        if order is not None:
+            trade_orders = self._by_trade.get(order.trade_id)
+            if trade_orders is not None:
+                trade_orders.discard(order.order_id)
+                if not trade_orders:
+                    del self._by_trade[order.trade_id]
+        return order
+
+    def untrack_trade(self, trade_id: str) -> List[TrackedOrder]:
+        """Remove and return every order of a trade"""
+        return [
+            order for order in (self.untrack_order(order_id) for order_id in list(self._by_trade.get(trade_id, ())))
+            if order is not None
+        ]
+
+    def get_trade_orders(self, trade_id: str, order_type: Optional[str] = None) -> List[TrackedOrder]:
+        """Tracked orders of a trade, optionally of one type"""
+        return [
+            self._orders[order_id] for order_id in self._by_trade.get(trade_id, ())
+            if order_type is None or self._orders[order_id].order_type == order_type
+        ]
+
+    def is_tracking(self, trade_id: str) -> bool:
+        """Whether any exit order of a trade is tracked"""
+        return trade_id in self._by_trade
+
+    # =============================================================================
+    # EVENT PROCESSING
+    # =============================================================================
+
+    def _on_private_event(self, channel: str, event: Dict[str, Any]):
+        """Private stream listener: queue updates for tracked orders only"""
+        if channel == "orders" and event.get("order_id") in self._orders:
+            self.events_received += 1
+            self._events.put_nowait(event)
+
+    async def _run(self):
+        while True:
+            interval = self.reconcile_interval if self.delta_connector.private_stream_connected else self.poll_interval
+            timeout = self._last_reconcile + interval - time.monotonic()
+            try:
+                if timeout <= 0:
+                    raise asyncio.TimeoutError
+                event = await asyncio.wait_for(self._events.get(), timeout=timeout)
+                self._apply(event)
+            except asyncio.TimeoutError:
+                self._last_reconcile = time.monotonic()
+                if self._orders:
+                    try:
+                        await self._reconcile()
+                    except Exception as e:
+                        logger.warning(f"Trade lifecycle reconciliation failed: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Trade lifecycle event error: {e}")
+
+    def _apply(self, state: Dict[str, Any]):
+        """Apply an order state to the index and drive the trade transition"""
+        order = self._orders.get(state.get("order_id"))
+        if order is None:
+            return  # Already settled or untracked
+        self.events_applied += 1
+        order.status = state["status"]
+
+        if order.status not in TERMINAL_STATUSES:
+            return
+
+        self.untrack_order(order.order_id)
+        if order.status == "FILLED":
+            self.exits_filled += 1
+            logger.info(f"🎯 {order.order_type} filled for trade {order.trade_id} at {state.get('fill_price')}")
+            # Remaining exits of the trade are cancelled when it is closed
+            task = asyncio.create_task(self._handle_exit_filled(order, state))
+            self._handlers.add(task)
+            task.add_done_callback(self._handlers.discard)
+        else:
+            self.exits_lost += 1
+            logger.warning(
+                f"⚠️ {order.order_type} order {order.order_id} for trade {order.trade_id} "
+                f"{order.status.lower()} on the exchange; trade no longer protected by it"
+            )
+            if self.on_exit_lost:
+                self.on_exit_lost(order)
+
+    async def _handle_exit_filled(self, order: TrackedOrder, state: Dict[str, Any]):
+        try:
+            await self.on_exit_filled(order, state)
+        except Exception as e:
+            logger.error(f"Error closing trade {order.trade_id} after {order.order_type} fill: {e}")
+
+    async def _reconcile(self):
+        """Catch up on missed events: one open-orders listing, then look up only orders that left the book"""
+        self.reconciliations += 1
+        listed = await self.delta_connector.get_orders(limit=max(100, 2 * len(self._orders)))
+        live_ids = {str(order.id) for order in listed if str(order.status).lower() not in CLOSED_EXCHANGE_STATES}
+
+        for order_id in [order_id for order_id in self._orders if order_id not in live_ids]:
+            self.reconcile_status_lookups += 1
+            try:
+                self._apply(await self.delta_connector.get_order_status(order_id))
+            except Exception as e:
+                logger.warning(f"Trade lifecycle status lookup failed for order {order_id}: {e}")
+
+    # =============================================================================
+    # STATISTICS
+    # =============================================================================
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get trade lifecycle engine statistics"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "tracked_orders": len(self._orders),
+            "tracked_trades": len(self._by_trade),
+            "queued_events": self._events.qsize(),
+            "events_received": self.events_received,
+            "events_applied": self.events_applied,
+            "exits_filled": self.exits_filled,
+            "exits_lost": self.exits_lost,
+            "exit_handlers_in_flight": len(self._handlers),
+            "reconciliations": self.reconciliations,
+            "reconcile_status_lookups": self.reconcile_status_lookups
+        }